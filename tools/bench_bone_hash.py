@@ -0,0 +1,120 @@
+"""
+Benchmark bone name hashing in mot_writer.
+Times the legacy per-block MurmurHash3 against the single-unpack
+murmurhash3_32, the bulk hash_names API and warm bone_name_hash cache hits,
+over RE2_PLAYER_BONE_NAMES and a synthetic name set.
+
+Usage:
+    python bench_bone_hash.py [--synthetic N] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import random
+import struct
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mot_writer
+from mot_writer import (
+    murmurhash3_32, bone_name_hash, hash_names, RE2_PLAYER_BONE_NAMES,
+)
+
+
+def legacy_murmurhash3_32(data, seed=0xFFFFFFFF):
+    """murmurhash3_32 as it was before the bulk block unpack."""
+    length = len(data)
+    nblocks = length // 4
+    h1 = seed & 0xFFFFFFFF
+    c1 = 0xCC9E2D51
+    c2 = 0x1B873593
+
+    for i in range(nblocks):
+        k1 = struct.unpack_from('<I', data, i * 4)[0]
+        k1 = (k1 * c1) & 0xFFFFFFFF
+        k1 = ((k1 << 15) | (k1 >> 17)) & 0xFFFFFFFF
+        k1 = (k1 * c2) & 0xFFFFFFFF
+        h1 ^= k1
+        h1 = ((h1 << 13) | (h1 >> 19)) & 0xFFFFFFFF
+        h1 = (h1 * 5 + 0xE6546B64) & 0xFFFFFFFF
+
+    tail = data[nblocks * 4:]
+    k1 = 0
+    if len(tail) >= 3:
+        k1 ^= tail[2] << 16
+    if len(tail) >= 2:
+        k1 ^= tail[1] << 8
+    if len(tail) >= 1:
+        k1 ^= tail[0]
+        k1 = (k1 * c1) & 0xFFFFFFFF
+        k1 = ((k1 << 15) | (k1 >> 17)) & 0xFFFFFFFF
+        k1 = (k1 * c2) & 0xFFFFFFFF
+        h1 ^= k1
+
+    h1 ^= length
+    h1 ^= (h1 >> 16)
+    h1 = (h1 * 0x85EBCA6B) & 0xFFFFFFFF
+    h1 ^= (h1 >> 13)
+    h1 = (h1 * 0xC2B2AE35) & 0xFFFFFFFF
+    h1 ^= (h1 >> 16)
+    return h1
+
+
+def synthetic_names(count, seed=85):
+    """Bone-like names: RE2 prefixes/sides with numbered suffixes."""
+    rng = random.Random(seed)
+    parts = ['spine', 'neck', 'head', 'arm', 'forearm', 'hand', 'thigh', 'shin',
+             'foot', 'toe', 'finger', 'thumb', 'clavicle', 'hair', 'cloth', 'prop']
+    sides = ['', 'L_', 'R_', 'C_']
+    return [f"{rng.choice(sides)}{rng.choice(parts)}_{i:05d}" for i in range(count)]
+
+
+def best_of(fn, repeat, setup=None):
+    best = float('inf')
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(label, names, repeat):
+    encoded = [n.encode('utf-16-le') for n in names]
+    clear = mot_writer._bone_hash_cache.clear
+
+    t_legacy = best_of(lambda: [legacy_murmurhash3_32(b) for b in encoded], repeat)
+    t_single = best_of(lambda: [murmurhash3_32(b) for b in encoded], repeat)
+    t_bulk = best_of(lambda: hash_names(names), repeat, setup=clear)
+    hash_names(names[-mot_writer.BONE_HASH_CACHE_SIZE:])
+    warm = names[-mot_writer.BONE_HASH_CACHE_SIZE:]
+    t_warm = best_of(lambda: [bone_name_hash(n) for n in warm], repeat)
+
+    if hash_names(names) != [legacy_murmurhash3_32(b) for b in encoded]:
+        print("ERROR: hash_names output differs from legacy murmurhash3_32")
+        sys.exit(1)
+
+    print(f"{label} ({len(names)} names)")
+    print(f"  {'legacy per-block unpack:':<32}{t_legacy * 1000:8.2f} ms")
+    print(f"  {'murmurhash3_32 bulk unpack:':<32}{t_single * 1000:8.2f} ms  "
+          f"({t_legacy / t_single:.1f}x faster)")
+    print(f"  {'hash_names (cold cache):':<32}{t_bulk * 1000:8.2f} ms  "
+          f"({t_legacy / t_bulk:.1f}x faster)")
+    print(f"  {'bone_name_hash (cache hits):':<32}{t_warm * 1000:8.2f} ms  "
+          f"({len(warm)} names)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mot_writer bone name hashing")
+    parser.add_argument("--synthetic", type=int, default=50000, help="Synthetic name count")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (best is kept)")
+    args = parser.parse_args()
+
+    bench("RE2_PLAYER_BONE_NAMES", list(RE2_PLAYER_BONE_NAMES), args.repeat)
+    bench("Synthetic", synthetic_names(args.synthetic), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
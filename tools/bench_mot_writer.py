@@ -0,0 +1,108 @@
+"""
+Benchmark mot_writer track serialization on a real bone dump.
+Compares the legacy per-key struct.pack_into writes against the bulk
+NumPy/memoryview writers, then times a full build_mot_entry.
+
+Usage:
+    python bench_mot_writer.py [dump_file] [--repeat N]
+
+    Default dump: framework/reframework/data/CustomAnimFramework/dodge_dump_front.txt
+"""
+
+import os
+import sys
+import time
+import struct
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mot_writer import (
+    build_mot_entry, write_float_triplets, write_frame_indices,
+)
+from dump_to_motlist import parse_dodge_dump
+
+DEFAULT_DUMP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'framework', 'reframework',
+    'data', 'CustomAnimFramework', 'dodge_dump_front.txt')
+
+
+def legacy_write(buf, tracks):
+    """Per-key writes as build_mot_entry did before the bulk writer layer."""
+    pos = 0
+    for data in tracks:
+        for k, v in enumerate(data):
+            struct.pack_into('<f', buf, pos + k * 12 + 0, v[0])
+            struct.pack_into('<f', buf, pos + k * 12 + 4, v[1])
+            struct.pack_into('<f', buf, pos + k * 12 + 8, v[2])
+        pos += len(data) * 12
+        for k in range(len(data)):
+            struct.pack_into('<h', buf, pos + k * 2, k)
+        pos += len(data) * 2
+
+
+def bulk_write(buf, tracks):
+    """Whole-track writes through the mot_writer bulk layer."""
+    pos = 0
+    for data in tracks:
+        pos += write_float_triplets(buf, pos, data)
+        pos += write_frame_indices(buf, pos, np.arange(len(data)))
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mot_writer frame data writes")
+    parser.add_argument("dump", nargs="?", default=DEFAULT_DUMP, help="Bone dump .txt file")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (best is kept)")
+    args = parser.parse_args()
+
+    bone_names, _, frames_data = parse_dodge_dump(args.dump)
+    frame_count = len(frames_data)
+    identity = (0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+
+    # One rotation (qX, qY, qZ) and one position track per bone, like --uncompressed
+    tracks = []
+    bones = []
+    for i, name in enumerate(bone_names):
+        keys = [frame.get(name, identity) for frame in frames_data]
+        rotations = [k[0:4] for k in keys]
+        positions = [k[4:7] for k in keys]
+        tracks.append(rotations)
+        tracks.append(positions)
+        bones.append({'name': name, 'index': i,
+                      'rotations': rotations, 'positions': positions})
+
+    size = sum(len(t) * 14 for t in tracks)
+    legacy_buf = bytearray(size)
+    bulk_buf = bytearray(size)
+
+    t_legacy = best_of(lambda: legacy_write(legacy_buf, tracks), args.repeat)
+    t_bulk = best_of(lambda: bulk_write(bulk_buf, tracks), args.repeat)
+    if legacy_buf != bulk_buf:
+        print("ERROR: bulk writer output differs from legacy writer")
+        sys.exit(1)
+
+    print(f"Dump: {os.path.basename(args.dump)} ({len(bone_names)} bones, "
+          f"{frame_count} frames, {len(tracks)} tracks, {size / 1024:.1f} KB)")
+    print(f"  {'struct.pack_into per key:':<32}{t_legacy * 1000:8.2f} ms")
+    print(f"  {'bulk memoryview writer:':<32}{t_bulk * 1000:8.2f} ms  "
+          f"({t_legacy / t_bulk:.1f}x faster)")
+
+    for compressed in (True, False):
+        t = best_of(lambda: build_mot_entry('bench', frame_count, 60, bones,
+                                            compressed=compressed), args.repeat)
+        label = f"build_mot_entry ({'compressed' if compressed else 'uncompressed'}):"
+        print(f"  {label:<32}{t * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
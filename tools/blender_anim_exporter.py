@@ -4,8 +4,14 @@ Exports armature animation data as JSON for the RE Engine Custom Animation Frame
 
 Install: Blender > Edit > Preferences > Add-ons > Install > select this file
 Usage: Select armature, open sidebar (N), CAF tab, configure, click Export
-
-Output format: JSON with per-frame, per-bone local transforms.
+       ("Export All Actions" writes every action matching the filter, one file each)
+Headless batch (all actions of the armature in one Blender process):
+    blender --background scene.blend --python blender_anim_exporter.py -- \
+        --output-dir exports/ [--filter "dodge_*"] [--armature NAME] [--binary]
+
+Output format: JSON with per-frame, per-bone local transforms, or a binary
+CAF file (.cafb: header + bone table + float32 frame block) for long
+animations; mot_writer.py converts either. The Lua player reads JSON only.
 Coordinate system: Raw Blender values (Z-up, right-handed).
 Axis conversion to RE Engine (Y-up) is handled by the Lua player at runtime,
 so the user can tweak settings without re-exporting.
@@ -27,7 +33,14 @@ bl_info = {
 import bpy
 import json
 import os
-from mathutils import Matrix, Quaternion, Vector
+import re
+import sys
+import time
+import struct
+import fnmatch
+import argparse
+import numpy as np
+from mathutils import Matrix
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 from bpy.types import Operator, Panel, PropertyGroup
 
@@ -78,6 +91,21 @@ class CAF_ExportSettings(PropertyGroup):
         description="Remove this prefix from bone names (e.g., 'Armature_')",
         default="",
     )
+    export_format: EnumProperty(
+        name="Format",
+        description="File format of the export",
+        items=[
+            ('JSON', "JSON", "CAF JSON, playable by the Lua player and convertible by mot_writer.py"),
+            ('BINARY', "Binary (.cafb)", "Compact float32 CAF for mot_writer.py, no JSON text or rounding"),
+        ],
+        default='JSON',
+    )
+    action_filter: StringProperty(
+        name="Action Filter",
+        description="Export All Actions: only actions whose name matches this "
+                    "pattern (* and ? wildcards, empty = all)",
+        default="",
+    )
 
 
 class CAF_OT_ExportAnimation(Operator):
@@ -106,6 +134,38 @@ class CAF_OT_ExportAnimation(Operator):
             return {'CANCELLED'}
 
 
+class CAF_OT_ExportAllActions(Operator):
+    bl_idname = "caf.export_all_actions"
+    bl_label = "Export All Actions"
+    bl_description = ("Export every action matching the filter onto the active armature, "
+                      "one CAF file per action next to the output path")
+
+    def execute(self, context):
+        settings = context.scene.caf_export_settings
+        armature = context.active_object
+
+        if not armature or armature.type != 'ARMATURE':
+            self.report({'ERROR'}, "Select an armature first")
+            return {'CANCELLED'}
+
+        output_dir = os.path.dirname(bpy.path.abspath(settings.output_path))
+        results = export_actions(context, armature, settings, output_dir,
+                                 settings.action_filter or None)
+        if not results:
+            self.report({'ERROR'}, "No actions match the filter")
+            return {'CANCELLED'}
+
+        print(format_action_summary(results))
+        failed = sum(1 for r in results if r["status"] is None)
+        total = sum(r["seconds"] for r in results)
+        if failed:
+            self.report({'WARNING'}, f"Exported {len(results) - failed}/{len(results)} actions "
+                                     f"in {total:.1f} s, {failed} failed (see console)")
+        else:
+            self.report({'INFO'}, f"Exported {len(results)} actions to {output_dir} in {total:.1f} s")
+        return {'FINISHED'}
+
+
 class CAF_OT_SetRangeFromAction(Operator):
     bl_idname = "caf.set_range_from_action"
     bl_label = "Range from Action"
@@ -170,6 +230,7 @@ class CAF_PT_ExportPanel(Panel):
         layout.separator()
 
         # Output
+        layout.prop(settings, "export_format")
         layout.prop(settings, "output_path")
 
         # Export button
@@ -178,32 +239,230 @@ class CAF_PT_ExportPanel(Panel):
         row.scale_y = 2.0
         row.operator("caf.export_animation", icon='EXPORT')
 
+        # Batch export
+        layout.separator()
+        layout.prop(settings, "action_filter")
+        layout.operator("caf.export_all_actions", icon='EXPORT')
+
+
+# Frames whose pose matrices are gathered before one batched local-transform pass
+SAMPLE_CHUNK_FRAMES = 256
+
 
-def get_bone_local_transform(pose_bone):
+def pose_bone_slots(armature, bones_to_export):
     """
-    Get a bone's local transform relative to its parent (or armature for root bones).
-    Returns (quaternion, position) in Blender's coordinate space.
+    Index arrays into armature.pose.bones for local_transforms: the slot of
+    each exported bone (-1 if the pose has no such bone) and of its parent
+    (-1 for root bones, which stay relative to the armature origin).
     """
-    if pose_bone.parent:
-        # Local relative to parent
-        parent_mat_inv = pose_bone.parent.matrix.inverted_safe()
-        local_mat = parent_mat_inv @ pose_bone.matrix
-    else:
-        # Root bone: relative to armature origin
-        local_mat = pose_bone.matrix.copy()
+    pose_bones = armature.pose.bones
+    slot_of = {pose_bone.name: i for i, pose_bone in enumerate(pose_bones)}
+    bone_slots = np.array([slot_of.get(b["blender_name"], -1) for b in bones_to_export])
+    parent_slots = np.array([
+        slot_of[pose_bones[s].parent.name] if s >= 0 and pose_bones[s].parent else -1
+        for s in bone_slots
+    ])
+    return bone_slots, parent_slots
+
+
+def matrices_to_quats(rot):
+    """
+    Unit quaternions [x, y, z, w] of (..., 3, 3) rotation matrices, w >= 0.
+    Per matrix, the largest of w/x/y/z is solved first (Shepperd's method).
+    """
+    m00, m01, m02 = rot[..., 0, 0], rot[..., 0, 1], rot[..., 0, 2]
+    m10, m11, m12 = rot[..., 1, 0], rot[..., 1, 1], rot[..., 1, 2]
+    m20, m21, m22 = rot[..., 2, 0], rot[..., 2, 1], rot[..., 2, 2]
+    trace = m00 + m11 + m22
+
+    def solve(diag, a, b, c):
+        s = 2.0 * np.sqrt(np.maximum(1.0 + diag, 1e-12))
+        return 0.25 * s, a / s, b / s, c / s
+
+    w, x, y, z = solve(trace, m21 - m12, m02 - m20, m10 - m01)
+    cand_w = np.stack([x, y, z, w], axis=-1)
+    x, w, y, z = solve(m00 - m11 - m22, m21 - m12, m01 + m10, m02 + m20)
+    cand_x = np.stack([x, y, z, w], axis=-1)
+    y, w, x, z = solve(m11 - m00 - m22, m02 - m20, m01 + m10, m12 + m21)
+    cand_y = np.stack([x, y, z, w], axis=-1)
+    z, w, x, y = solve(m22 - m00 - m11, m10 - m01, m02 + m20, m12 + m21)
+    cand_z = np.stack([x, y, z, w], axis=-1)
+
+    pick = np.argmax(np.stack([trace, m00, m11, m22], axis=-1), axis=-1)
+    quats = np.choose(pick[..., None], [cand_w, cand_x, cand_y, cand_z])
+    quats *= np.where(quats[..., 3:] < 0.0, -1.0, 1.0)
+    return quats / np.linalg.norm(quats, axis=-1, keepdims=True)
+
+
+def local_transforms(world, bone_slots, parent_slots):
+    """
+    Parent-relative transforms of the exported bones for a batch of frames.
 
-    loc, rot, scale = local_mat.decompose()
-    return rot, loc
+    Args:
+        world: (frames, pose_bones * 16) float32 pose-bone matrices as filled by
+            pose.bones.foreach_get("matrix", ...) (column-major per bone)
+        bone_slots, parent_slots: from pose_bone_slots
 
+    Returns:
+        (frames, bones, 7) float64 [qx, qy, qz, qw, px, py, pz]; bones missing
+        from the pose get the identity transform.
+    """
+    frames = world.shape[0]
+    mats = world.reshape(frames, -1, 4, 4).transpose(0, 1, 3, 2).astype(np.float64)
+    child = mats[:, np.maximum(bone_slots, 0)]
+    parent = mats[:, np.maximum(parent_slots, 0)]
+    parent[:, parent_slots < 0] = np.eye(4)
+
+    # inverse(parent) @ child for every bone at once
+    try:
+        local = np.linalg.solve(parent, child)
+    except np.linalg.LinAlgError:
+        local = np.linalg.pinv(parent) @ child
+
+    # Decompose like Matrix.decompose: strip column scale, negative
+    # determinant folded into the scale
+    basis = local[..., :3, :3]
+    basis = basis / np.maximum(np.linalg.norm(basis, axis=-2, keepdims=True), 1e-12)
+    basis *= np.where(np.linalg.det(basis) < 0.0, -1.0, 1.0)[..., None, None]
+
+    out = np.empty((frames, len(bone_slots), 7))
+    out[..., :4] = matrices_to_quats(basis)
+    out[..., 4:] = local[..., :3, 3]
+    out[:, bone_slots < 0] = (0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+    return out
+
+
+# Binary CAF layout, read back by mot_writer.load_caf_binary
+CAF_BINARY_MAGIC = b'CAFB'
+CAF_BINARY_VERSION = 1
+CAF_BINARY_HEADER_SIZE = 0x40
+CAF_BINARY_FLAG_POSITIONS = 0x01
+
+
+class CAFFileWriter:
+    """
+    Streams a CAF export to disk: the header as soon as the metadata is known,
+    then each batch of sampled frames, so memory stays bounded by one batch.
+    Writes go to <path>.tmp, renamed over <path> only once every frame is in.
+    Use as a context manager; an exception discards the partial file.
+    Subclasses write the format through the _write_header / _write_samples /
+    _write_footer hooks.
+    """
 
-def export_animation(context, armature, settings):
-    """Main export function. Returns status string or None on failure."""
+    mode = 'w'
+
+    def __init__(self, path, output):
+        self.path = path
+        self.output = output
+        self.frames_written = 0
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, self.mode)
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_frames(self, samples):
+        """Append (frames, bones, 7) samples."""
+        if len(samples):
+            self._write_samples(samples)
+            self.frames_written += len(samples)
+
+    def close(self):
+        if self.frames_written != self.output["frame_count"]:
+            self.abort()
+            raise ValueError(f"{self.frames_written} frames written, header says "
+                             f"{self.output['frame_count']}")
+        self._write_footer()
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def _write_header(self):
+        pass
+
+    def _write_samples(self, samples):
+        pass
+
+    def _write_footer(self):
+        pass
+
+
+class CAFJSONWriter(CAFFileWriter):
+    """
+    CAF JSON, byte-identical to json.dump(output, separators=(',', ':')) with
+    "data" as the last key. Values are rounded to 6 decimals to keep the text small.
+    """
+
+    def _write_header(self):
+        meta = {k: v for k, v in self.output.items() if k != "data"}
+        self._file.write(json.dumps(meta, separators=(',', ':'))[:-1] + ',"data":[')
+
+    def _write_samples(self, samples):
+        text = json.dumps(np.round(samples, 6).tolist(), separators=(',', ':'))[1:-1]
+        self._file.write(("," if self.frames_written else "") + text)
+
+    def _write_footer(self):
+        self._file.write("]}")
+
+
+class CAFBinaryWriter(CAFFileWriter):
+    """Binary CAF: header + bone table + metadata, then float32 frames as sampled."""
+
+    mode = 'wb'
+
+    def _write_header(self):
+        output = self.output
+        bone_table = bytearray()
+        for name in output["bones"]:
+            encoded = name.encode('utf-8')
+            bone_table += struct.pack('<H', len(encoded)) + encoded
+
+        meta_keys = ("source_app", "source_version", "source_coords", "action_name", "armature_name")
+        meta = json.dumps({k: output[k] for k in meta_keys}, separators=(',', ':')).encode('utf-8')
+
+        bone_table_offs = CAF_BINARY_HEADER_SIZE
+        meta_offs = bone_table_offs + len(bone_table)
+        frames_offs = (meta_offs + len(meta) + 15) & ~15
+
+        flags = CAF_BINARY_FLAG_POSITIONS if output["has_positions"] else 0
+        header = struct.pack(
+            '<4sIIIIIIiiIQQQ', CAF_BINARY_MAGIC, CAF_BINARY_VERSION, CAF_BINARY_HEADER_SIZE,
+            flags, output["bone_count"], output["frame_count"], output["fps"],
+            output["frame_start"], output["frame_end"], len(meta),
+            bone_table_offs, frames_offs, meta_offs)
+
+        self._file.write(header)
+        self._file.write(bone_table)
+        self._file.write(meta)
+        self._file.write(b'\0' * (frames_offs - meta_offs - len(meta)))
+
+    def _write_samples(self, samples):
+        self._file.write(np.ascontiguousarray(samples, dtype='<f4').tobytes())
+
+
+def export_animation(context, armature, settings, output_path=None, frame_range=None):
+    """Main export function. Returns status string or None on failure.
+    output_path and frame_range (start, end) override the panel settings.
+    """
 
     scene = context.scene
     depsgraph = context.evaluated_depsgraph_get()
 
     # Determine frame range
-    if settings.use_scene_range:
+    if frame_range is not None:
+        frame_start, frame_end = frame_range
+    elif settings.use_scene_range:
         frame_start = scene.frame_start
         frame_end = scene.frame_end
     else:
@@ -239,44 +498,7 @@ def export_animation(context, armature, settings):
 
     bone_names = [b["export_name"] for b in bones_to_export]
 
-    # Sample animation frame by frame
-    frames_data = []
-    original_frame = scene.frame_current
-
-    for frame_idx in range(frame_count):
-        frame = frame_start + frame_idx
-        scene.frame_set(frame)
-        depsgraph.update()
-
-        frame_bones = []
-        for bone_info in bones_to_export:
-            pose_bone = armature.pose.bones.get(bone_info["blender_name"])
-            if not pose_bone:
-                # Bone not found in pose — write identity
-                frame_bones.append([0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0])
-                continue
-
-            rot, loc = get_bone_local_transform(pose_bone)
-
-            # Export as [qx, qy, qz, qw, px, py, pz]
-            # (XYZW order to match RE Engine convention)
-            entry = [
-                round(rot.x, 6),
-                round(rot.y, 6),
-                round(rot.z, 6),
-                round(rot.w, 6),
-                round(loc.x, 6) if settings.export_position else 0.0,
-                round(loc.y, 6) if settings.export_position else 0.0,
-                round(loc.z, 6) if settings.export_position else 0.0,
-            ]
-            frame_bones.append(entry)
-
-        frames_data.append(frame_bones)
-
-    # Restore original frame
-    scene.frame_set(original_frame)
-
-    # Build JSON
+    # Metadata (the file header); frames are streamed after it
     action_name = ""
     if armature.animation_data and armature.animation_data.action:
         action_name = armature.animation_data.action.name
@@ -296,15 +518,40 @@ def export_animation(context, armature, settings):
         "bone_count": len(bone_names),
         "bones": bone_names,
         "has_positions": settings.export_position,
-        "data": frames_data,
     }
 
-    # Write file
-    output_path = bpy.path.abspath(settings.output_path)
+    output_path = bpy.path.abspath(output_path or settings.output_path)
+    binary = settings.export_format == 'BINARY'
+    if binary:
+        output_path = os.path.splitext(output_path)[0] + ".cafb"
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    with open(output_path, 'w') as f:
-        json.dump(output, f, separators=(',', ':'))
+    # Sample animation: per frame only the pose-bone matrices are copied out
+    # (one foreach_get), local transforms are solved per chunk of frames and
+    # the chunk is appended to the file.
+    # Rows are [qx, qy, qz, qw, px, py, pz] (XYZW order to match RE Engine)
+    bone_slots, parent_slots = pose_bone_slots(armature, bones_to_export)
+    pose_bones = armature.pose.bones
+    world = np.empty((min(max(frame_count, 0), SAMPLE_CHUNK_FRAMES), len(pose_bones) * 16),
+                     dtype=np.float32)
+    original_frame = scene.frame_current
+    writer_class = CAFBinaryWriter if binary else CAFJSONWriter
+
+    try:
+        with writer_class(output_path, output) as writer:
+            for chunk_start in range(0, frame_count, SAMPLE_CHUNK_FRAMES):
+                chunk = min(SAMPLE_CHUNK_FRAMES, frame_count - chunk_start)
+                for i in range(chunk):
+                    scene.frame_set(frame_start + chunk_start + i)
+                    depsgraph.update()
+                    pose_bones.foreach_get("matrix", world[i])
+                samples = local_transforms(world[:chunk], bone_slots, parent_slots)
+                if not settings.export_position:
+                    samples[..., 4:] = 0.0
+                writer.write_frames(samples)
+    finally:
+        # Restore original frame
+        scene.frame_set(original_frame)
 
     file_size = os.path.getsize(output_path)
     size_str = f"{file_size / 1024:.1f} KB" if file_size < 1048576 else f"{file_size / 1048576:.1f} MB"
@@ -313,10 +560,127 @@ def export_animation(context, armature, settings):
             f"{output_path} ({size_str})")
 
 
+def action_file_name(action_name):
+    """File stem for an action: characters unsafe in file names become '_'."""
+    return re.sub(r'[^\w.-]', '_', action_name) or "action"
+
+
+def export_actions(context, armature, settings, output_dir, pattern=None):
+    """
+    Export every action (sorted by name, optionally filtered by an fnmatch
+    pattern) to <output_dir>/<action>.json (or .cafb), each over its own
+    keyframe range, in this Blender session. The active action and the pose
+    are restored afterwards.
+    Returns one dict per action: action, path, frames, seconds and status
+    (export_animation's message, None on failure).
+    """
+    actions = sorted((a for a in bpy.data.actions
+                      if pattern is None or fnmatch.fnmatchcase(a.name, pattern)),
+                     key=lambda a: a.name)
+    if not actions:
+        return []
+
+    if armature.animation_data is None:
+        armature.animation_data_create()
+    anim_data = armature.animation_data
+    original_action = anim_data.action
+    original_pose = {pb.name: pb.matrix_basis.copy() for pb in armature.pose.bones}
+    extension = ".cafb" if settings.export_format == 'BINARY' else ".json"
+
+    results = []
+    try:
+        for action in actions:
+            # Channels the action does not key must not inherit the previous clip's pose
+            for pose_bone in armature.pose.bones:
+                pose_bone.matrix_basis = Matrix.Identity(4)
+            anim_data.action = action
+            start, end = (int(v) for v in action.frame_range)
+            path = os.path.join(output_dir, action_file_name(action.name) + extension)
+
+            t0 = time.perf_counter()
+            try:
+                status = export_animation(context, armature, settings, path, (start, end))
+            except Exception as e:
+                status = None
+                print(f"CAF: {action.name} failed: {type(e).__name__}: {e}")
+            results.append({
+                "action": action.name,
+                "path": path,
+                "frames": end - start + 1,
+                "seconds": time.perf_counter() - t0,
+                "status": status,
+            })
+    finally:
+        anim_data.action = original_action
+        for pose_bone in armature.pose.bones:
+            if pose_bone.name in original_pose:
+                pose_bone.matrix_basis = original_pose[pose_bone.name]
+        context.view_layer.update()
+
+    return results
+
+
+def format_action_summary(results):
+    """Per-action table: frames, export time, file size, status."""
+    lines = [f"{'Action':<32} {'Frames':>6} {'Size':>10} {'Time':>8}  Status"]
+    lines.append('-' * len(lines[0]))
+    for r in results:
+        size = os.path.getsize(r["path"]) if r["status"] and os.path.exists(r["path"]) else 0
+        size_str = f"{size / 1024:.1f} KB" if size < 1048576 else f"{size / 1048576:.1f} MB"
+        lines.append(f"{r['action']:<32} {r['frames']:>6} {size_str:>10} "
+                     f"{r['seconds']:>7.2f}s  {'ok' if r['status'] else 'FAILED'}")
+    total = sum(r["seconds"] for r in results)
+    ok = sum(1 for r in results if r["status"])
+    lines.append(f"{ok}/{len(results)} actions exported in {total:.2f} s")
+    return "\n".join(lines)
+
+
+def main(argv):
+    """Headless entry point: blender --background x.blend --python <this file> -- [options]"""
+    parser = argparse.ArgumentParser(
+        prog="blender --background <file.blend> --python blender_anim_exporter.py --",
+        description="Export all actions of an armature as CAF files in one Blender session",
+    )
+    parser.add_argument("--output-dir", required=True, help="Folder for <action>.json / .cafb files")
+    parser.add_argument("--filter", default=None, help="Only actions matching this pattern (e.g. 'dodge_*')")
+    parser.add_argument("--armature", default=None, help="Armature object name (default: first armature)")
+    parser.add_argument("--binary", action="store_true", help="Write binary CAF (.cafb) instead of JSON")
+    parser.add_argument("--fps", type=int, default=0, help="FPS written to the files (default: scene FPS)")
+    parser.add_argument("--no-positions", action="store_true", help="Skip bone positions")
+    parser.add_argument("--deform-only", action="store_true", help="Only export deform bones")
+    parser.add_argument("--strip-prefix", default="", help="Remove this prefix from bone names")
+    args = parser.parse_args(argv)
+
+    armatures = [obj for obj in bpy.data.objects if obj.type == 'ARMATURE'
+                 and (args.armature is None or obj.name == args.armature)]
+    if not armatures:
+        print("ERROR: No armature found" + (f" named {args.armature}" if args.armature else ""))
+        sys.exit(1)
+    armature = armatures[0]
+
+    context = bpy.context
+    settings = context.scene.caf_export_settings
+    settings.export_format = 'BINARY' if args.binary else 'JSON'
+    settings.fps_override = args.fps
+    settings.export_position = not args.no_positions
+    settings.only_deform_bones = args.deform_only
+    settings.bone_prefix_strip = args.strip_prefix
+
+    results = export_actions(context, armature, settings, os.path.abspath(args.output_dir),
+                             args.filter)
+    if not results:
+        print("No actions match" + (f" {args.filter}" if args.filter else ""))
+        sys.exit(1)
+    print(format_action_summary(results))
+    if any(r["status"] is None for r in results):
+        sys.exit(1)
+
+
 # Registration
 classes = (
     CAF_ExportSettings,
     CAF_OT_ExportAnimation,
+    CAF_OT_ExportAllActions,
     CAF_OT_SetRangeFromAction,
     CAF_PT_ExportPanel,
 )
@@ -336,3 +700,6 @@ def unregister():
 
 if __name__ == "__main__":
     register()
+    # Arguments after "--" on the Blender command line select the headless batch export
+    if "--" in sys.argv:
+        main(sys.argv[sys.argv.index("--") + 1:])
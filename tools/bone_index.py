@@ -0,0 +1,193 @@
+"""
+Persistent bone mapping index for reference .motlist.85 files.
+Records {bone_hash -> bone_index} for every mot entry of a reference motlist
+in a small JSON file, keyed by the motlist's absolute path, size and mtime,
+so conversions against large game motlists only parse each reference once.
+A changed or moved reference is rescanned automatically.
+
+Several references can be merged into one skeleton map (e.g. a body motlist
+plus a face or weapon motlist); the first file/entry listed wins when a hash
+maps to different indices, and such conflicts are reported.
+
+Usage:
+    python bone_index.py <ref.motlist.85> [...] [--entries] [--index <path>]
+
+Usage (library):
+    from bone_index import reference_bone_mapping
+    hash_to_idx = reference_bone_mapping(["pl0000.motlist.85", "face.motlist.85"])
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+from typing import Dict, List, Optional, Tuple, Union
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pipeline_profiler import profiled, profile_count
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'caf', 'bone_index.json')
+INDEX_FORMAT_VERSION = 1
+
+BoneMap = Dict[int, int]
+References = Union[None, str, List[str]]
+
+
+def reference_paths(refs: References) -> List[str]:
+    """Normalize None / one path / a list of paths to existing files."""
+    if not refs:
+        return []
+    if isinstance(refs, str):
+        refs = [refs]
+    return [p for p in refs if p and os.path.exists(p)]
+
+
+def scan_motlist_bones(path: str) -> List[Tuple[str, BoneMap]]:
+    """(entry name, {bone_hash -> bone_index}) for every mot entry of a motlist."""
+    from motlist_reader import MotlistFile
+
+    with MotlistFile(path) as ml:
+        if not ml.is_motlist:
+            raise ValueError(f"Not a motlist file: magic={ml.magic!r}")
+        return [(entry.name, {clip.bone_hash: clip.bone_index for clip in entry.bone_clips})
+                for entry in ml.entries if entry.is_mot]
+
+
+def merge_bone_maps(maps: List[BoneMap]) -> Tuple[BoneMap, Dict[int, List[int]]]:
+    """Merge bone maps in order; earlier maps win.
+
+    Returns:
+        (merged map, conflicts) where conflicts maps a bone hash to all the
+        distinct indices it was given, first (kept) index first.
+    """
+    merged: BoneMap = {}
+    conflicts: Dict[int, List[int]] = {}
+    for bone_map in maps:
+        for h, idx in bone_map.items():
+            kept = merged.setdefault(h, idx)
+            if kept != idx:
+                seen = conflicts.setdefault(h, [kept])
+                if idx not in seen:
+                    seen.append(idx)
+    return merged, conflicts
+
+
+class BoneIndex:
+    """JSON-backed index of per-entry bone maps, one record per reference file."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_INDEX_PATH):
+        self.path = path
+        self.scanned = 0  # references (re)parsed by this object
+        self._records: Dict[str, dict] = {}
+        self._dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_FORMAT_VERSION:
+                    self._records = data.get('files', {})
+            except (OSError, ValueError):
+                self._records = {}  # Unreadable index: rebuild it
+
+    def entry_maps(self, motlist_path: str) -> List[Tuple[str, BoneMap]]:
+        """Per-entry bone maps of one reference, rescanned if its size/mtime changed."""
+        key = os.path.abspath(motlist_path)
+        st = os.stat(key)
+        record = self._records.get(key)
+        if record is None or record['size'] != st.st_size or record['mtime_ns'] != st.st_mtime_ns:
+            entries = scan_motlist_bones(key)
+            self.scanned += 1
+            record = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'entries': [[name, {str(h): idx for h, idx in bones.items()}]
+                            for name, bones in entries],
+            }
+            self._records[key] = record
+            self._dirty = True
+        return [(name, {int(h): idx for h, idx in bones.items()})
+                for name, bones in record['entries']]
+
+    def skeleton_map(self, refs: References) -> Tuple[BoneMap, Dict[int, List[int]]]:
+        """Merged map over all entries of all references, in the order given."""
+        maps = []
+        for path in reference_paths(refs):
+            maps.extend(bones for _, bones in self.entry_maps(path))
+        return merge_bone_maps(maps)
+
+    def save(self) -> None:
+        """Write the index if anything was (re)scanned. Failures are ignored:
+        the index is only a cache.
+        """
+        if not self._dirty or not self.path:
+            return
+        try:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(folder, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_FORMAT_VERSION, 'files': self._records}, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+@profiled('bone mapping')
+def reference_bone_mapping(
+    refs: References,
+    index_path: Optional[str] = DEFAULT_INDEX_PATH,
+) -> Optional[BoneMap]:
+    """{bone_hash -> bone_index} merged over all entries of the given
+    reference motlist(s), via the persistent index. None if no reference exists.
+    """
+    if not reference_paths(refs):
+        return None
+    index = BoneIndex(index_path)
+    merged, _ = index.skeleton_map(refs)
+    index.save()
+    profile_count(bones=len(merged))
+    return merged
+
+
+def main():
+    from mot_writer import get_bone_name_for_hash
+
+    parser = argparse.ArgumentParser(
+        description="Index reference .motlist.85 bone mappings and print the merged skeleton map")
+    parser.add_argument("refs", nargs='+', help="Reference .motlist.85 files (earlier ones win)")
+    parser.add_argument("--entries", action="store_true", help="Also list bone counts per entry")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH,
+                        help=f"Index file (default: {DEFAULT_INDEX_PATH})")
+    args = parser.parse_args()
+
+    missing = [p for p in args.refs if not os.path.exists(p)]
+    if missing:
+        print(f"Not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    index = BoneIndex(args.index)
+    if args.entries:
+        for path in args.refs:
+            entries = index.entry_maps(path)
+            print(f"{path}: {len(entries)} entries")
+            for i, (name, bones) in enumerate(entries):
+                print(f"  [{i:3d}] {name:<40} {len(bones):4d} bones")
+    merged, conflicts = index.skeleton_map(args.refs)
+    index.save()
+
+    print(f"Merged skeleton map: {len(merged)} bones from {len(args.refs)} file(s) "
+          f"({index.scanned} parsed, {len(args.refs) - index.scanned} from {args.index})")
+    for h, idx in sorted(merged.items(), key=lambda x: x[1]):
+        name = get_bone_name_for_hash(h)
+        print(f"  [{idx:3d}] 0x{h:08X} {name or '(unknown)'}")
+    if conflicts:
+        print(f"\n{len(conflicts)} conflicting hashes (first index kept):")
+        for h, indices in sorted(conflicts.items()):
+            print(f"  0x{h:08X} {get_bone_name_for_hash(h) or '(unknown)'}: "
+                  f"{', '.join(str(i) for i in indices)}")
+
+
+if __name__ == '__main__':
+    main()
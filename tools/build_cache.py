@@ -0,0 +1,193 @@
+"""
+Incremental build cache for the CAF motlist converters.
+Stores finished .motlist.85 outputs and per-bone encoded tracks on disk, keyed
+by a SHA-256 content hash, so re-running a conversion with unchanged inputs
+just copies the cached file, and a capture where only some bones changed only
+re-reduces and re-encodes those bones.
+
+Keys cover the input file bytes, every conversion option, the reference
+motlist bytes and the tool version (a hash of the converter sources), so
+editing any of them invalidates the affected entries. Stale entries are never
+read again; delete the cache directory to reclaim space.
+
+Layout:
+    <root>/outputs/<k[:2]>/<key>.rec   whole motlist + status metadata
+    <root>/bones/<k[:2]>/<key>.rec     one bone: encoded tracks + report rows
+
+Each .rec file is a u32 metadata length, UTF-8 JSON metadata, then the
+concatenated binary blobs whose lengths the metadata lists.
+
+Usage (library):
+    from build_cache import BuildCache
+    cache = BuildCache(".caf_cache")
+    key = cache.key('dump', cache.file_digest("dodge_front.txt"), options)
+"""
+
+import os
+import json
+import struct
+import hashlib
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Sources whose code determines converter output
+_TOOL_SOURCES = ('mot_writer.py', 'dump_to_motlist.py', 'key_reduction.py', 'resample.py',
+                 'unpack_optimizer.py', 'caf_json_reader.py', 'preprocess.py',
+                 'bone_index.py', 'motlist_reader.py', 'build_cache.py')
+
+
+@lru_cache(maxsize=None)
+def tool_version() -> str:
+    """SHA-256 over the converter sources; changes whenever the tools do."""
+    h = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _TOOL_SOURCES:
+        path = os.path.join(here, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                h.update(name.encode() + b'\0' + f.read())
+    return h.hexdigest()
+
+
+def _feed(h, part: Any) -> None:
+    """Hash one key part, tagged by type so e.g. 1 and '1' differ."""
+    if part is None:
+        h.update(b'N')
+    elif isinstance(part, (bytes, bytearray, memoryview)):
+        h.update(b'B%d:' % len(part))
+        h.update(part)
+    elif isinstance(part, np.ndarray):
+        part = np.ascontiguousarray(part)
+        h.update(f"A{part.dtype.str}{part.shape}:".encode())
+        h.update(part.data)
+    elif isinstance(part, (list, tuple)):
+        h.update(b'L%d:' % len(part))
+        for p in part:
+            _feed(h, p)
+    else:
+        text = json.dumps(part, sort_keys=True)
+        h.update(b'J%d:' % len(text))
+        h.update(text.encode())
+
+
+class BuildCache:
+    """On-disk content-addressed cache. Safe to share between worker processes:
+    records are written to a temp file and renamed into place.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def key(self, *parts: Any) -> str:
+        """SHA-256 of the tool version plus all parts (bytes, arrays, JSON values)."""
+        h = hashlib.sha256()
+        _feed(h, tool_version())
+        for part in parts:
+            _feed(h, part)
+        return h.hexdigest()
+
+    def file_digest(self, path: Optional[str]) -> Optional[str]:
+        """SHA-256 of a file's bytes (None for no/missing file), memoized per
+        (path, size, mtime) for the life of this cache object.
+        """
+        if not path or not os.path.exists(path):
+            return None
+        st = os.stat(path)
+        memo = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self._digests.get(memo)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+            digest = self._digests[memo] = h.hexdigest()
+        return digest
+
+    # --- Record files ---
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.root, kind, key[:2], key + '.rec')
+
+    def _read(self, kind: str, key: str) -> Optional[Tuple[Dict[str, Any], List[bytes]]]:
+        try:
+            with open(self._path(kind, key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        meta_len = struct.unpack_from('<I', data, 0)[0]
+        meta = json.loads(data[4:4 + meta_len].decode('utf-8'))
+        blobs = []
+        pos = 4 + meta_len
+        for size in meta['blob_sizes']:
+            blobs.append(data[pos:pos + size])
+            pos += size
+        self.hits += 1
+        return meta, blobs
+
+    def _write(self, kind: str, key: str, meta: Dict[str, Any], blobs: List[bytes]) -> None:
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = dict(meta, blob_sizes=[len(b) for b in blobs])
+        meta_bytes = json.dumps(meta).encode('utf-8')
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(struct.pack('<I', len(meta_bytes)))
+                f.write(meta_bytes)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    # --- Whole outputs ---
+
+    def get_output(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """(motlist bytes, info) stored by put_output, or None."""
+        record = self._read('outputs', key)
+        if record is None:
+            return None
+        meta, blobs = record
+        return blobs[0], meta['info']
+
+    def put_output(self, key: str, motlist: bytes, info: Dict[str, Any]) -> None:
+        self._write('outputs', key, {'info': info}, [motlist])
+
+    # --- Per-bone encoded tracks ---
+
+    def get_bone(self, key: str) -> Optional[Dict[str, Any]]:
+        """A bone stored by put_bone: encode_bone_tracks fields plus 'reports'."""
+        record = self._read('bones', key)
+        if record is None:
+            return None
+        meta, blobs = record
+        blobs = iter(blobs)
+        for track in meta['tracks']:
+            track['frame_data'] = np.frombuffer(next(blobs), dtype=track.pop('frame_dtype')).reshape(
+                track['key_count'], -1)
+            track['unpack'] = np.frombuffer(next(blobs), dtype='<f4') if track.pop('has_unpack') else None
+            track['frame_indices'] = np.frombuffer(next(blobs), dtype='<i2')
+        return meta
+
+    def put_bone(self, key: str, encoded_bone: Dict[str, Any]) -> None:
+        """Store one encode_bone_tracks bone dict (extra JSON fields are kept)."""
+        meta = {k: v for k, v in encoded_bone.items() if k != 'tracks'}
+        meta['tracks'] = []
+        blobs = []
+        for track in encoded_bone['tracks']:
+            meta['tracks'].append({'flags': track['flags'], 'key_count': track['key_count'],
+                                   'frame_dtype': track['frame_data'].dtype.str,
+                                   'has_unpack': track['unpack'] is not None})
+            blobs.append(track['frame_data'].tobytes())
+            if track['unpack'] is not None:
+                blobs.append(np.asarray(track['unpack'], dtype='<f4').tobytes())
+            blobs.append(np.asarray(track['frame_indices']).astype('<i2').tobytes())
+        self._write('bones', key, meta, blobs)
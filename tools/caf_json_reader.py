@@ -0,0 +1,160 @@
+"""
+Incremental CAF JSON reader for large Blender exports.
+json.load on a CAF_AnimData file builds a nested Python list holding a float
+object per channel of every bone and frame, several times the size of the
+file itself. This reader instead scans the file in fixed-size text chunks:
+
+  - Header fields (format, fps, frame_count, bones, ...) are decoded as
+    they come, whatever their order in the object
+  - The "data" array is decoded one frame at a time and copied straight into
+    a per-bone columnar float32 buffer (bones, frames, 7), preallocated from
+    frame_count when the header precedes the data (as the exporter writes
+    it) and grown by doubling otherwise
+
+Peak memory is the float32 buffer plus one text chunk, and the returned dict
+matches load_caf_binary: 'data' is a (frames, bones, 7) float32 view of the
+columnar buffer.
+
+Usage (library):
+    from caf_json_reader import read_caf_json
+    anim = read_caf_json("long_export.json")
+    anim['data'].shape   # (frames, bones, 7)
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+CHUNK_CHARS = 1 << 20
+CHANNELS = 7
+_WHITESPACE = ' \t\n\r'
+# A decode error this far before the end of the buffer cannot be a token cut
+# by the chunk end (longest non-string token: a number, literal or \u escape)
+_MAX_CUT_TOKEN = 64
+
+
+class _TextStream:
+    """Buffered text with JSON value decoding across chunk boundaries."""
+
+    def __init__(self, f, chunk_chars: int = CHUNK_CHARS):
+        self.f = f
+        self.chunk_chars = chunk_chars
+        self.buf = ''
+        self.pos = 0
+        self.offset = 0     # file position (in characters) of buf[0]
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_chars)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file), not consumed."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"Malformed CAF JSON: expected {chars!r}, got {c or 'end of file'!r}")
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        """Decode the next JSON value. A value must be followed by at least one
+        more character (or end of file), so a number cut at the chunk end is
+        never accepted. A decode error is only retried with more text when it
+        may come from a token cut by the chunk end (an unterminated string or
+        an error near the end of the buffer); otherwise it is raised at once
+        with its position in the file.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof or (e.pos + _MAX_CUT_TOKEN < len(self.buf)
+                                 and not e.msg.startswith('Unterminated string')):
+                    raise ValueError(f"Malformed CAF JSON: {e.msg} "
+                                     f"at character {self.offset + e.pos}") from None
+            self._fill()
+
+
+def _read_frames(stream: _TextStream, frame_count: Optional[int]) -> np.ndarray:
+    """Decode the "data" array into a (bones, frames, 7) float32 buffer."""
+    stream.expect('[')
+    tracks = None
+    frames = 0
+    if stream.peek() == ']':
+        stream.pos += 1
+        return np.zeros((0, 0, CHANNELS), dtype=np.float32)
+
+    while True:
+        frame = np.asarray(stream.value(), dtype=np.float32)
+        if frame.ndim != 2 or frame.shape[1] < CHANNELS:
+            raise ValueError(f"CAF frame {frames} must be bones x {CHANNELS}, got shape {frame.shape}")
+        if tracks is None:
+            capacity = frame_count if frame_count and frame_count > 0 else 64
+            tracks = np.empty((len(frame), capacity, CHANNELS), dtype=np.float32)
+        elif len(frame) != len(tracks):
+            raise ValueError(f"CAF frame {frames} has {len(frame)} bones, frame 0 has {len(tracks)}")
+        if frames == tracks.shape[1]:
+            grown = np.empty((len(tracks), tracks.shape[1] * 2, CHANNELS), dtype=np.float32)
+            grown[:, :frames] = tracks
+            tracks = grown
+        tracks[:, frames] = frame[:, :CHANNELS]
+        frames += 1
+        if stream.expect(',]') == ']':
+            return tracks[:, :frames]
+
+
+def read_caf_json(path: str, chunk_chars: int = CHUNK_CHARS) -> Dict[str, Any]:
+    """Stream a CAF JSON file into the load_caf_binary dict layout.
+
+    Every top-level field is kept as decoded except 'data', which becomes a
+    float32 (frames, bones, 7) array (a view of per-bone columnar storage).
+    Format and required fields are validated as in load_caf_json.
+    """
+    header: Dict[str, Any] = {}
+    tracks = None
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _TextStream(f, chunk_chars)
+        stream.expect('{')
+        if stream.peek() == '}':
+            stream.pos += 1
+        else:
+            while True:
+                key = stream.value()
+                stream.expect(':')
+                if key == 'data':
+                    tracks = _read_frames(stream, header.get('frame_count'))
+                else:
+                    header[key] = stream.value()
+                    if key == 'format' and header[key] != 'CAF_AnimData':
+                        break
+                if stream.expect(',}') == '}':
+                    break
+
+    if header.get('format') != 'CAF_AnimData':
+        raise ValueError(f"Not a CAF_AnimData file: format={header.get('format')}")
+    if tracks is not None:
+        header['data'] = tracks.transpose(1, 0, 2)
+    return header
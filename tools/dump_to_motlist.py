@@ -5,18 +5,28 @@ and produces a native RE2 animation file.
 
 Usage:
     python dump_to_motlist.py <dump_file> <output.motlist.85> [--ref <ref.motlist.85>]
+                              [--cache-dir <dir>] [--target-fps <n>] [--target-frames <n>]
+                              [--profile] [--profile-trace <trace.json>]
 """
 
 import sys
 import os
 import argparse
 
+import numpy as np
+
 # Add tools dir to path for mot_writer import
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from mot_writer import (
-    build_mot_entry, build_motlist, extract_bone_mapping,
-    bone_name_hash, RE2_PLAYER_BONE_NAMES, validate_motlist
+    assemble_mot_entry, encode_mot_bones, build_motlist,
+    hash_names, resolve_bone_indices, RE2_PLAYER_BONE_NAMES, validate_motlist,
+    format_encoding_report,
 )
+from key_reduction import format_reduction_stats
+from bone_index import reference_bone_mapping, reference_paths
+from resample import resample_clip, resample_error, resample_times, format_resample_report
+from preprocess import preprocess_tracks
+from pipeline_profiler import Profiler, profiled, profile_count, profile_stage, report_profile
 
 
 def parse_dodge_dump(path):
@@ -66,92 +76,163 @@ def parse_dodge_dump(path):
     return bone_names, frame_count, frames_data
 
 
-def dump_to_motlist(
-    dump_path,
-    output_path,
-    reference_motlist=None,
-    motion_name=None,
-    include_positions=True,
-    compressed=True,
-    frame_rate=60,
-):
-    """Convert a dodge dump file to .motlist.85."""
+IDENTITY_TRANSFORM = (0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
 
-    bone_names, frame_count, frames_data = parse_dodge_dump(dump_path)
-    actual_frame_count = len(frames_data)
+# Bone lines whose values are converted and stored in one go
+PARSE_BLOCK_LINES = 4096
 
-    if motion_name is None:
-        base = os.path.splitext(os.path.basename(dump_path))[0]
-        motion_name = base.replace(" ", "_")
 
-    print(f"Dump: {len(bone_names)} bones, {actual_frame_count} frames "
-          f"(header says {frame_count})")
+@profiled('parse')
+def parse_dodge_dump_columnar(path):
+    """Stream a dodge dump in a single pass into per-bone columnar arrays.
+    Returns: (bone_names, frame_count, tracks)
+    where tracks is a float32 array shaped (bones, frames, 7) indexed by the
+    BONE| header order, tracks[b, f] = (qx, qy, qz, qw, px, py, pz).
+    Bones missing from a frame keep the identity transform. Storage is sized
+    from FRAME_COUNT and grown only if the dump holds more frames than that.
+    Values are gathered as text for up to PARSE_BLOCK_LINES bone lines, then
+    converted by float() and scattered into the tracks in one assignment.
+    """
+    bone_names = []
+    bone_slot = {}
+    frame_count = 0
+    tracks = None
+    frame_idx = -1
+    block_slots, block_frames, block_values = [], [], []
+
+    def flush():
+        if block_slots:
+            values = np.fromiter(map(float, block_values), np.float32, len(block_values))
+            tracks[block_slots, block_frames] = values.reshape(-1, 7)
+            block_slots.clear()
+            block_frames.clear()
+            block_values.clear()
 
-    # Build bone index mapping
-    bone_index_map = {}
-    if reference_motlist and os.path.exists(reference_motlist):
-        hash_to_idx = extract_bone_mapping(reference_motlist)
-        for name in bone_names:
-            h = bone_name_hash(name)
-            if h in hash_to_idx:
-                bone_index_map[name] = hash_to_idx[h]
-        print(f"Mapped {len(bone_index_map)}/{len(bone_names)} bones from reference")
-
-    # Fallback: sequential indices for unmapped
-    next_idx = max(bone_index_map.values(), default=-1) + 1
-    for name in bone_names:
-        if name not in bone_index_map:
-            bone_index_map[name] = next_idx
-            next_idx += 1
+    with open(path, 'r') as f:
+        for line in f:
+            if line.startswith("T|"):
+                # float() ignores the line ending left on the last field
+                parts = line.split("|")
+                slot = bone_slot.get(parts[1])
+                if slot is not None and frame_idx >= 0:
+                    block_slots.append(slot)
+                    block_frames.append(frame_idx)
+                    block_values.extend(parts[2:9])
+                continue
 
+            line = line.strip()
+            if line.startswith("BONE|"):
+                name = line.split("|", 1)[1]
+                bone_slot[name] = len(bone_names)
+                bone_names.append(name)
+
+            elif line.startswith("FRAME_COUNT="):
+                frame_count = int(line.split("=")[1])
+
+            elif line.startswith("FRAME="):
+                if len(block_slots) >= PARSE_BLOCK_LINES:
+                    flush()
+                frame_idx += 1
+                if tracks is None:
+                    tracks = _alloc_identity(len(bone_names), max(frame_count, 1))
+                elif frame_idx >= tracks.shape[1]:
+                    flush()
+                    grown = _alloc_identity(len(bone_names), tracks.shape[1] * 2)
+                    grown[:, :tracks.shape[1]] = tracks
+                    tracks = grown
+    flush()
+
+    actual_frames = frame_idx + 1
+    if tracks is None:
+        tracks = _alloc_identity(len(bone_names), 0)
+    profile_count(bones=len(bone_names), frames=actual_frames)
+    return bone_names, frame_count, tracks[:, :actual_frames]
+
+
+def _alloc_identity(bone_count, frame_capacity):
+    tracks = np.zeros((bone_count, frame_capacity, 7), dtype=np.float32)
+    tracks[:, :, 3] = 1.0
+    return tracks
+
+
+def map_bone_indices(bone_names, reference_motlist=None, hash_to_idx=None):
+    """Map dump bone names to RE2 bone indices.
+    hash_to_idx (from bone_index.reference_bone_mapping) is read from
+    reference_motlist (a path or list of paths) unless given, so callers
+    converting many dumps can extract it once.
+    Returns: (bone_index_map, mapped_count) where mapped_count bones came from
+    the reference and the rest got sequential indices after them.
+    """
+    if hash_to_idx is None:
+        hash_to_idx = reference_bone_mapping(reference_motlist)
+    mapped_count = 0
+    if hash_to_idx:
+        mapped_count = sum(h in hash_to_idx for h in hash_names(bone_names))
+    return resolve_bone_indices(bone_names, hash_to_idx), mapped_count
+
+
+def build_dump_mot_entry(
+    bone_names,
+    tracks,
+    motion_name,
+    bone_index_map,
+    include_positions=True,
+    compressed=True,
+    frame_rate=60,
+    rot_tolerance_deg=None,
+    pos_tolerance=None,
+    max_rot_error_deg=None,
+    max_pos_error=None,
+    cache=None,
+    target_fps=None,
+    target_frames=None,
+    position_interp='linear',
+    optimize_4bpk=False,
+    experimental_pos_encodings=False,
+):
+    """Build one mot entry from columnar dump tracks (bones, frames, 7).
+    Rotations are normalized and made sign-continuous first (preprocess.py).
+    cache: optional build_cache.BuildCache for per-bone track reuse.
+    target_fps / target_frames resample the capture first (resample.py).
+    optimize_4bpk searches 4bpk unpack parameters (unpack_optimizer.py).
+    experimental_pos_encodings lets max_pos_error pick the 16-bit axis
+    position encodings (key layout not verified in game).
+    Returns: (mot_entry bytes, bone count written)
+    """
     # Skip non-animation bones (cam_root, light_*, setProp_*)
     skip_prefixes = ("cam_root", "light_", "setProp_")
+    slots = [slot for slot, name in enumerate(bone_names)
+             if not any(name.startswith(p) for p in skip_prefixes)]
+
+    # Normalize and fix quaternion sign flips (q and -q are the same rotation,
+    # but the engine interpolates between consecutive frames, so a flip swings
+    # the bone the long way round), all bones in one pass
+    quats, positions, flips = preprocess_tracks(np.transpose(tracks, (1, 0, 2)))
+    sign_fix_count = int(flips[slots].sum())
+
+    # Optional frame-rate / length conversion, all bones in one pass
+    if (target_fps is not None or target_frames is not None) and len(quats):
+        src_quats, src_positions = quats, positions if include_positions else None
+        quats, positions, out_fps, t = resample_clip(
+            src_quats, src_positions, frame_rate, target_fps, target_frames, position_interp)
+        rot_err, pos_err = resample_error(src_quats, src_positions, quats, positions, t)
+        print(format_resample_report(len(src_quats), frame_rate, len(quats), out_fps,
+                                     rot_err, pos_err))
+        frame_rate = int(round(out_fps))
+
+    frame_count = len(quats)
 
     # Build bone data for mot_writer
     bones = []
-    sign_fix_count = 0
-    for name in bone_names:
-        if any(name.startswith(p) for p in skip_prefixes):
-            continue
-
-        rotations = []
-        positions = []
-
-        for frame_idx in range(actual_frame_count):
-            frame = frames_data[frame_idx]
-            if name not in frame:
-                # Identity fallback
-                rotations.append((0.0, 0.0, 0.0, 1.0))
-                if include_positions:
-                    positions.append((0.0, 0.0, 0.0))
-                continue
-
-            data = frame[name]
-            qx, qy, qz, qw = data[0], data[1], data[2], data[3]
-            px, py, pz = data[4], data[5], data[6]
-
-            # Fix quaternion sign flips: q and -q are the same rotation, but
-            # the engine interpolates between consecutive frames, so sign flips
-            # cause the bone to swing wildly through the wrong path.
-            # Ensure dot(prev, cur) >= 0 by negating if needed.
-            if rotations:
-                prev = rotations[-1]
-                dot = prev[0]*qx + prev[1]*qy + prev[2]*qz + prev[3]*qw
-                if dot < 0:
-                    qx, qy, qz, qw = -qx, -qy, -qz, -qw
-                    sign_fix_count += 1
-
-            rotations.append((qx, qy, qz, qw))
-            if include_positions:
-                positions.append((px, py, pz))
-
+    for slot in slots:
+        name = bone_names[slot]
         bone_entry = {
             'name': name,
             'index': bone_index_map.get(name, 0),
-            'rotations': rotations,
+            'rotations': quats[:, slot],
         }
-        if include_positions and positions:
-            bone_entry['positions'] = positions
+        if include_positions and frame_count:
+            bone_entry['positions'] = positions[:, slot]
 
         bones.append(bone_entry)
 
@@ -161,32 +242,133 @@ def dump_to_motlist(
     # Sort by bone index (required for proper engine matching)
     bones.sort(key=lambda b: b['index'])
 
-    print(f"Building mot entry: {len(bones)} bones, {actual_frame_count} frames")
+    # Optional error-bounded key reduction (sparse frame index arrays) and
+    # adaptive per-track encoding
+    encoded, report = encode_mot_bones(
+        bones, compressed, rot_tolerance_deg, pos_tolerance, max_rot_error_deg,
+        max_pos_error if include_positions else None, optimize_4bpk, cache=cache,
+        experimental_pos_encodings=experimental_pos_encodings)
+    if report['reduction'] is not None:
+        print(f"Key reduction: {format_reduction_stats(report['reduction'])}")
+    if report['rot_encodings'] is not None:
+        print(format_encoding_report(report['rot_encodings']))
+    if report['pos_encodings'] is not None:
+        print(format_encoding_report(report['pos_encodings'], "Position", "dist"))
+    if cache is not None:
+        print(f"Build cache: {report['cached']}/{len(bones)} bones reused")
 
-    # Build mot entry
-    mot_entry = build_mot_entry(
-        motion_name=motion_name,
-        frame_count=actual_frame_count,
-        frame_rate=frame_rate,
-        bones=bones,
+    print(f"Building mot entry: {len(bones)} bones, {frame_count} frames")
+
+    mot_entry = assemble_mot_entry(motion_name, frame_count, frame_rate, encoded)
+    return mot_entry, len(bones)
+
+
+@profiled('convert')
+def dump_to_motlist(
+    dump_path,
+    output_path,
+    reference_motlist=None,
+    motion_name=None,
+    include_positions=True,
+    compressed=True,
+    frame_rate=60,
+    rot_tolerance_deg=None,
+    pos_tolerance=None,
+    max_rot_error_deg=None,
+    max_pos_error=None,
+    cache_dir=None,
+    target_fps=None,
+    target_frames=None,
+    position_interp='linear',
+    optimize_4bpk=False,
+    experimental_pos_encodings=False,
+):
+    """Convert a dodge dump file to .motlist.85.
+    With cache_dir, an unchanged dump/options/reference/tool version reuses the
+    previous output, and otherwise unchanged bones reuse their encoded tracks.
+    """
+
+    if motion_name is None:
+        base = os.path.splitext(os.path.basename(dump_path))[0]
+        motion_name = base.replace(" ", "_")
+
+    cache = output_key = None
+    if cache_dir:
+        from build_cache import BuildCache
+        cache = BuildCache(cache_dir)
+        output_key = cache.key(
+            'dump', cache.file_digest(dump_path),
+            [cache.file_digest(p) for p in reference_paths(reference_motlist)],
+            [motion_name, include_positions, compressed, frame_rate, rot_tolerance_deg,
+             pos_tolerance, max_rot_error_deg, max_pos_error, target_fps, target_frames,
+             position_interp, optimize_4bpk, experimental_pos_encodings])
+        cached = cache.get_output(output_key)
+        if cached is not None:
+            motlist, info = cached
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(output_path, 'wb') as f:
+                f.write(motlist)
+            print(f"Wrote {output_path} ({len(motlist) / 1024:.1f} KB, unchanged: build cache hit)")
+            print(f"  {info['bone_count']} bones, {info['frame_count']} frames @ {info['fps']}fps")
+            return output_path
+
+    bone_names, frame_count, tracks = parse_dodge_dump_columnar(dump_path)
+    actual_frame_count = tracks.shape[1]
+
+    print(f"Dump: {len(bone_names)} bones, {actual_frame_count} frames "
+          f"(header says {frame_count})")
+
+    # Build bone index mapping
+    bone_index_map, mapped_count = map_bone_indices(bone_names, reference_motlist)
+    if reference_paths(reference_motlist):
+        print(f"Mapped {mapped_count}/{len(bone_names)} bones from reference")
+
+    mot_entry, bone_count = build_dump_mot_entry(
+        bone_names, tracks, motion_name, bone_index_map,
+        include_positions=include_positions,
         compressed=compressed,
+        frame_rate=frame_rate,
+        rot_tolerance_deg=rot_tolerance_deg,
+        pos_tolerance=pos_tolerance,
+        max_rot_error_deg=max_rot_error_deg,
+        max_pos_error=max_pos_error,
+        cache=cache,
+        target_fps=target_fps,
+        target_frames=target_frames,
+        position_interp=position_interp,
+        optimize_4bpk=optimize_4bpk,
+        experimental_pos_encodings=experimental_pos_encodings,
     )
+    if target_fps is not None or target_frames is not None:
+        t, out_fps = resample_times(actual_frame_count, frame_rate, target_fps, target_frames)
+        actual_frame_count, frame_rate = len(t), int(round(out_fps))
 
     # Build motlist
     motlist = build_motlist(
         motlist_name=motion_name,
         mot_entries=[mot_entry],
     )
+    if cache is not None:
+        cache.put_output(output_key, motlist,
+                         {'bone_count': bone_count, 'frame_count': actual_frame_count,
+                          'fps': frame_rate})
 
     # Write
     os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-    with open(output_path, 'wb') as f:
-        f.write(motlist)
+    with profile_stage('write', bytes=len(motlist)):
+        with open(output_path, 'wb') as f:
+            f.write(motlist)
 
     size_kb = len(motlist) / 1024
     print(f"Wrote {output_path} ({size_kb:.1f} KB)")
-    print(f"  {len(bones)} bones, {actual_frame_count} frames @ {frame_rate}fps")
-    print(f"  Compression: {'4 bpk' if compressed else 'uncompressed'}")
+    print(f"  {bone_count} bones, {actual_frame_count} frames @ {frame_rate}fps")
+    if max_rot_error_deg is not None:
+        compression = f"adaptive (max {max_rot_error_deg} deg error)"
+    else:
+        compression = '4 bpk' if compressed else 'uncompressed'
+    if optimize_4bpk and (compressed or max_rot_error_deg is not None):
+        compression += ", optimized 4bpk unpack"
+    print(f"  Compression: {compression}")
     print(f"  Positions: {'yes' if include_positions else 'no'}")
 
     return output_path
@@ -198,15 +380,48 @@ def main():
     )
     parser.add_argument("dump", help="Input dodge dump .txt file")
     parser.add_argument("output", help="Output .motlist.85 file")
-    parser.add_argument("--ref", help="Reference .motlist.85 for bone index mapping")
+    parser.add_argument("--ref", action="append",
+                       help="Reference .motlist.85 for bone index mapping (repeatable)")
     parser.add_argument("--name", help="Motion name override")
     parser.add_argument("--no-positions", action="store_true",
                        help="Skip position tracks")
     parser.add_argument("--uncompressed", action="store_true",
                        help="Use uncompressed rotation")
     parser.add_argument("--fps", type=int, default=60, help="Frame rate (default: 60)")
+    parser.add_argument("--rot-tolerance", type=float, default=None,
+                       help="Reduce rotation keys, max angular error in degrees")
+    parser.add_argument("--pos-tolerance", type=float, default=None,
+                       help="Reduce position keys, max distance error")
+    parser.add_argument("--max-rot-error", type=float, default=None,
+                       help="Pick 4bpk/float/static per rotation track under this "
+                            "error budget in degrees, with a per-bone report")
+    parser.add_argument("--max-pos-error", type=float, default=None,
+                       help="Pick float/static per position track under this distance "
+                            "error budget (16-bit axis too with --experimental-pos-encodings)")
+    parser.add_argument("--experimental-pos-encodings", action="store_true",
+                       help="Let --max-pos-error pick the 16-bit axis position encodings "
+                            "(key layout not verified in game)")
+    parser.add_argument("--optimize-4bpk", action="store_true",
+                       help="Search 4bpk unpack ranges and key hemispheres for the "
+                            "lowest quantization error")
+    parser.add_argument("--cache-dir", default=None,
+                       help="Build cache folder: skip unchanged conversions and reuse "
+                            "encoded tracks of unchanged bones")
+    parser.add_argument("--target-fps", type=int, default=None,
+                       help="Resample to this frame rate before encoding (keeps duration)")
+    parser.add_argument("--target-frames", type=int, default=None,
+                       help="Resample to this many frames (keeps frame rate)")
+    parser.add_argument("--pos-interp", choices=("linear", "cubic"), default="linear",
+                       help="Position resampling: linear or Catmull-Rom cubic")
+    parser.add_argument("--verify", action="store_true",
+                       help="Decode the output and report per-bone error against the dump")
+    parser.add_argument("--profile", action="store_true",
+                       help="Print per-stage wall time, peak memory and key counts")
+    parser.add_argument("--profile-trace", default=None,
+                       help="Write the profile as Chrome trace JSON (implies --profile)")
 
     args = parser.parse_args()
+    profiler = Profiler().enable() if args.profile or args.profile_trace else None
 
     output = dump_to_motlist(
         dump_path=args.dump,
@@ -216,10 +431,24 @@ def main():
         include_positions=not args.no_positions,
         compressed=not args.uncompressed,
         frame_rate=args.fps,
+        rot_tolerance_deg=args.rot_tolerance,
+        pos_tolerance=args.pos_tolerance,
+        max_rot_error_deg=args.max_rot_error,
+        max_pos_error=args.max_pos_error,
+        cache_dir=args.cache_dir,
+        target_fps=args.target_fps,
+        target_frames=args.target_frames,
+        position_interp=args.pos_interp,
+        optimize_4bpk=args.optimize_4bpk,
+        experimental_pos_encodings=args.experimental_pos_encodings,
     )
 
     # Validate
     print("\n" + validate_motlist(output))
+    if args.verify:
+        from verify_roundtrip import verify_motlist, format_verify_report
+        print("\n" + format_verify_report(verify_motlist(output, args.dump, dump_fps=args.fps)))
+    report_profile(profiler, args.profile_trace)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+"""
+Error-bounded keyframe reduction for .motlist.85 tracks.
+Drops keys the engine can reproduce by interpolating between its neighbours,
+so tracks get sparse frame index arrays instead of one key per frame.
+
+  - Rotations: slerp between kept keys, error = angle to the source quaternion
+  - Positions: lerp between kept keys, error = distance to the source position
+  - Tracks that never leave the tolerance of their first key collapse to 1 key
+
+The reduction is a Ramer-Douglas-Peucker style split: start with the first
+and last key, measure the interpolation error of every frame in between in
+one vectorized pass, and split at the worst frame until all errors fit.
+
+Usage (library):
+    from key_reduction import reduce_bones
+    bones, stats = reduce_bones(bones, rot_tolerance_deg=0.1, pos_tolerance=0.0005)
+"""
+
+import math
+from typing import List, Dict, Any, Tuple, Optional
+
+import numpy as np
+
+from pipeline_profiler import profiled, profile_count
+
+# Frame indices are written as int16
+MAX_FRAME_INDEX = 0x7FFF
+
+
+def slerp_many(q0: np.ndarray, q1: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Slerp from q0 to q1 (XYZW, shortest path) at every t. Returns (len(t), 4)."""
+    d = float(np.dot(q0, q1))
+    if d < 0.0:
+        q1 = -q1
+        d = -d
+    t = t[:, None]
+    if d > 0.9995:
+        # Nearly parallel: normalized lerp avoids dividing by sin(~0)
+        out = q0 + t * (q1 - q0)
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+    theta = math.acos(min(d, 1.0))
+    sin_theta = math.sin(theta)
+    return (np.sin((1.0 - t) * theta) * q0 + np.sin(t * theta) * q1) / sin_theta
+
+
+def quat_angle_error(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Rotation angle in radians between rows of a and b (sign-insensitive)."""
+    dots = np.abs(np.einsum('ij,ij->i', a, b))
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    cos_half = np.clip(dots / np.maximum(norms, 1e-12), 0.0, 1.0)
+    return 2.0 * np.arccos(cos_half)
+
+
+def _segment_error(keys: np.ndarray, a: int, b: int, is_rotation: bool) -> np.ndarray:
+    """Interpolation error for frames a+1..b-1 when only a and b are kept."""
+    t = (np.arange(a + 1, b, dtype=np.float64) - a) / (b - a)
+    source = keys[a + 1:b]
+    if is_rotation:
+        return quat_angle_error(slerp_many(keys[a], keys[b], t), source)
+    interp = keys[a] + t[:, None] * (keys[b] - keys[a])
+    return np.linalg.norm(interp - source, axis=1)
+
+
+def reduce_track(keys, tolerance: float, is_rotation: bool) -> np.ndarray:
+    """Select the keys to keep for one track.
+
+    Args:
+        keys: (N, 4) XYZW quaternions or (N, 3) positions, one per frame
+        tolerance: Max error (radians for rotations, units for positions)
+        is_rotation: Interpolate with slerp (True) or lerp (False)
+
+    Returns:
+        Sorted int array of kept frame indices (always includes frame 0).
+    """
+    keys = np.asarray(keys, dtype=np.float64)
+    n = len(keys)
+    if n <= 2:
+        return np.arange(n)
+
+    # Static track: every frame is within tolerance of the first key
+    first = np.broadcast_to(keys[0], keys.shape)
+    if is_rotation:
+        static_err = quat_angle_error(first, keys)
+    else:
+        static_err = np.linalg.norm(keys - first, axis=1)
+    if static_err.max() <= tolerance:
+        return np.array([0])
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[n - 1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        err = _segment_error(keys, a, b, is_rotation)
+        worst = int(np.argmax(err))
+        if err[worst] > tolerance:
+            split = a + 1 + worst
+            keep[split] = True
+            stack.append((a, split))
+            stack.append((split, b))
+    return np.flatnonzero(keep)
+
+
+@profiled('key reduction')
+def reduce_bones(
+    bones: List[Dict[str, Any]],
+    rot_tolerance_deg: Optional[float] = None,
+    pos_tolerance: Optional[float] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Run key reduction over build_mot_entry bone dicts.
+
+    Only tracks with one key per frame (no existing *_frame_indices) are
+    reduced; a tolerance of None leaves that track type untouched.
+
+    Returns:
+        (bones, stats) where bones are new dicts with reduced 'rotations' /
+        'positions' plus 'rot_frame_indices' / 'pos_frame_indices', and stats
+        counts keys before/after and static tracks per track type.
+    """
+    stats = {
+        'rot_keys_in': 0, 'rot_keys_out': 0, 'rot_static': 0,
+        'pos_keys_in': 0, 'pos_keys_out': 0, 'pos_static': 0,
+    }
+    rot_tol = math.radians(rot_tolerance_deg) if rot_tolerance_deg is not None else None
+    tracks = (('rotations', 'rot_frame_indices', rot_tol, True, 'rot'),
+              ('positions', 'pos_frame_indices', pos_tolerance, False, 'pos'))
+
+    reduced = []
+    for bone in bones:
+        bone = dict(bone)
+        for data_key, index_key, tol, is_rot, prefix in tracks:
+            data = bone.get(data_key)
+            if data is None or len(data) == 0:
+                continue
+            data = np.asarray(data, dtype=np.float64)
+            stats[prefix + '_keys_in'] += len(data)
+            if tol is not None and bone.get(index_key) is None and len(data) <= MAX_FRAME_INDEX + 1:
+                kept = reduce_track(data, tol, is_rot)
+                bone[data_key] = data[kept]
+                bone[index_key] = kept
+                if len(kept) == 1:
+                    stats[prefix + '_static'] += 1
+            stats[prefix + '_keys_out'] += len(bone[data_key])
+        reduced.append(bone)
+    profile_count(bones=len(bones), keys_in=stats['rot_keys_in'] + stats['pos_keys_in'],
+                  keys_out=stats['rot_keys_out'] + stats['pos_keys_out'])
+    return reduced, stats
+
+
+def format_reduction_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of reduce_bones stats."""
+    parts = []
+    for prefix, label in (('rot', 'Rotation'), ('pos', 'Position')):
+        keys_in = stats[prefix + '_keys_in']
+        if keys_in == 0:
+            continue
+        keys_out = stats[prefix + '_keys_out']
+        parts.append(f"{label} keys {keys_in} -> {keys_out} "
+                     f"({100.0 * keys_out / keys_in:.1f}%, {stats[prefix + '_static']} static)")
+    return "; ".join(parts)
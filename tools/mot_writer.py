@@ -4,22 +4,57 @@ Builds native RE Engine animation files from CAF JSON animation data.
 Target format: RE2 Remake .motlist.85 (v85 container, v65 mot entries).
 
 Supports:
-  - Compressed rotation tracks (4 bytes/key, quantized XYZW)
-  - Uncompressed position tracks (12 bytes/key, 3 floats XYZ)
+  - Compressed rotation tracks (4 bytes/key, quantized XYZW, vectorized with NumPy)
+  - Position tracks: 12 bytes/key floats, or quantized 10-bit XYZ / 16-bit single axis
   - MurmurHash3-32 bone name hashing
   - Bone index extraction from reference .motlist files
-  - CAF JSON input (from blender_anim_exporter.py)
+  - CAF JSON (streamed, caf_json_reader.py) or binary CAF (.cafb, memory-mapped) input
+    (from blender_anim_exporter.py)
+  - Error-bounded keyframe reduction with sparse frame indices (key_reduction.py)
+  - Adaptive per-track rotation encoding under an angular error budget
+  - Optimized 4bpk unpack ranges and key hemispheres (unpack_optimizer.py)
 
 Usage:
-    python mot_writer.py input.json output.motlist.85 [options]
+    python mot_writer.py convert input.json|input.cafb output.motlist.85 [options]
+    python mot_writer.py batch <dir|glob> [...] -o <output_dir> [options]
+    python mot_writer.py pack <input|dir|glob> [...] -o <pack.motlist.85> [options]
+    python mot_writer.py verify output.motlist.85 <source.txt|.json|.cafb> [--entry N]
+    python mot_writer.py diff <a.motlist.85> <b.motlist.85> [--rot-threshold <deg>]
 
     Options:
-      --ref <path>          Reference .motlist.85 for bone index mapping
+      --ref <path>          Reference .motlist.85 for bone index mapping (repeatable;
+                            indexed once in bone_index.py's cache)
       --uncompressed        Use uncompressed rotation (12 bytes/key)
       --name <string>       Motion name (default: from JSON action_name)
       --motlist-name <str>  Motlist container name (default: "custom_anim")
       --no-positions        Skip position tracks even if JSON has them
       --axis-convert        Apply Blender Z-up to RE Engine Y-up conversion
+      --axis-preset <name>  Lua player axis preset: blender_to_re or identity
+      --rot-tolerance <deg> Drop rotation keys reproducible within this angle
+      --pos-tolerance <d>   Drop position keys reproducible within this distance
+      --max-rot-error <deg> Per-track 4bpk/float/static choice under an error budget
+      --max-pos-error <d>   Per-track float/static position choice
+      --optimize-4bpk       Search 4bpk unpack ranges / key signs for the lowest error
+      --experimental-pos-encodings
+                            Let --max-pos-error pick the 16-bit axis position
+                            encodings (not verified in game)
+      --target-fps <n>      Resample to this frame rate before encoding (slerp/lerp)
+      --target-frames <n>   Resample to this many frames
+      --pos-interp <mode>   Position resampling: linear (default) or cubic
+      --cache-dir <dir>     Incremental build cache (build_cache.py)
+      --profile             Per-stage time / peak memory / counts (pipeline_profiler.py)
+      --profile-trace <p>   Also write the profile as Chrome trace JSON
+
+    Batch options (plus all convert options except --name/--motlist-name):
+      -o, --output-dir      Output folder for <stem>.motlist.85 + <stem>.motbank.1
+      --bank-id-start <n>   First bank ID, one per input in sorted order (default: 900)
+      --bank-prefix <dir>   Motlist resource folder in motbanks (default: CAF_custom)
+      -j, --jobs <n>        Worker processes (default: all cores)
+
+    Pack options (plus the batch conversion options):
+      -o, --output          Output .motlist.85; one entry per input, in argument order
+      --bank-id <n>         Bank ID of the single <stem>.motbank.1 (default: 900)
+      --motbank <path>      Motbank output path (default: next to the motlist)
 """
 
 import struct
@@ -27,7 +62,18 @@ import math
 import json
 import os
 import sys
-from typing import List, Tuple, Optional, Dict, Any
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Dict, Any, Union
+
+import numpy as np
+
+from key_reduction import reduce_bones, format_reduction_stats, quat_angle_error, MAX_FRAME_INDEX
+from bone_index import reference_bone_mapping, reference_paths
+from resample import resample_clip, resample_error, format_resample_report, sample_keys
+from unpack_optimizer import optimize_quats_4bpk
+from caf_json_reader import read_caf_json
+from preprocess import preprocess_tracks, apply_axis_map, AXIS_PRESETS
+from pipeline_profiler import Profiler, profiled, profile_count, profile_stage, report_profile
 
 # ===========================================================================
 # Constants
@@ -42,6 +88,28 @@ MOT_MAGIC = b'mot '
 FLAG_ROT_COMPRESSED = 0x00430112    # Compressed rotation, 4 bytes/key (XYZW)
 FLAG_ROT_UNCOMPRESSED = 0x004B0112  # Uncompressed rotation, 12 bytes/key (XYZ floats)
 FLAG_POS_UNCOMPRESSED = 0x004000F2  # Uncompressed position, 12 bytes/key (XYZ floats)
+# Quantized position variants (docs section 14.2 / Appendix C). Key layouts follow
+# the RE Engine template decoders; 0x0042x0F2 are the variants seen in RE2 files.
+FLAG_POS_10BIT = 0x004400F2         # Compressed position, 4 bytes/key (3x10-bit XYZ)
+FLAG_POS_X16 = 0x004210F2           # Compressed position, 2 bytes/key (16-bit X only)
+FLAG_POS_Y16 = 0x004220F2           # Compressed position, 2 bytes/key (16-bit Y only)
+FLAG_POS_Z16 = 0x004230F2           # Compressed position, 2 bytes/key (16-bit Z only)
+
+# Position encoding name -> (track flags, bytes per key)
+POS_ENCODINGS = {
+    'float': (FLAG_POS_UNCOMPRESSED, 12),
+    '10bit': (FLAG_POS_10BIT, 4),
+    'x16': (FLAG_POS_X16, 2),
+    'y16': (FLAG_POS_Y16, 2),
+    'z16': (FLAG_POS_Z16, 2),
+}
+# Candidates of the automatic choice (select_position_encodings). The compressed
+# translation key layouts are not known from game files (docs section 14.2), so
+# the 16-bit axis variants are only tried with experimental_pos_encodings.
+# 10bit (0x004400F2) is only registered from RE3 files, so a track gets it only
+# when it asks for it by name ('pos_encoding' on the bone dict).
+AUTO_POS_ENCODINGS = ('float',)
+EXPERIMENTAL_POS_ENCODINGS = ('float', 'x16', 'y16', 'z16')
 
 # Bone clip track flag bits
 TRACK_HAS_POSITION = 0x01
@@ -58,16 +126,27 @@ UNPACK_DATA_SIZE = 32          # 8 floats (4 scale + 4 base)
 # MurmurHash3-32
 # ===========================================================================
 
+_MURMUR_C1 = 0xCC9E2D51
+_MURMUR_C2 = 0x1B873593
+
+# Bounded name -> hash memo shared by every conversion in this process
+BONE_HASH_CACHE_SIZE = 4096
+_bone_hash_cache: "OrderedDict[str, int]" = OrderedDict()
+
+# Below this many uncached names, hash_names hashes one name at a time
+_BULK_HASH_MIN_NAMES = 16
+
+
 def murmurhash3_32(data: bytes, seed: int = 0xFFFFFFFF) -> int:
     """MurmurHash3 32-bit hash. Used by RE Engine for bone name hashing."""
     length = len(data)
     nblocks = length // 4
     h1 = seed & 0xFFFFFFFF
-    c1 = 0xCC9E2D51
-    c2 = 0x1B873593
+    c1 = _MURMUR_C1
+    c2 = _MURMUR_C2
 
-    for i in range(nblocks):
-        k1 = struct.unpack_from('<I', data, i * 4)[0]
+    # All body blocks in one unpack instead of one struct call per block
+    for k1 in struct.unpack_from(f'<{nblocks}I', data):
         k1 = (k1 * c1) & 0xFFFFFFFF
         k1 = ((k1 << 15) | (k1 >> 17)) & 0xFFFFFFFF
         k1 = (k1 * c2) & 0xFFFFFFFF
@@ -97,9 +176,103 @@ def murmurhash3_32(data: bytes, seed: int = 0xFFFFFFFF) -> int:
     return h1
 
 
+def _rotl32(x: np.ndarray, r: int) -> np.ndarray:
+    return (x << np.uint32(r)) | (x >> np.uint32(32 - r))
+
+
+def murmurhash3_32_many(buffers: List[bytes], seed: int = 0xFFFFFFFF) -> List[int]:
+    """MurmurHash3-32 of many buffers at once.
+    Buffers are zero-padded into one uint32 block matrix and each block column
+    is mixed for every buffer in a single array pass; rows whose data ended
+    keep their running hash.
+    """
+    if not buffers:
+        return []
+    lengths = np.array([len(b) for b in buffers], dtype=np.int64)
+    nblocks = lengths // 4
+    width = (int(lengths.max()) // 4 + 1) * 4
+
+    # Gather every buffer into a zero-padded (n, width) byte matrix
+    flat = np.frombuffer(b''.join(buffers) + b'\0', dtype=np.uint8)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    cols = np.arange(width)
+    inside = cols < lengths[:, None]
+    raw = np.where(inside, flat[np.where(inside, starts[:, None] + cols, len(flat) - 1)], 0)
+    raw = raw.astype(np.uint8)
+    blocks = raw.view('<u4')
+
+    c1 = np.uint32(_MURMUR_C1)
+    c2 = np.uint32(_MURMUR_C2)
+    h1 = np.full(len(buffers), seed & 0xFFFFFFFF, dtype=np.uint32)
+    rows = np.arange(len(buffers))
+
+    with np.errstate(over='ignore'):
+        for i in range(int(nblocks.max())):
+            k1 = _rotl32(blocks[:, i] * c1, 15) * c2
+            mixed = _rotl32(h1 ^ k1, 13) * np.uint32(5) + np.uint32(0xE6546B64)
+            h1 = np.where(i < nblocks, mixed, h1)
+
+        # Tail: the 0-3 bytes after the last full block (bytes past the end are 0)
+        tail_start = nblocks * 4
+        k1 = (raw[rows, tail_start].astype(np.uint32)
+              | (raw[rows, tail_start + 1].astype(np.uint32) << np.uint32(8))
+              | (raw[rows, tail_start + 2].astype(np.uint32) << np.uint32(16)))
+        h1 = np.where(lengths > tail_start, h1 ^ (_rotl32(k1 * c1, 15) * c2), h1)
+
+        h1 ^= lengths.astype(np.uint32)
+        h1 ^= h1 >> np.uint32(16)
+        h1 *= np.uint32(0x85EBCA6B)
+        h1 ^= h1 >> np.uint32(13)
+        h1 *= np.uint32(0xC2B2AE35)
+        h1 ^= h1 >> np.uint32(16)
+    return h1.tolist()
+
+
+def _remember_bone_hash(name: str, h: int) -> None:
+    _bone_hash_cache[name] = h
+    if len(_bone_hash_cache) > BONE_HASH_CACHE_SIZE:
+        _bone_hash_cache.popitem(last=False)
+
+
 def bone_name_hash(name: str) -> int:
-    """Compute MurmurHash3-32 of a bone name (UTF-16LE encoded, seed=0xFFFFFFFF)."""
-    return murmurhash3_32(name.encode('utf-16-le'))
+    """Compute MurmurHash3-32 of a bone name (UTF-16LE encoded, seed=0xFFFFFFFF).
+    Results are memoized in a bounded LRU cache.
+    """
+    h = _bone_hash_cache.get(name)
+    if h is not None:
+        _bone_hash_cache.move_to_end(name)
+        return h
+    h = murmurhash3_32(name.encode('utf-16-le'))
+    _remember_bone_hash(name, h)
+    return h
+
+
+def hash_names(names: List[str]) -> List[int]:
+    """bone_name_hash for a list of names, in order.
+    Cached names are looked up; the rest are hashed together with
+    murmurhash3_32_many.
+    """
+    result = [0] * len(names)
+    missing: Dict[str, List[int]] = {}
+    for i, name in enumerate(names):
+        h = _bone_hash_cache.get(name)
+        if h is None:
+            missing.setdefault(name, []).append(i)
+        else:
+            _bone_hash_cache.move_to_end(name)
+            result[i] = h
+
+    if len(missing) < _BULK_HASH_MIN_NAMES:
+        hashes = [murmurhash3_32(name.encode('utf-16-le')) for name in missing]
+    else:
+        hashes = murmurhash3_32_many([name.encode('utf-16-le') for name in missing])
+    for indices, h in zip(missing.values(), hashes):
+        for i in indices:
+            result[i] = h
+    # Only the most recent BONE_HASH_CACHE_SIZE names would survive eviction anyway
+    for name, h in list(zip(missing, hashes))[-BONE_HASH_CACHE_SIZE:]:
+        _remember_bone_hash(name, h)
+    return result
 
 # ===========================================================================
 # Alignment helpers
@@ -132,25 +305,17 @@ def pad_buffer(buf: bytearray, alignment: int, fill: int = 0) -> None:
 # Quaternion compression (RE2 4-byte XYZW)
 # ===========================================================================
 
+# compute_unpack_params / compress_quat_4bpk: per-key list API kept for
+# external scripts, delegating to the array functions the writers use.
+
 def compute_unpack_params(quats: List[Tuple[float, float, float, float]]):
     """Compute optimal base and scale from a list of XYZW quaternions.
     Returns (scale[4], base[4]) for the unpack data block.
     """
     if not quats:
         return [0.001] * 4, [0.0] * 4
-
-    min_vals = [min(q[i] for q in quats) for i in range(4)]
-    max_vals = [max(q[i] for q in quats) for i in range(4)]
-
-    scale = [max_vals[i] - min_vals[i] for i in range(4)]
-    base = min_vals[:]
-
-    # Ensure non-zero scale to prevent division by zero during decode
-    for i in range(4):
-        if scale[i] < 1e-10:
-            scale[i] = 0.001
-
-    return scale, base
+    scale, base = compute_unpack_params_array(np.asarray(quats, dtype=np.float64))
+    return scale.tolist(), base.tolist()
 
 
 def compress_quat_4bpk(
@@ -160,53 +325,419 @@ def compress_quat_4bpk(
 ) -> bytes:
     """Compress a quaternion (qX, qY, qZ, qW) to 4 bytes for RE2.
     Each component: byte = clamp(round((value - base) / scale * 255), 0, 255)
+    (128 for a zero scale)
+    """
+    scale = np.asarray(scale, dtype=np.float64)
+    zero = np.abs(scale) <= 1e-10
+    codes = encode_quats_4bpk(np.asarray(q, dtype=np.float64)[None],
+                              np.where(zero, 1.0, scale), np.asarray(base, dtype=np.float64))[0]
+    codes[zero] = 128
+    return codes.tobytes()
+
+
+def compute_unpack_params_array(quats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized compute_unpack_params over the key axis.
+    quats: (..., N, 4) array of XYZW quaternions, N > 0.
+    Returns (scale, base), each shaped (..., 4).
+    """
+    base = quats.min(axis=-2) + 0.0  # + 0.0 folds -0.0 to 0.0
+    scale = quats.max(axis=-2) - base
+    # Ensure non-zero scale to prevent division by zero during decode
+    scale[scale < 1e-10] = 0.001
+    return scale, base
+
+
+def quantize_quats_4bpk(quats) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize whole rotation tracks to the RE2 4-byte XYZW format in one pass.
+
+    Args:
+        quats: (N, 4) array for one track, or (T, N, 4) for T tracks of equal length
+
+    Returns:
+        (codes, unpack) where codes is uint8 (..., N, 4) -- the frame data bytes --
+        and unpack is little-endian float32 (..., 8) -- scale[4] then base[4].
+    """
+    quats = np.asarray(quats, dtype=np.float64)
+    scale, base = compute_unpack_params_array(quats)
+    codes = encode_quats_4bpk(quats, scale, base)
+    unpack = np.concatenate([scale, base], axis=-1).astype('<f4')
+    return codes, unpack
+
+
+def encode_quats_4bpk(quats: np.ndarray, scale: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """uint8 codes (..., N, 4) of quaternions for given unpack scale / base (..., 4):
+    byte = clamp(round((value - base) / scale * 255), 0, 255).
     """
-    result = []
-    for i in range(4):
-        if abs(scale[i]) > 1e-10:
-            val = max(0, min(255, round((q[i] - base[i]) / scale[i] * 255)))
+    q = (quats - base[..., None, :]) / scale[..., None, :] * 255
+    return np.clip(np.rint(q), 0, 255).astype(np.uint8)
+
+
+def decode_quats_4bpk(codes, unpack) -> np.ndarray:
+    """Decode 4bpk codes (..., N, 4) with their unpack blocks (..., 8).
+    component = base + byte / 255 * scale (docs section 8.2).
+    """
+    codes = np.asarray(codes, dtype=np.float64)
+    unpack = np.asarray(unpack, dtype=np.float64)
+    return unpack[..., None, 4:8] + codes / 255.0 * unpack[..., None, 0:4]
+
+
+def canonicalize_quats_w_positive(quats) -> np.ndarray:
+    """Negate keys with qW < 0 so the rotation survives qW reconstruction."""
+    quats = np.asarray(quats, dtype=np.float64)
+    return np.where(quats[:, 3:4] < 0, -quats, quats)
+
+
+def decode_quats_xyz(xyz) -> np.ndarray:
+    """Rebuild (N, 4) quaternions from uncompressed (N, 3) qX/qY/qZ keys."""
+    xyz = np.asarray(xyz, dtype=np.float64)
+    w = np.sqrt(np.maximum(0.0, 1.0 - np.einsum('ij,ij->i', xyz, xyz)))
+    return np.concatenate([xyz, w[:, None]], axis=1)
+
+# ===========================================================================
+# Adaptive rotation encoding (per-track 4bpk / float / static selection)
+# ===========================================================================
+
+def rotation_encoding_errors(
+    quats,
+    optimize_4bpk: bool = False,
+    frame_indices=None,
+    reference=None,
+) -> Tuple[float, float]:
+    """Max angular error (radians) of one rotation track after a round trip
+    through 4bpk quantization (optionally optimized) and through the 12-byte
+    float encoding. With a reference (full-rate source keys), the decoded keys
+    at frame_indices are slerped at every reference frame first, so the error
+    includes that of key reduction.
+    """
+    quats = np.asarray(quats, dtype=np.float64)
+    codes, unpack = (optimize_quats_4bpk if optimize_4bpk else quantize_quats_4bpk)(quats)
+    decoded = [decode_quats_4bpk(codes, unpack),
+               decode_quats_xyz(canonicalize_quats_w_positive(quats)[:, :3].astype('<f4'))]
+    if reference is None:
+        reference = quats
+    else:
+        frames = np.arange(len(reference), dtype=np.float64)
+        decoded = [sample_keys(frame_indices, d, frames, True) for d in decoded]
+    err_4bpk, err_float = (quat_angle_error(d, reference).max() for d in decoded)
+    return float(err_4bpk), float(err_float)
+
+
+@profiled('select rotation encoding')
+def select_rotation_encodings(
+    bones: List[Dict[str, Any]],
+    max_error_deg: float,
+    optimize_4bpk: bool = False,
+    sources: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Choose the rotation encoding of every bone under an angular error budget.
+
+    Per track: a full-rate track that never leaves the budget around its first
+    key collapses to a single static key. Then the smallest of 4bpk
+    (4 B/key + 32 B unpack) and float (12 B/key) whose round-trip error fits the
+    budget is chosen; if neither fits, the more accurate one is used. With
+    optimize_4bpk the 4bpk error is that of the optimized unpack parameters,
+    so more tracks fit the 4-byte encoding.
+
+    sources are the bones before key reduction (same order): a reduced track
+    is then measured against its source keys at every frame, so reduction and
+    quantization share the budget.
+
+    Returns:
+        (bones, report) where bones are new dicts with 'rot_compressed' set
+        (and static tracks collapsed), and report has one row per rotation
+        track: name, encoding, keys_in, keys_out, bytes, bytes_saved (against
+        12 B/key for every source key) and error (degrees).
+    """
+    budget = math.radians(max_error_deg)
+    selected = []
+    report = []
+    for slot, bone in enumerate(bones):
+        rotations = bone.get('rotations')
+        if rotations is None or len(rotations) == 0:
+            selected.append(bone)
+            continue
+        bone = dict(bone)
+        quats = np.asarray(rotations, dtype=np.float64)
+        frame_indices = bone.get('rot_frame_indices')
+        reference = None
+        if sources is not None and frame_indices is not None:
+            source = sources[slot]
+            if source.get('rot_frame_indices') is None and source.get('rotations') is not None:
+                reference = np.asarray(source['rotations'], dtype=np.float64)
+        keys_in = len(quats) if reference is None else len(reference)
+
+        static = False
+        if frame_indices is None and len(quats) > 1:
+            first_err = quat_angle_error(np.broadcast_to(quats[0], quats.shape), quats).max()
+            if first_err <= budget:
+                static = True
+                # The static key is measured against every source key
+                reference = quats
+                frame_indices = bone['rot_frame_indices'] = np.array([0])
+                quats = quats[:1]
+        bone['rotations'] = quats
+
+        n = len(quats)
+        err_4bpk, err_float = rotation_encoding_errors(quats, optimize_4bpk, frame_indices, reference)
+        candidates = [(4 * n + UNPACK_DATA_SIZE, err_4bpk, True), (12 * n, err_float, False)]
+        fitting = [c for c in candidates if c[1] <= budget]
+        if fitting:
+            size, err, use_4bpk = min(fitting, key=lambda c: c[0])
         else:
-            val = 128
-        result.append(val)
-    return bytes(result)
+            size, err, use_4bpk = min(candidates, key=lambda c: c[1])
+        bone['rot_compressed'] = use_4bpk
+
+        encoding = '4bpk' if use_4bpk else 'float'
+        report.append({
+            'name': bone['name'],
+            'encoding': f"static/{encoding}" if static else encoding,
+            'keys_in': keys_in,
+            'keys_out': n,
+            'bytes': size,
+            'bytes_saved': 12 * keys_in - size,
+            'error': math.degrees(err),
+        })
+        selected.append(bone)
+    return selected, report
+
+
+def format_encoding_report(
+    report: List[Dict[str, Any]],
+    track_label: str = "Rotation",
+    error_unit: str = "deg",
+) -> str:
+    """Render select_rotation_encodings / select_position_encodings rows as a
+    per-bone table.
+    """
+    lines = [f"{'Bone':<34} {'Encoding':<12} {'Keys':>9} {'Bytes':>7} {'Saved':>7} "
+             f"{'MaxErr':>9} ({error_unit})"]
+    for r in report:
+        keys = f"{r['keys_in']}->{r['keys_out']}" if r['keys_in'] != r['keys_out'] else str(r['keys_in'])
+        encoding = r['encoding'] + (' *' if r.get('unverified') else '')
+        lines.append(f"{r['name']:<34} {encoding:<12} {keys:>9} {r['bytes']:>7} "
+                     f"{r['bytes_saved']:>7} {r['error']:>9.4f}")
+    total = sum(r['bytes'] for r in report)
+    saved = sum(r['bytes_saved'] for r in report)
+    counts = {}
+    for r in report:
+        counts[r['encoding']] = counts.get(r['encoding'], 0) + 1
+    mix = ', '.join(f"{v} {k}" for k, v in sorted(counts.items()))
+    lines.append(f"{track_label} data: {total} B, {saved} B saved vs 12 B/key ({mix})")
+    if any(r.get('unverified') for r in report):
+        lines.append("* unverified in game: quantized key layout taken from the template "
+                     "decoders, the round-trip error uses the same layout")
+    return "\n".join(lines)
 
 # ===========================================================================
-# Extract bone mapping from existing .motlist
+# Position track quantization (10-bit XYZ and single-axis 16-bit)
 # ===========================================================================
 
-def extract_bone_mapping(motlist_path: str) -> Dict[int, int]:
-    """Extract {bone_hash -> bone_index} mapping from an existing RE2 .motlist.85.
-    Reads the first mot entry's bone clip headers.
-    Returns dict mapping bone_hash to boneIndex.
+def quantize_positions(positions, encoding: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize one (N, 3) position track with the same min-range unpack block
+    as rotations (scale[4] then base[4], 4th component unused).
+
+    Returns:
+        (key_bytes, unpack) where key_bytes is a uint8 array of N * bytes-per-key
+        frame data and unpack is little-endian float32 (8,).
     """
-    with open(motlist_path, 'rb') as f:
-        data = f.read()
+    positions = np.asarray(positions, dtype=np.float64)[:, :3]
+    scale, base = compute_unpack_params_array(positions)
+    unit = (positions - base) / scale
+    if encoding == '10bit':
+        q = np.clip(np.rint(unit * 1023), 0, 1023).astype('<u4')
+        packed = q[:, 0] | (q[:, 1] << 10) | (q[:, 2] << 20)
+        key_bytes = packed.astype('<u4').view(np.uint8)
+    elif encoding in ('x16', 'y16', 'z16'):
+        axis = 'xyz'.index(encoding[0])
+        q = np.clip(np.rint(unit[:, axis] * 65535), 0, 65535).astype('<u2')
+        key_bytes = q.view(np.uint8)
+    else:
+        raise ValueError(f"Not a quantized position encoding: {encoding}")
+    unpack = np.concatenate([scale, [0.0], base, [0.0]]).astype('<f4')
+    return key_bytes, unpack
 
-    # Parse motlist header
-    version = struct.unpack_from('<I', data, 0x00)[0]
-    magic = data[0x04:0x08]
-    if magic != MOTLIST_MAGIC:
-        raise ValueError(f"Not a motlist file: magic={magic!r}")
 
-    ptrs_offs = struct.unpack_from('<Q', data, 0x10)[0]
-    # Read first entry offset
-    entry_offs = struct.unpack_from('<Q', data, ptrs_offs)[0]
+def decode_positions(key_bytes, unpack, encoding: str) -> np.ndarray:
+    """Decode quantized position frame data back to (N, 3) floats.
+    Single-axis encodings hold the other two axes at their base value.
+    """
+    key_bytes = np.ascontiguousarray(key_bytes, dtype=np.uint8)
+    unpack = np.asarray(unpack, dtype=np.float64)
+    scale, base = unpack[0:3], unpack[4:7]
+    if encoding == '10bit':
+        packed = key_bytes.view('<u4').astype(np.int64)
+        q = np.stack([packed & 0x3FF, (packed >> 10) & 0x3FF, (packed >> 20) & 0x3FF], axis=1)
+        return base + q / 1023.0 * scale
+    if encoding in ('x16', 'y16', 'z16'):
+        axis = 'xyz'.index(encoding[0])
+        q = key_bytes.view('<u2').astype(np.float64)
+        out = np.tile(base, (len(q), 1))
+        out[:, axis] += q / 65535.0 * scale[axis]
+        return out
+    raise ValueError(f"Not a quantized position encoding: {encoding}")
+
+
+def position_encoding_error(positions, encoding: str, frame_indices=None, reference=None) -> float:
+    """Max distance between a position track and its encode/decode round trip.
+    With a reference (full-rate source keys), the decoded keys at
+    frame_indices are lerped at every reference frame first.
+    """
+    positions = np.asarray(positions, dtype=np.float64)[:, :3]
+    if encoding == 'float':
+        decoded = positions.astype('<f4').astype(np.float64)
+    else:
+        decoded = decode_positions(*quantize_positions(positions, encoding), encoding)
+    if reference is None:
+        reference = positions
+    else:
+        decoded = sample_keys(frame_indices, decoded, np.arange(len(reference), dtype=np.float64), False)
+    return float(np.linalg.norm(decoded - reference, axis=1).max())
 
-    # Parse mot entry header
-    mot_ver = struct.unpack_from('<I', data, entry_offs)[0]
-    bone_clip_offs = struct.unpack_from('<Q', data, entry_offs + 0x18)[0]
-    bone_clip_count = struct.unpack_from('<H', data, entry_offs + 0x6A)[0]
 
-    mapping = {}
-    for i in range(bone_clip_count):
-        pos = entry_offs + bone_clip_offs + i * BONE_CLIP_HEADER_SIZE
-        if pos + BONE_CLIP_HEADER_SIZE > len(data):
-            break
-        bone_index = struct.unpack_from('<H', data, pos)[0]
-        bone_hash = struct.unpack_from('<I', data, pos + 4)[0]
-        mapping[bone_hash] = bone_index
+@profiled('select position encoding')
+def select_position_encodings(
+    bones: List[Dict[str, Any]],
+    max_error: float,
+    sources: Optional[List[Dict[str, Any]]] = None,
+    experimental: bool = False,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Choose the position encoding of every bone under a distance error budget.
+
+    Mirrors select_rotation_encodings: full-rate tracks that stay within the
+    budget of their first key collapse to one static float key, otherwise the
+    smallest of AUTO_POS_ENCODINGS (float only), or with experimental of
+    EXPERIMENTAL_POS_ENCODINGS (float / x16 / y16 / z16), whose decoded round
+    trip fits the budget is chosen (float if none does). A bone that already
+    has a 'pos_encoding' (e.g. '10bit') keeps it. sources as in
+    select_rotation_encodings.
 
-    return mapping
+    Returns:
+        (bones, report) with 'pos_encoding' set on every bone that has positions.
+    """
+    selected = []
+    report = []
+    for slot, bone in enumerate(bones):
+        positions = bone.get('positions')
+        if positions is None or len(positions) == 0:
+            selected.append(bone)
+            continue
+        bone = dict(bone)
+        pos = np.asarray(positions, dtype=np.float64)[:, :3]
+        frame_indices = bone.get('pos_frame_indices')
+        reference = None
+        if sources is not None and frame_indices is not None:
+            source = sources[slot]
+            if source.get('pos_frame_indices') is None and source.get('positions') is not None:
+                reference = np.asarray(source['positions'], dtype=np.float64)[:, :3]
+        keys_in = len(pos) if reference is None else len(reference)
+
+        static = False
+        if frame_indices is None and len(pos) > 1:
+            if np.linalg.norm(pos - pos[0], axis=1).max() <= max_error:
+                static = True
+                reference = pos
+                frame_indices = bone['pos_frame_indices'] = np.array([0])
+                pos = pos[:1]
+        bone['positions'] = pos
+
+        n = len(pos)
+        requested = bone.get('pos_encoding')
+        if requested is not None and requested not in POS_ENCODINGS:
+            raise ValueError(f"Bone {bone['name']}: unknown position encoding {requested!r}")
+        candidates = []
+        auto = EXPERIMENTAL_POS_ENCODINGS if experimental else AUTO_POS_ENCODINGS
+        for encoding in (requested,) if requested else auto:
+            size = POS_ENCODINGS[encoding][1] * n + (UNPACK_DATA_SIZE if encoding != 'float' else 0)
+            candidates.append((size, position_encoding_error(pos, encoding, frame_indices, reference),
+                               encoding))
+        fitting = [c for c in candidates if c[1] <= max_error]
+        if fitting:
+            size, err, encoding = min(fitting, key=lambda c: c[0])
+        else:
+            size, err, encoding = candidates[0]
+        bone['pos_encoding'] = encoding
+
+        report.append({
+            'name': bone['name'],
+            'encoding': f"static/{encoding}" if static else encoding,
+            'keys_in': keys_in,
+            'keys_out': n,
+            'bytes': size,
+            'bytes_saved': 12 * keys_in - size,
+            'error': err,
+            'unverified': encoding != 'float',
+        })
+        selected.append(bone)
+    return selected, report
+
+# ===========================================================================
+# Bulk track serialization (whole tracks into a preallocated buffer)
+# ===========================================================================
+
+def write_float_triplets(buf: bytearray, offset: int, values) -> int:
+    """Write the first 3 components of each key as little-endian float32.
+    values: (N, >=3) array-like. The data is copied straight into a NumPy view
+    over buf, with no intermediate bytes object. Returns bytes written.
+    """
+    values = np.asarray(values)
+    if values.size == 0:
+        return 0
+    dst = np.frombuffer(buf, dtype='<f4', count=len(values) * 3, offset=offset)
+    dst.reshape(-1, 3)[:] = values[:, :3]
+    return dst.nbytes
+
+
+def check_frame_indices(indices) -> np.ndarray:
+    """Frame indices as an int array; ValueError if any is outside the int16
+    range of the format (0..MAX_FRAME_INDEX) instead of wrapping around.
+    """
+    indices = np.asarray(indices)
+    if indices.size and (indices.min() < 0 or indices.max() > MAX_FRAME_INDEX):
+        raise ValueError(f"Frame index out of range 0..{MAX_FRAME_INDEX}: "
+                         f"{indices.min()}..{indices.max()}")
+    return indices
+
+
+def write_frame_indices(buf: bytearray, offset: int, indices) -> int:
+    """Write a frame index array as little-endian int16. Returns bytes written."""
+    indices = check_frame_indices(indices)
+    if indices.size == 0:
+        return 0
+    dst = np.frombuffer(buf, dtype='<i2', count=len(indices), offset=offset)
+    dst[:] = indices
+    return dst.nbytes
+
+
+def write_unpack_block(buf: bytearray, offset: int, unpack) -> int:
+    """Write a 32-byte unpack data block (scale[4] then base[4]) as float32."""
+    dst = np.frombuffer(buf, dtype='<f4', count=8, offset=offset)
+    dst[:] = unpack
+    return UNPACK_DATA_SIZE
+
+
+def write_bytes(buf: bytearray, offset: int, data) -> int:
+    """Copy a uint8 array (e.g. 4bpk codes, quantized positions) into buf via
+    a memoryview slice."""
+    mv = memoryview(np.ascontiguousarray(data, dtype=np.uint8)).cast('B')
+    memoryview(buf)[offset:offset + mv.nbytes] = mv
+    return mv.nbytes
+
+# ===========================================================================
+# Extract bone mapping from existing .motlist
+# ===========================================================================
+
+@profiled('bone mapping')
+def extract_bone_mapping(motlist_path: str) -> Dict[int, int]:
+    """Extract {bone_hash -> bone_index} mapping from an existing RE2 .motlist.85.
+    Reads the bone clip headers of every mot entry; earlier entries win when
+    a hash appears with different indices. Converters go through the cached
+    bone_index.reference_bone_mapping instead.
+    Returns dict mapping bone_hash to boneIndex.
+    """
+    from bone_index import scan_motlist_bones, merge_bone_maps
+
+    merged, _ = merge_bone_maps([bones for _, bones in scan_motlist_bones(motlist_path)])
+    return merged
 
 # ===========================================================================
 # Known RE2 bone names (from runtime dump, 80 bones)
@@ -243,7 +774,7 @@ RE2_PLAYER_BONE_NAMES = [
 ]
 
 # Pre-computed hash -> name lookup
-_HASH_TO_NAME = {bone_name_hash(n): n for n in RE2_PLAYER_BONE_NAMES}
+_HASH_TO_NAME = dict(zip(hash_names(RE2_PLAYER_BONE_NAMES), RE2_PLAYER_BONE_NAMES))
 
 
 def get_bone_name_for_hash(h: int) -> Optional[str]:
@@ -254,27 +785,127 @@ def get_bone_name_for_hash(h: int) -> Optional[str]:
 # Coordinate conversion: Blender Z-up RH -> RE Engine Y-up
 # ===========================================================================
 
+# Single-value helpers for external scripts; the converters remap whole clips
+# with preprocess.apply_axis_map.
+
 def convert_position_blender_to_re(x: float, y: float, z: float):
     """Convert position from Blender (Z-up, right-handed) to RE Engine (Y-up)."""
-    return (x, z, -y)
+    t = apply_axis_map(np.array([0.0, 0.0, 0.0, 1.0, x, y, z]), AXIS_PRESETS['blender_to_re'])
+    return tuple(t[4:7].tolist())
 
 
 def convert_quat_blender_to_re(qx: float, qy: float, qz: float, qw: float):
     """Convert quaternion from Blender (Z-up, right-handed) to RE Engine (Y-up).
     Blender quat (x,y,z,w) -> RE quat: swap Y/Z and negate new Z.
     """
-    return (qx, qz, -qy, qw)
+    t = apply_axis_map(np.array([qx, qy, qz, qw, 0.0, 0.0, 0.0]), AXIS_PRESETS['blender_to_re'])
+    return tuple(t[0:4].tolist())
 
 # ===========================================================================
 # Build a single RE2 v65 mot entry
 # ===========================================================================
 
+@profiled('quantize')
+def encode_bone_tracks(
+    bones: List[Dict[str, Any]],
+    compressed: bool = True,
+    optimize_4bpk: bool = False,
+) -> List[Dict[str, Any]]:
+    """Encode the tracks of build_mot_entry bone dicts into their binary payloads.
+
+    Compressed rotation tracks are quantized together, one vectorized pass per
+    distinct key count (usually a single pass: every track spans the clip),
+    with raw min/max unpack ranges or, with optimize_4bpk, the ranges and key
+    hemispheres searched by unpack_optimizer.
+
+    Returns:
+        One dict per bone: index, hash, track_flags and 'tracks', a list (in
+        file order: position, rotation) of dicts with flags, key_count and the
+        track's payload arrays, written as-is by assemble_mot_entry:
+        frame_data ('<f4' (N, 3) float keys or uint8 quantized keys), unpack
+        ('<f4' (8,), None if uncompressed) and frame_indices (int16 range).
+    """
+    encoded = []
+    pending = {}  # key count -> [(track dict, quats)] awaiting 4bpk quantization
+    for bone in bones:
+        name = bone['name']
+        bone_hash = bone.get('hash')
+        if bone_hash is None:
+            bone_hash = bone_name_hash(name)
+        rotations = bone.get('rotations', [])
+        positions = bone.get('positions', None)
+
+        has_rot = len(rotations) > 0
+        has_pos = positions is not None and len(positions) > 0
+        track_flags = 0
+        if has_pos:
+            track_flags |= TRACK_HAS_POSITION
+        if has_rot:
+            track_flags |= TRACK_HAS_ROTATION
+
+        tracks = []
+        # Position track (comes before rotation in track order)
+        if has_pos:
+            pos_encoding = bone.get('pos_encoding', 'float')
+            if pos_encoding not in POS_ENCODINGS:
+                raise ValueError(f"Bone {name}: unknown position encoding {pos_encoding!r}")
+            track = {'flags': POS_ENCODINGS[pos_encoding][0], 'key_count': len(positions)}
+            if pos_encoding != 'float':
+                track['frame_data'], track['unpack'] = quantize_positions(positions, pos_encoding)
+            else:
+                # Position stores (X, Y, Z)
+                track['frame_data'] = np.asarray(positions, dtype=np.float64)[:, :3].astype('<f4')
+                track['unpack'] = None
+            track['frame_indices'] = _frame_indices(bone.get('pos_frame_indices'), len(positions))
+            tracks.append(track)
+        # Rotation track
+        if has_rot:
+            track = {'key_count': len(rotations)}
+            if bone.get('rot_compressed', compressed):
+                track['flags'] = FLAG_ROT_COMPRESSED
+                quats = np.asarray(rotations, dtype=np.float64)[:, :4]
+                pending.setdefault(len(quats), []).append((track, quats))
+            else:
+                # Uncompressed rotation stores (qX, qY, qZ); the engine reconstructs
+                # qW = sqrt(max(0, 1 - qX^2 - qY^2 - qZ^2)), so keys must have qW >= 0
+                track['flags'] = FLAG_ROT_UNCOMPRESSED
+                track['frame_data'] = canonicalize_quats_w_positive(rotations)[:, :3].astype('<f4')
+                track['unpack'] = None
+            track['frame_indices'] = _frame_indices(bone.get('rot_frame_indices'), len(rotations))
+            tracks.append(track)
+
+        encoded.append({
+            'index': int(bone.get('index', 0)),
+            'hash': int(bone_hash),
+            'track_flags': track_flags,
+            'tracks': tracks,
+        })
+
+    quantize = optimize_quats_4bpk if optimize_4bpk else quantize_quats_4bpk
+    profile_count(bones=len(encoded), tracks=sum(len(b['tracks']) for b in encoded),
+                  keys=sum(len(quats) for group in pending.values() for _, quats in group))
+    for group in pending.values():
+        codes, unpack = quantize(np.array([quats for _, quats in group]))
+        for (track, _), track_codes, track_unpack in zip(group, codes, unpack):
+            track['frame_data'] = track_codes
+            track['unpack'] = track_unpack
+    return encoded
+
+
+def _frame_indices(indices, key_count: int) -> np.ndarray:
+    """Checked frame index array (0..keyCount-1 if None)."""
+    if indices is None:
+        indices = np.arange(key_count)
+    return check_frame_indices(indices)
+
+
 def build_mot_entry(
     motion_name: str,
     frame_count: int,
     frame_rate: int,
     bones: List[Dict[str, Any]],
     compressed: bool = True,
+    optimize_4bpk: bool = False,
 ) -> bytes:
     """Build a complete RE2 v65 mot entry.
 
@@ -290,62 +921,33 @@ def build_mot_entry(
             - positions: optional list of (x, y, z) per keyframe
             - rot_frame_indices: optional list of frame numbers for rotation keys
             - pos_frame_indices: optional list of frame numbers for position keys
+            - rot_compressed: optional bool, overrides `compressed` for this bone
+            - pos_encoding: optional POS_ENCODINGS key (default 'float')
         compressed: If True, use 4-byte compressed rotation. If False, 12-byte uncompressed.
+        optimize_4bpk: Optimize the unpack parameters of compressed rotation tracks
 
     Returns:
         Complete mot entry as bytes.
     """
-    buf = bytearray()
-    bone_clip_count = len(bones)
+    return assemble_mot_entry(motion_name, frame_count, frame_rate,
+                              encode_bone_tracks(bones, compressed, optimize_4bpk))
 
-    # --- Phase 1: Build all data sections into separate buffers ---
-
-    # Compute per-bone track info
-    bone_tracks = []
-    for bone in bones:
-        name = bone['name']
-        bone_index = bone.get('index', 0)
-        bone_hash = bone.get('hash', bone_name_hash(name))
-        rotations = bone.get('rotations', [])
-        positions = bone.get('positions', None)
-        rot_frame_indices = bone.get('rot_frame_indices', None)
-        pos_frame_indices = bone.get('pos_frame_indices', None)
 
-        has_rot = len(rotations) > 0
-        has_pos = positions is not None and len(positions) > 0
-        track_flags = 0
-        if has_pos:
-            track_flags |= TRACK_HAS_POSITION
-        if has_rot:
-            track_flags |= TRACK_HAS_ROTATION
+@profiled('assemble entry')
+def assemble_mot_entry(
+    motion_name: str,
+    frame_count: int,
+    frame_rate: int,
+    encoded_bones: List[Dict[str, Any]],
+) -> bytes:
+    """Lay out a mot entry from already encoded bones (encode_bone_tracks).
 
-        tracks = []
-        # Position track (comes before rotation in track order)
-        if has_pos:
-            tracks.append({
-                'type': 'position',
-                'data': positions,
-                'frame_indices': pos_frame_indices,
-                'key_count': len(positions),
-            })
-        # Rotation track
-        if has_rot:
-            tracks.append({
-                'type': 'rotation',
-                'data': rotations,
-                'frame_indices': rot_frame_indices,
-                'key_count': len(rotations),
-            })
-
-        bone_tracks.append({
-            'name': name,
-            'index': bone_index,
-            'hash': bone_hash,
-            'track_flags': track_flags,
-            'tracks': tracks,
-        })
+    Returns:
+        Complete mot entry as bytes.
+    """
+    bone_clip_count = len(encoded_bones)
 
-    # --- Phase 2: Calculate layout and offsets ---
+    # --- Phase 1: Calculate layout and offsets ---
 
     # Motion name string (UTF-16LE, null-terminated)
     name_bytes = motion_name.encode('utf-16-le') + b'\x00\x00'
@@ -359,7 +961,7 @@ def build_mot_entry(
     bone_clips_end = bone_clips_start + bone_clips_size
 
     # Track headers (count total tracks across all bones)
-    total_tracks = sum(len(bt['tracks']) for bt in bone_tracks)
+    total_tracks = sum(len(bt['tracks']) for bt in encoded_bones)
     tracks_start = align_up(bone_clips_end, 8)
     tracks_size = total_tracks * TRACK_HEADER_SIZE
     tracks_end = tracks_start + tracks_size
@@ -370,36 +972,20 @@ def build_mot_entry(
     current_fd_offset = frame_data_start
 
     track_layout = []  # One entry per track with offsets
-    for bt in bone_tracks:
+    for bt in encoded_bones:
         for track in bt['tracks']:
-            key_count = track['key_count']
-            if track['type'] == 'rotation':
-                if compressed:
-                    bytes_per_key = 4
-                else:
-                    bytes_per_key = 12  # 3 floats
-            else:  # position
-                bytes_per_key = 12  # 3 floats (always uncompressed for now)
-
-            fd_offset = current_fd_offset
-            fd_size = key_count * bytes_per_key
-            current_fd_offset += fd_size
-
-            track_layout.append({
-                'track': track,
-                'parent_bone': bt,
-                'frame_data_offset': fd_offset,
-                'frame_data_size': fd_size,
-                'bytes_per_key': bytes_per_key,
-            })
+            # Keep every track 4-byte aligned (2-byte position keys can break it)
+            current_fd_offset = align_up(current_fd_offset, 4)
+            track_layout.append({'track': track, 'frame_data_offset': current_fd_offset})
+            current_fd_offset += track['frame_data'].nbytes
 
     frame_data_end = current_fd_offset
 
-    # Unpack data blocks (only for compressed rotation tracks)
+    # Unpack data blocks (only for compressed tracks)
     unpack_data_start = align_up(frame_data_end, 4)
     current_ud_offset = unpack_data_start
     for tl in track_layout:
-        if tl['track']['type'] == 'rotation' and compressed:
+        if tl['track']['unpack'] is not None:
             tl['unpack_data_offset'] = current_ud_offset
             current_ud_offset += UNPACK_DATA_SIZE
         else:
@@ -410,9 +996,8 @@ def build_mot_entry(
     frame_ind_start = align_up(unpack_data_end, 4)
     current_fi_offset = frame_ind_start
     for tl in track_layout:
-        key_count = tl['track']['key_count']
         tl['frame_ind_offset'] = current_fi_offset
-        current_fi_offset += key_count * 2  # int16 per key
+        current_fi_offset += len(tl['track']['frame_indices']) * 2
         current_fi_offset = align_up(current_fi_offset, 2)  # keep 2-byte aligned
     frame_ind_end = current_fi_offset
 
@@ -425,7 +1010,7 @@ def build_mot_entry(
     # Total entry size
     entry_size = align_up(bone_hdrs_end, 16)
 
-    # --- Phase 3: Write the binary data ---
+    # --- Phase 2: Write the binary data ---
 
     buf = bytearray(entry_size)
 
@@ -460,7 +1045,7 @@ def build_mot_entry(
 
     # --- Bone clip headers (24 bytes each) ---
     track_idx = 0
-    for bc_idx, bt in enumerate(bone_tracks):
+    for bc_idx, bt in enumerate(encoded_bones):
         pos = bone_clips_start + bc_idx * BONE_CLIP_HEADER_SIZE
         # Offset to first track header for this bone
         track_hdr_offset = tracks_start + track_idx * TRACK_HEADER_SIZE
@@ -475,87 +1060,131 @@ def build_mot_entry(
 
         track_idx += len(bt['tracks'])
 
-    # --- Track headers (40 bytes each) ---
+    # --- Track headers (40 bytes each) and their payloads ---
+    max_frame = float(frame_count - 1)
     for tl_idx, tl in enumerate(track_layout):
         track = tl['track']
         pos = tracks_start + tl_idx * TRACK_HEADER_SIZE
-        key_count = track['key_count']
-        max_frame = float(frame_count - 1)
-
-        if track['type'] == 'rotation':
-            if compressed:
-                flags = FLAG_ROT_COMPRESSED
-            else:
-                flags = FLAG_ROT_UNCOMPRESSED
-        else:  # position
-            flags = FLAG_POS_UNCOMPRESSED
 
-        # Determine unpack data offset (mot-entry-relative)
-        ud_offs = tl['unpack_data_offset'] if tl['unpack_data_offset'] > 0 else 0
-
-        struct.pack_into('<I', buf, pos + 0, flags)                     # flags
-        struct.pack_into('<I', buf, pos + 4, key_count)                 # keyCount
+        struct.pack_into('<I', buf, pos + 0, track['flags'])            # flags
+        struct.pack_into('<I', buf, pos + 4, track['key_count'])        # keyCount
         struct.pack_into('<I', buf, pos + 8, frame_rate)                # frameRate (RE2 extra)
         struct.pack_into('<f', buf, pos + 12, max_frame)                # maxFrame (RE2 extra)
         struct.pack_into('<Q', buf, pos + 16, tl['frame_ind_offset'])     # frameIndOffs (frame index array)
         struct.pack_into('<Q', buf, pos + 24, tl['frame_data_offset'])  # frameDataOffs (keyframe data)
-        struct.pack_into('<Q', buf, pos + 32, ud_offs)                  # unpackDataOffs
+        struct.pack_into('<Q', buf, pos + 32, tl['unpack_data_offset'])  # unpackDataOffs (mot-entry-relative)
 
-    # --- Frame data ---
-    for tl in track_layout:
-        track = tl['track']
-        data_list = track['data']
-        fd_pos = tl['frame_data_offset']
-
-        if track['type'] == 'rotation':
-            if compressed:
-                # Compute unpack params then write compressed bytes
-                quats = [(d[0], d[1], d[2], d[3]) for d in data_list]
-                scale, base = compute_unpack_params(quats)
-
-                # Write compressed keyframes (4 bytes each)
-                for k, q in enumerate(quats):
-                    comp = compress_quat_4bpk(q, base, scale)
-                    buf[fd_pos + k * 4:fd_pos + k * 4 + 4] = comp
-
-                # Write unpack data block (32 bytes: scale[4] then base[4])
-                ud_pos = tl['unpack_data_offset']
-                for i in range(4):
-                    struct.pack_into('<f', buf, ud_pos + i * 4, scale[i])
-                for i in range(4):
-                    struct.pack_into('<f', buf, ud_pos + 16 + i * 4, base[i])
-            else:
-                # Uncompressed rotation: 3 floats per key (qX, qY, qZ)
-                # Engine reconstructs qW = sqrt(max(0, 1 - qX^2 - qY^2 - qZ^2))
-                for k, q in enumerate(data_list):
-                    struct.pack_into('<f', buf, fd_pos + k * 12 + 0, q[0])  # qX
-                    struct.pack_into('<f', buf, fd_pos + k * 12 + 4, q[1])  # qY
-                    struct.pack_into('<f', buf, fd_pos + k * 12 + 8, q[2])  # qZ
+        frame_data = track['frame_data']
+        if frame_data.dtype == np.uint8:
+            write_bytes(buf, tl['frame_data_offset'], frame_data)
         else:
-            # Position: 3 floats per key (X, Y, Z)
-            for k, p in enumerate(data_list):
-                struct.pack_into('<f', buf, fd_pos + k * 12 + 0, p[0])
-                struct.pack_into('<f', buf, fd_pos + k * 12 + 4, p[1])
-                struct.pack_into('<f', buf, fd_pos + k * 12 + 8, p[2])
-
-    # --- Frame index arrays (int16 per key) ---
-    for tl in track_layout:
-        fi_pos = tl['frame_ind_offset']
-        key_count = tl['track']['key_count']
-        for k in range(key_count):
-            struct.pack_into('<h', buf, fi_pos + k * 2, k)  # int16 frame index
+            write_float_triplets(buf, tl['frame_data_offset'], frame_data)
+        if track['unpack'] is not None:
+            write_unpack_block(buf, tl['unpack_data_offset'], track['unpack'])
+        write_frame_indices(buf, tl['frame_ind_offset'], track['frame_indices'])
 
     # --- Minimal BoneHeaders stub (16 bytes) ---
     # boneHdrOffs: relative offset to entries (0x10 = right after this 16-byte header)
     struct.pack_into('<Q', buf, bone_hdrs_start, 0x10)   # boneHdrOffs (relative to struct)
     struct.pack_into('<Q', buf, bone_hdrs_start + 8, 0)  # boneHdrCount = 0
 
+    profile_count(bytes=len(buf))
     return bytes(buf)
 
+
+@profiled('encode')
+def encode_mot_bones(
+    bones: List[Dict[str, Any]],
+    compressed: bool = True,
+    rot_tolerance_deg: Optional[float] = None,
+    pos_tolerance: Optional[float] = None,
+    max_rot_error_deg: Optional[float] = None,
+    max_pos_error: Optional[float] = None,
+    optimize_4bpk: bool = False,
+    cache=None,
+    experimental_pos_encodings: bool = False,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Key reduction, encoding selection and encode_bone_tracks in one pass,
+    as shared by the CAF and dump converters.
+
+    With a build_cache.BuildCache, each bone is looked up by a hash of its
+    source keys and the options, and only the bones that changed are reduced
+    and encoded again.
+
+    Returns:
+        (encoded bones for assemble_mot_entry, report) where report has
+        'reduction' (reduce_bones stats or None), 'rot_encodings' /
+        'pos_encodings' (select_*_encodings rows or None) and 'cached'
+        (number of bones taken from the cache).
+    """
+    reduce = rot_tolerance_deg is not None or pos_tolerance is not None
+
+    def select(batch):
+        reduction = rot_rows = pos_rows = None
+        sources = None
+        if reduce:
+            # Encoding errors are measured against the unreduced keys
+            sources = batch
+            batch, reduction = reduce_bones(batch, rot_tolerance_deg, pos_tolerance)
+        if max_rot_error_deg is not None:
+            batch, rot_rows = select_rotation_encodings(batch, max_rot_error_deg, optimize_4bpk,
+                                                        sources)
+        if max_pos_error is not None:
+            batch, pos_rows = select_position_encodings(batch, max_pos_error, sources,
+                                                        experimental_pos_encodings)
+        return batch, reduction, rot_rows, pos_rows
+
+    if cache is None:
+        selected, reduction, rot_rows, pos_rows = select(bones)
+        report = {'reduction': reduction, 'rot_encodings': rot_rows,
+                  'pos_encodings': pos_rows, 'cached': 0}
+        return encode_bone_tracks(selected, compressed, optimize_4bpk), report
+
+    options = [compressed, rot_tolerance_deg, pos_tolerance, max_rot_error_deg, max_pos_error,
+               optimize_4bpk, experimental_pos_encodings]
+    encoded = [None] * len(bones)
+    keys = []
+    miss_slots, miss_bones, miss_reports = [], [], []
+    for slot, bone in enumerate(bones):
+        key = cache.key('bone', options, bone['name'], int(bone.get('index', 0)), bone.get('hash'),
+                        *[None if bone.get(k) is None else np.asarray(bone[k], dtype=np.float64)
+                          for k in ('rotations', 'positions', 'rot_frame_indices', 'pos_frame_indices')],
+                        bone.get('rot_compressed'), bone.get('pos_encoding'))
+        keys.append(key)
+        encoded[slot] = cache.get_bone(key)
+        if encoded[slot] is None:
+            selected, reduction, rot_rows, pos_rows = select([bone])
+            miss_slots.append(slot)
+            miss_bones.extend(selected)
+            miss_reports.append({'reduction': reduction, 'rot': rot_rows, 'pos': pos_rows})
+
+    miss_encoded = encode_bone_tracks(miss_bones, compressed, optimize_4bpk)
+    for slot, bone, reports in zip(miss_slots, miss_encoded, miss_reports):
+        bone['reports'] = reports
+        cache.put_bone(keys[slot], bone)
+        encoded[slot] = bone
+
+    reduction = None
+    if reduce:
+        reduction = {}
+        for bone in encoded:
+            for k, v in bone['reports']['reduction'].items():
+                reduction[k] = reduction.get(k, 0) + v
+    report = {
+        'reduction': reduction,
+        'rot_encodings': None if max_rot_error_deg is None else
+                         [r for b in encoded for r in b['reports']['rot']],
+        'pos_encodings': None if max_pos_error is None else
+                         [r for b in encoded for r in b['reports']['pos']],
+        'cached': len(bones) - len(miss_slots),
+    }
+    return encoded, report
+
 # ===========================================================================
 # Build a .motlist.85 container
 # ===========================================================================
 
+@profiled('build motlist')
 def build_motlist(
     motlist_name: str,
     mot_entries: List[bytes],
@@ -569,6 +1198,22 @@ def build_motlist(
     Returns:
         Complete .motlist.85 file as bytes.
     """
+    buf, _, _ = _layout_motlist(motlist_name, mot_entries)
+    profile_count(entries=len(mot_entries), bytes=len(buf))
+    return bytes(buf)
+
+
+def _layout_motlist(
+    motlist_name: str,
+    mot_entries: List[bytes],
+    shared_data: bytes = b'',
+) -> Tuple[bytearray, List[int], int]:
+    """Lay out a motlist: header, name, pointer table, entries, optional
+    shared data block, collection data.
+
+    Returns:
+        (file buffer, absolute entry offsets, absolute shared data offset)
+    """
     num_entries = len(mot_entries)
 
     # --- Motlist name string ---
@@ -599,10 +1244,14 @@ def build_motlist(
     entries_end = entries_start + len(entries_buf)
     entries_end_aligned = align_up(entries_end, 16)
 
+    # --- Shared track data (dedup), referenced by entry-relative offsets ---
+    shared_start = entries_end_aligned
+    shared_end_aligned = align_up(shared_start + len(shared_data), 16)
+
     # --- Collection data (matches real game format: 24 bytes) ---
     # Real game hex: 00000000 00000000 0000 0100 00000000 00000000 00000000
     # Layout: uint64(0) + uint16(0) + uint16(num_entries) + padding to 24 bytes
-    col_start = entries_end_aligned
+    col_start = shared_end_aligned
     col_data = bytearray(24)
     struct.pack_into('<H', col_data, 10, num_entries)   # entry count at byte 10
     col_data = bytes(col_data)
@@ -631,22 +1280,157 @@ def build_motlist(
     # Mot entries
     buf[entries_start:entries_start + len(entries_buf)] = entries_buf
 
+    # Shared track data
+    buf[shared_start:shared_start + len(shared_data)] = shared_data
+
     # Collection data
     buf[col_start:col_start + len(col_data)] = col_data
 
-    return bytes(buf)
+    return buf, entry_offsets, shared_start
+
+# ===========================================================================
+# Track data deduplication across mot entries
+# ===========================================================================
+
+def _entries_span(mot_entries: List[bytes]) -> int:
+    """Bytes the entries take in a motlist, 16-byte aligned as laid out."""
+    span = 0
+    for entry_bytes in mot_entries:
+        span = align_up(span, 16) + len(entry_bytes)
+    return align_up(span, 16)
+
+
+def _track_bytes_per_key(flags: int) -> int:
+    if flags == FLAG_ROT_COMPRESSED:
+        return 4
+    if flags == FLAG_ROT_UNCOMPRESSED:
+        return 12
+    for pos_flags, bpk in POS_ENCODINGS.values():
+        if flags == pos_flags:
+            return bpk
+    raise ValueError(f"Unknown track flags 0x{flags:08X}")
+
+
+@profiled('build motlist')
+def build_motlist_dedup(
+    motlist_name: str,
+    mot_entries: List[bytes],
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Build a .motlist.85 where identical track payloads are stored once.
+
+    Every track's frame data, unpack block and frame index array is
+    content-hashed and moved into one shared block after the last entry;
+    track headers of all entries point at it through their entry-relative
+    offsets (always positive, since the block follows every entry). Entries
+    keep their header, name, bone clips, track headers and BoneHeaders stub.
+
+    Args:
+        motlist_name: Name string for the motlist
+        mot_entries: Mot entry blobs from build_mot_entry
+
+    Returns:
+        (motlist bytes, report) where report has per-kind 'refs', 'unique',
+        'bytes_in', 'bytes_out' under 'frame_data' / 'unpack' / 'frame_indices'
+        plus 'size_before' and 'size_after' of the whole file.
+    """
+    kinds = ('frame_data', 'unpack', 'frame_indices')
+    report = {k: {'refs': 0, 'unique': 0, 'bytes_in': 0, 'bytes_out': 0} for k in kinds}
+    shared = bytearray()
+    shared_at: Dict[bytes, int] = {}
+
+    def share(kind: str, blob: bytes) -> int:
+        stats = report[kind]
+        stats['refs'] += 1
+        stats['bytes_in'] += len(blob)
+        pos = shared_at.get(blob)
+        if pos is None:
+            pad_buffer(shared, 4)
+            pos = len(shared)
+            shared.extend(blob)
+            shared_at[blob] = pos
+            stats['unique'] += 1
+            stats['bytes_out'] += len(blob)
+        return pos
+
+    # (entry index, track header offset in new entry, shared positions)
+    fixups = []
+    new_entries = []
+    for entry_idx, entry in enumerate(mot_entries):
+        bone_hdrs_offs = struct.unpack_from('<Q', entry, 0x10)[0]
+        bone_clip_offs = struct.unpack_from('<Q', entry, 0x18)[0]
+        bone_clip_count = struct.unpack_from('<H', entry, 0x6A)[0]
+
+        tracks = []
+        for bc in range(bone_clip_count):
+            pos = bone_clip_offs + bc * BONE_CLIP_HEADER_SIZE
+            track_flags = entry[pos + 2]
+            track_hdr_offs = struct.unpack_from('<Q', entry, pos + 16)[0]
+            count = bin(track_flags & (TRACK_HAS_POSITION | TRACK_HAS_ROTATION | TRACK_HAS_SCALE)).count('1')
+            for t in range(count):
+                tracks.append(track_hdr_offs + t * TRACK_HEADER_SIZE)
+
+        # Payloads start after the last track header; everything before stays
+        head_end = max([bone_clip_offs + bone_clip_count * BONE_CLIP_HEADER_SIZE]
+                       + [t + TRACK_HEADER_SIZE for t in tracks])
+        new_entry = bytearray(entry[:head_end])
+        pad_buffer(new_entry, 8)
+        new_bone_hdrs = len(new_entry)
+        new_entry.extend(entry[bone_hdrs_offs:bone_hdrs_offs + 16])
+        pad_buffer(new_entry, 16)
+        struct.pack_into('<Q', new_entry, 0x10, new_bone_hdrs)
+
+        for t in tracks:
+            flags, key_count = struct.unpack_from('<II', entry, t)
+            fi_offs, fd_offs, ud_offs = struct.unpack_from('<QQQ', entry, t + 16)
+            fd_size = key_count * _track_bytes_per_key(flags)
+            positions = [
+                share('frame_indices', bytes(entry[fi_offs:fi_offs + key_count * 2])) if fi_offs else None,
+                share('frame_data', bytes(entry[fd_offs:fd_offs + fd_size])) if fd_offs else None,
+                share('unpack', bytes(entry[ud_offs:ud_offs + UNPACK_DATA_SIZE])) if ud_offs else None,
+            ]
+            fixups.append((entry_idx, t, positions))
+        new_entries.append(new_entry)
+
+    buf, entry_offsets, shared_start = _layout_motlist(motlist_name, new_entries, bytes(shared))
+    for entry_idx, t, positions in fixups:
+        entry_abs = entry_offsets[entry_idx]
+        for field, pos in enumerate(positions):
+            if pos is not None:
+                struct.pack_into('<Q', buf, entry_abs + t + 16 + field * 8,
+                                 shared_start + pos - entry_abs)
+
+    # Without dedup only the entries and the (absent) shared block differ
+    entries_start = entry_offsets[0] if entry_offsets else shared_start
+    tail = len(buf) - align_up(shared_start + len(shared), 16)
+    report['size_before'] = entries_start + _entries_span(mot_entries) + tail
+    report['size_after'] = len(buf)
+    profile_count(entries=len(mot_entries), bytes=len(buf))
+    return bytes(buf), report
+
+
+def format_dedup_report(report: Dict[str, Any]) -> str:
+    """Bytes saved by build_motlist_dedup, per payload kind and overall."""
+    lines = [f"{'Shared data':<16} {'Refs':>6} {'Unique':>6} {'Before':>10} {'After':>10}"]
+    for kind, label in (('frame_data', 'Frame data'), ('unpack', 'Unpack blocks'),
+                        ('frame_indices', 'Frame indices')):
+        r = report[kind]
+        lines.append(f"{label:<16} {r['refs']:>6} {r['unique']:>6} "
+                     f"{r['bytes_in'] / 1024:>7.1f} KB {r['bytes_out'] / 1024:>7.1f} KB")
+    before, after = report['size_before'], report['size_after']
+    lines.append(f"File: {before / 1024:.1f} KB -> {after / 1024:.1f} KB "
+                 f"({(before - after) / 1024:.1f} KB saved, {100.0 * (before - after) / max(before, 1):.1f}%)")
+    return "\n".join(lines)
 
 # ===========================================================================
 # JSON to .motlist.85 converter
 # ===========================================================================
 
 def load_caf_json(json_path: str) -> Dict[str, Any]:
-    """Load and validate a CAF_AnimData JSON file."""
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-
-    if data.get('format') != 'CAF_AnimData':
-        raise ValueError(f"Not a CAF_AnimData file: format={data.get('format')}")
+    """Load and validate a CAF_AnimData JSON file.
+    The file is streamed (caf_json_reader.py): 'data' is a float32
+    (frame_count, bone_count, 7) array, as from load_caf_binary.
+    """
+    data = read_caf_json(json_path)
 
     required = ['bones', 'data', 'frame_count', 'bone_count']
     for key in required:
@@ -655,124 +1439,323 @@ def load_caf_json(json_path: str) -> Dict[str, Any]:
 
     return data
 
+# ---------------------------------------------------------------------------
+# Binary CAF (.cafb), written by blender_anim_exporter.py
+#
+#   0x00  char[4] magic 'CAFB'     0x1C  i32  frame_start
+#   0x04  u32  version (1)         0x20  i32  frame_end
+#   0x08  u32  header size (0x40)  0x24  u32  metadata size (bytes)
+#   0x0C  u32  flags (bit0 = has_positions)
+#   0x10  u32  bone_count          0x28  u64  bone table offset
+#   0x14  u32  frame_count         0x30  u64  frame block offset (16-aligned)
+#   0x18  u32  fps                 0x38  u64  metadata offset (UTF-8 JSON)
+#
+# Bone table: per bone a u16 byte length + UTF-8 name. Frame block:
+# float32[frame_count][bone_count][7] as [qx, qy, qz, qw, px, py, pz].
+# ---------------------------------------------------------------------------
+
+CAF_BINARY_MAGIC = b'CAFB'
+CAF_BINARY_VERSION = 1
+CAF_BINARY_FLAG_POSITIONS = 0x01
+_CAF_BINARY_HEADER = struct.Struct('<4sIIIIIIiiIQQQ')
+
+
+def load_caf_binary(path: str, use_mmap: bool = True) -> Dict[str, Any]:
+    """Load a binary CAF file into the same dict layout as load_caf_json.
+    'data' is a float32 (frame_count, bone_count, 7) array, memory-mapped
+    unless use_mmap is False.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(_CAF_BINARY_HEADER.size)
+        if len(header) < _CAF_BINARY_HEADER.size or header[:4] != CAF_BINARY_MAGIC:
+            raise ValueError(f"Not a binary CAF file: magic={header[:4]!r}")
+        (_, version, _, flags, bone_count, frame_count, fps, frame_start, frame_end,
+         meta_size, bone_table_offs, frames_offs, meta_offs) = _CAF_BINARY_HEADER.unpack(header)
+        if version != CAF_BINARY_VERSION:
+            raise ValueError(f"Unsupported binary CAF version: {version}")
+
+        f.seek(bone_table_offs)
+        bones = []
+        for _ in range(bone_count):
+            (name_len,) = struct.unpack('<H', f.read(2))
+            bones.append(f.read(name_len).decode('utf-8'))
+
+        f.seek(meta_offs)
+        meta = json.loads(f.read(meta_size).decode('utf-8')) if meta_size else {}
+
+        shape = (frame_count, bone_count, 7)
+        if use_mmap and frame_count and bone_count:
+            frames = np.memmap(path, dtype='<f4', mode='r', offset=frames_offs, shape=shape)
+        else:
+            f.seek(frames_offs)
+            frames = np.fromfile(f, dtype='<f4', count=frame_count * bone_count * 7)
+            if frames.size != frame_count * bone_count * 7:
+                raise ValueError("Binary CAF frame block is truncated")
+            frames = frames.reshape(shape)
+
+    data = dict(meta)
+    data.update({
+        'format': 'CAF_AnimData',
+        'version': version,
+        'fps': fps,
+        'frame_count': frame_count,
+        'frame_start': frame_start,
+        'frame_end': frame_end,
+        'bone_count': bone_count,
+        'bones': bones,
+        'has_positions': bool(flags & CAF_BINARY_FLAG_POSITIONS),
+        'data': frames,
+    })
+    return data
 
-def json_to_motlist(
-    json_path: str,
-    output_path: str,
-    reference_motlist: Optional[str] = None,
-    bone_index_override: Optional[Dict[str, int]] = None,
-    compressed: bool = True,
-    motion_name: Optional[str] = None,
-    motlist_name: str = "custom_anim",
-    include_positions: bool = True,
-    axis_convert: bool = False,
-) -> str:
-    """Convert a CAF JSON animation to .motlist.85 file.
 
-    Args:
-        json_path: Path to CAF_AnimData JSON file
-        output_path: Output .motlist.85 file path
-        reference_motlist: Optional path to reference .motlist.85 for bone index mapping
-        bone_index_override: Optional {bone_name: index} dict overriding bone indices
-        compressed: Use compressed (4 bpk) or uncompressed (12 bytes/key) rotation
-        motion_name: Animation name (default: from JSON action_name)
-        motlist_name: Motlist container name
-        include_positions: Include position tracks if JSON has them
-        axis_convert: Apply Blender Z-up to RE Engine Y-up axis conversion
+@profiled('parse')
+def load_caf_anim(path: str) -> Dict[str, Any]:
+    """Load a CAF animation from either a binary CAF or a CAF JSON file."""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    anim_data = load_caf_binary(path) if magic == CAF_BINARY_MAGIC else load_caf_json(path)
+    profile_count(bones=len(anim_data['bones']), frames=anim_data['frame_count'])
+    return anim_data
 
-    Returns:
-        Status string.
-    """
-    # Load JSON
-    anim_data = load_caf_json(json_path)
-    bone_names = anim_data['bones']
-    frames = anim_data['data']
-    frame_count = anim_data['frame_count']
-    fps = anim_data.get('fps', 60)
-    has_positions = anim_data.get('has_positions', False) and include_positions
 
-    if motion_name is None:
-        motion_name = anim_data.get('action_name', 'custom_animation')
-        # Clean up name for RE Engine (no spaces, limited chars)
-        motion_name = motion_name.replace(' ', '_')
+def resolve_bone_indices(
+    bone_names: List[str],
+    hash_to_idx: Optional[Dict[int, int]] = None,
+    bone_index_override: Optional[Dict[str, int]] = None,
+) -> Dict[str, int]:
+    """Map bone names to RE2 bone indices.
 
-    # Build bone index mapping
+    1. From a reference {bone_hash -> index} mapping (extract_bone_mapping)
+    2. From an explicit {bone_name: index} override
+    3. Fallback: sequential indices after the highest mapped one
+    """
     bone_index_map = {}
 
-    # 1. From reference motlist (if provided)
-    if reference_motlist and os.path.exists(reference_motlist):
-        hash_to_idx = extract_bone_mapping(reference_motlist)
-        for name in bone_names:
-            h = bone_name_hash(name)
+    if hash_to_idx:
+        for name, h in zip(bone_names, hash_names(bone_names)):
             if h in hash_to_idx:
                 bone_index_map[name] = hash_to_idx[h]
 
-    # 2. From explicit override
     if bone_index_override:
         bone_index_map.update(bone_index_override)
 
-    # 3. Fallback: sequential indices for unmapped bones
     next_idx = max(bone_index_map.values(), default=-1) + 1
     for name in bone_names:
         if name not in bone_index_map:
             bone_index_map[name] = next_idx
             next_idx += 1
 
+    return bone_index_map
+
+
+def caf_motion_name(anim_data: Dict[str, Any]) -> str:
+    """Default motion name of a CAF animation: its action name, no spaces."""
+    # Clean up name for RE Engine (no spaces, limited chars)
+    return anim_data.get('action_name', 'custom_animation').replace(' ', '_')
+
+
+def build_caf_mot_entry(
+    anim_data: Dict[str, Any],
+    motion_name: str,
+    bone_index_map: Dict[str, int],
+    compressed: bool = True,
+    include_positions: bool = True,
+    axis_convert: Union[bool, str] = False,
+    rot_tolerance_deg: Optional[float] = None,
+    pos_tolerance: Optional[float] = None,
+    max_rot_error_deg: Optional[float] = None,
+    max_pos_error: Optional[float] = None,
+    cache=None,
+    target_fps: Optional[int] = None,
+    target_frames: Optional[int] = None,
+    position_interp: str = 'linear',
+    optimize_4bpk: bool = False,
+    experimental_pos_encodings: bool = False,
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Build one mot entry from a loaded CAF animation (load_caf_anim).
+    Tracks are axis-converted (axis_convert: True or a preprocess.AXIS_PRESETS
+    name), normalized and made sign-continuous first (preprocess.py).
+    cache: optional build_cache.BuildCache for per-bone track reuse.
+    target_fps / target_frames resample the clip first (resample.py), with
+    position_interp 'linear' or 'cubic' for positions. optimize_4bpk searches
+    4bpk unpack parameters (unpack_optimizer.py). experimental_pos_encodings
+    lets max_pos_error pick the 16-bit axis position encodings.
+
+    Returns:
+        (mot_entry, info) where info has bone_count, frame_count, fps,
+        has_positions, a 'notes' string with reduction/encoding reports and
+        cached_bones (bones reused from the build cache).
+    """
+    bone_names = anim_data['bones']
+    frames = anim_data['data']
+    frame_count = anim_data['frame_count']
+    fps = anim_data.get('fps', 60)
+    has_positions = anim_data.get('has_positions', False) and include_positions
+
+    # (frames, bones, 7) [qx, qy, qz, qw, px, py, pz]
+    frames = np.asarray(frames)
+    if frames.ndim != 3 or frames.shape[2] < 7:
+        raise ValueError(f"CAF frame data must be frames x bones x 7, got shape {frames.shape}")
+    frames = frames[:frame_count]
+    quats, positions, flips = preprocess_tracks(frames, axis_convert)
+    sign_fix_str = f"\n  Fixed {int(flips.sum())} quaternion sign flips" if flips.any() else ""
+
+    # Optional frame-rate / length conversion before encoding
+    resample_str = ""
+    if (target_fps is not None or target_frames is not None) and len(frames):
+        src_quats, src_positions = quats, positions if has_positions else None
+        quats, positions, fps, t = resample_clip(
+            src_quats, src_positions, fps, target_fps, target_frames, position_interp)
+        rot_err, pos_err = resample_error(src_quats, src_positions, quats, positions, t)
+        resample_str = "\n  " + format_resample_report(
+            len(src_quats), anim_data.get('fps', 60), len(quats), fps, rot_err, pos_err)
+        frame_count = len(quats)
+        fps = int(round(fps))
+
     # Build per-bone animation data
     bones = []
-    for bone_idx_in_json, name in enumerate(bone_names):
-        # Collect rotation and position data across all frames
-        rotations = []
-        positions = []
-
-        for frame_idx in range(frame_count):
-            if frame_idx >= len(frames):
-                break
-            frame = frames[frame_idx]
-            if bone_idx_in_json >= len(frame):
-                break
-
-            bone_data = frame[bone_idx_in_json]
-            # bone_data = [qx, qy, qz, qw, px, py, pz]
-            qx, qy, qz, qw = bone_data[0], bone_data[1], bone_data[2], bone_data[3]
-            px, py, pz = bone_data[4], bone_data[5], bone_data[6]
-
-            if axis_convert:
-                qx, qy, qz, qw = convert_quat_blender_to_re(qx, qy, qz, qw)
-                px, py, pz = convert_position_blender_to_re(px, py, pz)
-
-            # Normalize quaternion
-            mag = math.sqrt(qx*qx + qy*qy + qz*qz + qw*qw)
-            if mag > 0.001:
-                qx /= mag
-                qy /= mag
-                qz /= mag
-                qw /= mag
-
-            rotations.append((qx, qy, qz, qw))
-            if has_positions:
-                positions.append((px, py, pz))
-
+    for bone_idx_in_json, name in enumerate(bone_names[:frames.shape[1]]):
         bone_entry = {
             'name': name,
             'index': bone_index_map[name],
-            'rotations': rotations,
+            'rotations': quats[:, bone_idx_in_json],
         }
-        if has_positions and positions:
-            bone_entry['positions'] = positions
+        if has_positions and len(quats):
+            bone_entry['positions'] = positions[:, bone_idx_in_json]
 
         bones.append(bone_entry)
 
     # Sort bones by index (required for proper engine matching)
     bones.sort(key=lambda b: b['index'])
 
-    # Build mot entry
-    mot_entry = build_mot_entry(
-        motion_name=motion_name,
-        frame_count=frame_count,
-        frame_rate=fps,
-        bones=bones,
+    # Optional error-bounded key reduction (sparse frame index arrays) and
+    # adaptive per-track encoding
+    encoded, report = encode_mot_bones(
+        bones, compressed, rot_tolerance_deg, pos_tolerance, max_rot_error_deg,
+        max_pos_error if has_positions else None, optimize_4bpk, cache=cache,
+        experimental_pos_encodings=experimental_pos_encodings)
+    reduction_str = ""
+    if report['reduction'] is not None:
+        reduction_str = f"\n  Key reduction: {format_reduction_stats(report['reduction'])}"
+    encoding_str = ""
+    if report['rot_encodings'] is not None:
+        encoding_str = "\n" + format_encoding_report(report['rot_encodings'])
+    if report['pos_encodings'] is not None:
+        encoding_str += "\n" + format_encoding_report(report['pos_encodings'], "Position", "dist")
+
+    mot_entry = assemble_mot_entry(motion_name, frame_count, fps, encoded)
+    info = {
+        'bone_count': len(bones),
+        'frame_count': frame_count,
+        'fps': fps,
+        'has_positions': has_positions,
+        'notes': sign_fix_str + resample_str + reduction_str + encoding_str,
+        'cached_bones': report['cached'],
+    }
+    return mot_entry, info
+
+
+@profiled('convert')
+def json_to_motlist(
+    json_path: str,
+    output_path: str,
+    reference_motlist: Optional[Union[str, List[str]]] = None,
+    bone_index_override: Optional[Dict[str, int]] = None,
+    compressed: bool = True,
+    motion_name: Optional[str] = None,
+    motlist_name: str = "custom_anim",
+    include_positions: bool = True,
+    axis_convert: Union[bool, str] = False,
+    rot_tolerance_deg: Optional[float] = None,
+    pos_tolerance: Optional[float] = None,
+    max_rot_error_deg: Optional[float] = None,
+    max_pos_error: Optional[float] = None,
+    cache_dir: Optional[str] = None,
+    target_fps: Optional[int] = None,
+    target_frames: Optional[int] = None,
+    position_interp: str = 'linear',
+    optimize_4bpk: bool = False,
+    experimental_pos_encodings: bool = False,
+) -> str:
+    """Convert a CAF JSON or binary CAF animation to .motlist.85 file.
+
+    Args:
+        json_path: Path to CAF_AnimData JSON or binary CAF (.cafb) file
+        output_path: Output .motlist.85 file path
+        reference_motlist: Optional reference .motlist.85 path (or list of paths,
+            merged into one skeleton map) for bone index mapping
+        bone_index_override: Optional {bone_name: index} dict overriding bone indices
+        compressed: Use compressed (4 bpk) or uncompressed (12 bytes/key) rotation
+        motion_name: Animation name (default: from JSON action_name)
+        motlist_name: Motlist container name
+        include_positions: Include position tracks if JSON has them
+        axis_convert: Apply Blender Z-up to RE Engine Y-up axis conversion (True),
+            or a preprocess.AXIS_PRESETS name ('blender_to_re', 'identity')
+        rot_tolerance_deg: Enable rotation key reduction with this max angular error
+        pos_tolerance: Enable position key reduction with this max distance error
+        max_rot_error_deg: Choose 4bpk/float/static per rotation track under this
+            angular error budget (overrides `compressed`)
+        max_pos_error: Choose float/static per position track under this
+            distance error budget
+        cache_dir: Build cache folder (build_cache.py): an unchanged input,
+            options, reference and tool version reuse the previous output, and
+            otherwise unchanged bones reuse their encoded tracks
+        target_fps: Resample to this frame rate before encoding (keeps duration)
+        target_frames: Resample to this many frames (keeps frame rate)
+        position_interp: 'linear' or 'cubic' position resampling
+        optimize_4bpk: Search 4bpk unpack ranges and key hemispheres for the
+            lowest quantization error instead of raw min/max
+        experimental_pos_encodings: Let max_pos_error pick the 16-bit axis
+            position encodings, whose key layout is not verified in game
+
+    Returns:
+        Status string.
+    """
+    cache = output_key = None
+    if cache_dir:
+        from build_cache import BuildCache
+        cache = BuildCache(cache_dir)
+        output_key = cache.key(
+            'caf', cache.file_digest(json_path),
+            [cache.file_digest(p) for p in reference_paths(reference_motlist)],
+            bone_index_override, [compressed, motion_name, motlist_name, include_positions,
+                                  axis_convert, rot_tolerance_deg, pos_tolerance,
+                                  max_rot_error_deg, max_pos_error, target_fps,
+                                  target_frames, position_interp, optimize_4bpk,
+                                  experimental_pos_encodings])
+        cached = cache.get_output(output_key)
+        if cached is not None:
+            motlist, info = cached
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(output_path, 'wb') as f:
+                f.write(motlist)
+            return (_caf_status(output_path, len(motlist), info)
+                    + "\n  Build cache: unchanged, output reused")
+
+    # Load JSON or binary CAF
+    anim_data = load_caf_anim(json_path)
+    if motion_name is None:
+        motion_name = caf_motion_name(anim_data)
+
+    hash_to_idx = reference_bone_mapping(reference_motlist)
+    bone_index_map = resolve_bone_indices(anim_data['bones'], hash_to_idx, bone_index_override)
+
+    mot_entry, info = build_caf_mot_entry(
+        anim_data, motion_name, bone_index_map,
         compressed=compressed,
+        include_positions=include_positions,
+        axis_convert=axis_convert,
+        rot_tolerance_deg=rot_tolerance_deg,
+        pos_tolerance=pos_tolerance,
+        max_rot_error_deg=max_rot_error_deg,
+        max_pos_error=max_pos_error,
+        cache=cache,
+        target_fps=target_fps,
+        target_frames=target_frames,
+        position_interp=position_interp,
+        optimize_4bpk=optimize_4bpk,
+        experimental_pos_encodings=experimental_pos_encodings,
     )
 
     # Build motlist container
@@ -783,10 +1766,31 @@ def json_to_motlist(
 
     # Write output
     os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-    with open(output_path, 'wb') as f:
-        f.write(motlist)
-
-    file_size = len(motlist)
+    with profile_stage('write', bytes=len(motlist)):
+        with open(output_path, 'wb') as f:
+            f.write(motlist)
+
+    if max_rot_error_deg is not None:
+        rotation_str = f"adaptive (max {max_rot_error_deg} deg error)"
+    elif compressed:
+        rotation_str = 'compressed (4 bpk)'
+    else:
+        rotation_str = 'uncompressed (12 B/key)'
+    if optimize_4bpk and (compressed or max_rot_error_deg is not None):
+        rotation_str += ", optimized 4bpk unpack"
+
+    # Everything of the status line but the output path, kept with a cached output
+    stats = {k: info[k] for k in ('bone_count', 'frame_count', 'fps', 'has_positions', 'notes')}
+    stats['rotation'] = rotation_str
+    status = _caf_status(output_path, len(motlist), stats)
+    if cache is not None:
+        cache.put_output(output_key, motlist, stats)
+        status += f"\n  Build cache: {info['cached_bones']}/{info['bone_count']} bones reused"
+    return status
+
+
+def _caf_status(output_path: str, file_size: int, stats: Dict[str, Any]) -> str:
+    """json_to_motlist status text for a written motlist."""
     if file_size < 1024:
         size_str = f"{file_size} B"
     elif file_size < 1048576:
@@ -797,12 +1801,356 @@ def json_to_motlist(
     return (
         f"Wrote {output_path} ({size_str})\n"
         f"  Motlist: v{MOTLIST_VERSION}, 1 entry\n"
-        f"  Mot entry: v{MOT_VERSION}, {len(bones)} bones, "
-        f"{frame_count} frames @ {fps}fps\n"
-        f"  Rotation: {'compressed (4 bpk)' if compressed else 'uncompressed (12 B/key)'}\n"
-        f"  Positions: {'yes' if has_positions else 'no'}"
+        f"  Mot entry: v{MOT_VERSION}, {stats['bone_count']} bones, "
+        f"{stats['frame_count']} frames @ {stats['fps']}fps\n"
+        f"  Rotation: {stats['rotation']}\n"
+        f"  Positions: {'yes' if stats['has_positions'] else 'no'}"
+        f"{stats['notes']}"
     )
 
+# ===========================================================================
+# Batch conversion: many dumps / CAF JSONs -> motlists + motbanks
+# ===========================================================================
+
+BATCH_INPUT_EXTENSIONS = ('.txt', '.json', '.cafb')
+
+
+def collect_batch_inputs(patterns: List[str]) -> List[str]:
+    """Expand directories (non-recursive) and glob patterns into a sorted,
+    de-duplicated list of .txt dump and .json / .cafb CAF input files.
+    """
+    import glob
+
+    found = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, n) for n in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern)
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(BATCH_INPUT_EXTENSIONS):
+                found.add(os.path.normpath(path))
+    return sorted(found)
+
+
+def _batch_convert_one(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Process pool worker: convert one input and write its motlist + motbank."""
+    import io
+    import time
+    import contextlib
+    from motbank_writer import build_motbank
+
+    result = dict(job, seconds=0.0, motlist_size=0, error=None)
+    profiler = Profiler().enable() if job['profile'] else None
+    t0 = time.perf_counter()
+    try:
+        # Converter progress output would interleave across workers
+        with contextlib.redirect_stdout(io.StringIO()):
+            if job['input'].lower().endswith(('.json', '.cafb')):
+                json_to_motlist(
+                    json_path=job['input'],
+                    output_path=job['motlist'],
+                    reference_motlist=job['ref'],
+                    compressed=job['compressed'],
+                    motion_name=job['name'],
+                    motlist_name=job['name'],
+                    include_positions=job['include_positions'],
+                    axis_convert=job['axis_convert'],
+                    rot_tolerance_deg=job['rot_tolerance_deg'],
+                    pos_tolerance=job['pos_tolerance'],
+                    max_rot_error_deg=job['max_rot_error_deg'],
+                    max_pos_error=job['max_pos_error'],
+                    cache_dir=job['cache_dir'],
+                    target_fps=job['target_fps'],
+                    target_frames=job['target_frames'],
+                    position_interp=job['position_interp'],
+                    optimize_4bpk=job['optimize_4bpk'],
+                    experimental_pos_encodings=job['experimental_pos_encodings'],
+                )
+            else:
+                from dump_to_motlist import dump_to_motlist
+                dump_to_motlist(
+                    dump_path=job['input'],
+                    output_path=job['motlist'],
+                    reference_motlist=job['ref'],
+                    motion_name=job['name'],
+                    include_positions=job['include_positions'],
+                    compressed=job['compressed'],
+                    frame_rate=job['fps'],
+                    rot_tolerance_deg=job['rot_tolerance_deg'],
+                    pos_tolerance=job['pos_tolerance'],
+                    max_rot_error_deg=job['max_rot_error_deg'],
+                    max_pos_error=job['max_pos_error'],
+                    cache_dir=job['cache_dir'],
+                    target_fps=job['target_fps'],
+                    target_frames=job['target_frames'],
+                    position_interp=job['position_interp'],
+                    optimize_4bpk=job['optimize_4bpk'],
+                    experimental_pos_encodings=job['experimental_pos_encodings'],
+                )
+        bank = build_motbank([job['resource_path']], [job['bank_id']], [job['layer_mask']])
+        with open(job['motbank'], 'wb') as f:
+            f.write(bank)
+        result['motlist_size'] = os.path.getsize(job['motlist'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - t0
+    if profiler is not None:
+        result['profile'] = profiler.disable()
+    return result
+
+
+def batch_convert(
+    inputs: List[str],
+    output_dir: str,
+    reference_motlist: Optional[Union[str, List[str]]] = None,
+    compressed: bool = True,
+    include_positions: bool = True,
+    axis_convert: Union[bool, str] = False,
+    frame_rate: int = 60,
+    rot_tolerance_deg: Optional[float] = None,
+    pos_tolerance: Optional[float] = None,
+    max_rot_error_deg: Optional[float] = None,
+    max_pos_error: Optional[float] = None,
+    bank_id_start: int = 900,
+    bank_prefix: str = "CAF_custom",
+    layer_mask: int = 0,
+    jobs: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    target_fps: Optional[int] = None,
+    target_frames: Optional[int] = None,
+    position_interp: str = 'linear',
+    optimize_4bpk: bool = False,
+    profile: bool = False,
+    experimental_pos_encodings: bool = False,
+) -> List[Dict[str, Any]]:
+    """Convert many dump/CAF JSON files in parallel across a process pool.
+
+    Each input <stem>.txt/.json/.cafb becomes <output_dir>/<stem>.motlist.85 plus a
+    <stem>.motbank.1 that references "<bank_prefix>/<stem>.motlist". Bank IDs
+    are assigned sequentially from bank_id_start in sorted input order.
+    cache_dir enables the shared build cache (build_cache.py) in every worker.
+    profile runs each job under its own Profiler (pipeline_profiler.py).
+
+    Returns:
+        One result dict per input (in input order) with output paths, bank_id,
+        seconds, motlist_size and error (None on success), plus the job's
+        profile records under 'profile' when profile is set.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    os.makedirs(output_dir, exist_ok=True)
+    batch_jobs = []
+    for i, path in enumerate(inputs):
+        stem = os.path.splitext(os.path.basename(path))[0].replace(' ', '_')
+        batch_jobs.append({
+            'input': path,
+            'name': stem,
+            'motlist': os.path.join(output_dir, stem + '.motlist.85'),
+            'motbank': os.path.join(output_dir, stem + '.motbank.1'),
+            'resource_path': f"{bank_prefix}/{stem}.motlist" if bank_prefix else f"{stem}.motlist",
+            'bank_id': bank_id_start + i,
+            'layer_mask': layer_mask,
+            'ref': reference_motlist,
+            'compressed': compressed,
+            'include_positions': include_positions,
+            'axis_convert': axis_convert,
+            'fps': frame_rate,
+            'rot_tolerance_deg': rot_tolerance_deg,
+            'pos_tolerance': pos_tolerance,
+            'max_rot_error_deg': max_rot_error_deg,
+            'max_pos_error': max_pos_error,
+            'cache_dir': cache_dir,
+            'target_fps': target_fps,
+            'target_frames': target_frames,
+            'position_interp': position_interp,
+            'optimize_4bpk': optimize_4bpk,
+            'experimental_pos_encodings': experimental_pos_encodings,
+            'profile': profile,
+        })
+
+    if not batch_jobs:
+        return []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_batch_convert_one, batch_jobs))
+
+
+def format_batch_summary(results: List[Dict[str, Any]], wall_seconds: float) -> str:
+    """Render batch results as a per-file timing table."""
+    lines = [f"{'Input':<32} {'Bank':>5} {'Size':>10} {'Time':>9}  Status"]
+    lines.append('-' * len(lines[0]))
+    for r in results:
+        status = 'ok' if r['error'] is None else f"FAILED ({r['error']})"
+        size = f"{r['motlist_size'] / 1024:.1f} KB" if r['error'] is None else '-'
+        lines.append(f"{os.path.basename(r['input']):<32} {r['bank_id']:>5} {size:>10} "
+                     f"{r['seconds'] * 1000:>6.0f} ms  {status}")
+    failed = sum(1 for r in results if r['error'] is not None)
+    cpu = sum(r['seconds'] for r in results)
+    lines.append('-' * len(lines[0]))
+    lines.append(f"{len(results) - failed}/{len(results)} converted in {wall_seconds:.2f} s wall "
+                 f"({cpu:.2f} s summed across workers)")
+    return "\n".join(lines)
+
+# ===========================================================================
+# Pack: many dumps / CAF JSONs -> one multi-entry motlist + one motbank
+# ===========================================================================
+
+@profiled('pack')
+def pack_motlist(
+    inputs: List[str],
+    output_path: str,
+    motlist_name: Optional[str] = None,
+    reference_motlist: Optional[Union[str, List[str]]] = None,
+    compressed: bool = True,
+    include_positions: bool = True,
+    axis_convert: Union[bool, str] = False,
+    frame_rate: int = 60,
+    rot_tolerance_deg: Optional[float] = None,
+    pos_tolerance: Optional[float] = None,
+    max_rot_error_deg: Optional[float] = None,
+    max_pos_error: Optional[float] = None,
+    bank_id: int = 900,
+    bank_prefix: str = "CAF_custom",
+    layer_mask: int = 0,
+    motbank_path: Optional[str] = None,
+    dedup: bool = False,
+    target_fps: Optional[int] = None,
+    target_frames: Optional[int] = None,
+    position_interp: str = 'linear',
+    optimize_4bpk: bool = False,
+    experimental_pos_encodings: bool = False,
+) -> Dict[str, Any]:
+    """Convert N inputs into one .motlist.85 with N mot entries plus a
+    single .motbank.1 that references it.
+
+    Entry i (motion_id i) is input i, named after its file stem. The
+    reference bone mapping is read once and shared by all inputs. With
+    dedup, identical track payloads are stored once (build_motlist_dedup).
+
+    Returns:
+        Dict with motlist/motbank paths and sizes, resource_path, bank_id,
+        one row per entry (input, name, motion_id, bones, frames, size) and
+        'dedup' (the build_motlist_dedup report, or None).
+    """
+    import io
+    import contextlib
+    from motbank_writer import build_motbank
+
+    if not inputs:
+        raise ValueError("No inputs to pack")
+
+    stem = os.path.basename(output_path).split('.')[0]
+    if motlist_name is None:
+        motlist_name = stem
+    if motbank_path is None:
+        motbank_path = os.path.join(os.path.dirname(output_path), stem + '.motbank.1')
+
+    hash_to_idx = reference_bone_mapping(reference_motlist)
+
+    mot_entries = []
+    rows = []
+    for motion_id, path in enumerate(inputs):
+        name = os.path.splitext(os.path.basename(path))[0].replace(' ', '_')
+        if path.lower().endswith(('.json', '.cafb')):
+            anim_data = load_caf_anim(path)
+            bone_index_map = resolve_bone_indices(anim_data['bones'], hash_to_idx)
+            mot_entry, info = build_caf_mot_entry(
+                anim_data, name, bone_index_map,
+                compressed=compressed,
+                include_positions=include_positions,
+                axis_convert=axis_convert,
+                rot_tolerance_deg=rot_tolerance_deg,
+                pos_tolerance=pos_tolerance,
+                max_rot_error_deg=max_rot_error_deg,
+                max_pos_error=max_pos_error,
+                target_fps=target_fps,
+                target_frames=target_frames,
+                position_interp=position_interp,
+                optimize_4bpk=optimize_4bpk,
+                experimental_pos_encodings=experimental_pos_encodings,
+            )
+            bone_count, frame_count = info['bone_count'], info['frame_count']
+        else:
+            from dump_to_motlist import (
+                parse_dodge_dump_columnar, map_bone_indices, build_dump_mot_entry,
+            )
+            from resample import resample_times
+            bone_names, _, tracks = parse_dodge_dump_columnar(path)
+            bone_index_map, _ = map_bone_indices(bone_names, hash_to_idx=hash_to_idx)
+            # Per-entry converter chatter would drown the pack summary
+            with contextlib.redirect_stdout(io.StringIO()):
+                mot_entry, bone_count = build_dump_mot_entry(
+                    bone_names, tracks, name, bone_index_map,
+                    include_positions=include_positions,
+                    compressed=compressed,
+                    frame_rate=frame_rate,
+                    rot_tolerance_deg=rot_tolerance_deg,
+                    pos_tolerance=pos_tolerance,
+                    max_rot_error_deg=max_rot_error_deg,
+                    max_pos_error=max_pos_error,
+                    target_fps=target_fps,
+                    target_frames=target_frames,
+                    position_interp=position_interp,
+                    optimize_4bpk=optimize_4bpk,
+                    experimental_pos_encodings=experimental_pos_encodings,
+                )
+            frame_count = len(resample_times(tracks.shape[1], frame_rate, target_fps, target_frames)[0])
+
+        mot_entries.append(mot_entry)
+        rows.append({
+            'input': path,
+            'name': name,
+            'motion_id': motion_id,
+            'bones': bone_count,
+            'frames': frame_count,
+            'size': len(mot_entry),
+        })
+
+    dedup_report = None
+    if dedup:
+        motlist, dedup_report = build_motlist_dedup(motlist_name, mot_entries)
+    else:
+        motlist = build_motlist(motlist_name=motlist_name, mot_entries=mot_entries)
+    resource_path = f"{bank_prefix}/{stem}.motlist" if bank_prefix else f"{stem}.motlist"
+    motbank = build_motbank([resource_path], [bank_id], [layer_mask])
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(motbank_path)), exist_ok=True)
+    with profile_stage('write', bytes=len(motlist) + len(motbank)):
+        with open(output_path, 'wb') as f:
+            f.write(motlist)
+        with open(motbank_path, 'wb') as f:
+            f.write(motbank)
+
+    return {
+        'motlist': output_path,
+        'motlist_size': len(motlist),
+        'motbank': motbank_path,
+        'motbank_size': len(motbank),
+        'resource_path': resource_path,
+        'bank_id': bank_id,
+        'entries': rows,
+        'dedup': dedup_report,
+    }
+
+
+def format_pack_summary(result: Dict[str, Any]) -> str:
+    """Render pack_motlist results: one line per entry plus the bank to reference."""
+    lines = [f"{'ID':>3} {'Entry':<28} {'Bones':>5} {'Frames':>6} {'Size':>10}  Input"]
+    lines.append('-' * 72)
+    for r in result['entries']:
+        lines.append(f"{r['motion_id']:>3} {r['name']:<28} {r['bones']:>5} {r['frames']:>6} "
+                     f"{r['size'] / 1024:>7.1f} KB  {os.path.basename(r['input'])}")
+    lines.append('-' * 72)
+    if result.get('dedup'):
+        lines.append(format_dedup_report(result['dedup']))
+    lines.append(f"Wrote {result['motlist']} ({result['motlist_size'] / 1024:.1f} KB, "
+                 f"{len(result['entries'])} entries)")
+    lines.append(f"Wrote {result['motbank']} ({result['motbank_size']} bytes): "
+                 f"bank_id {result['bank_id']} -> {result['resource_path']}")
+    lines.append("Manifest: use this bank_id for every entry, motion_id = ID above")
+    return "\n".join(lines)
+
 # ===========================================================================
 # Validation: verify a written .motlist.85
 # ===========================================================================
@@ -811,90 +2159,75 @@ def validate_motlist(path: str) -> str:
     """Read a .motlist.85 file and perform basic validation.
     Returns a status string with any issues found.
     """
-    with open(path, 'rb') as f:
-        data = f.read()
+    from motlist_reader import MotlistFile
+
+    try:
+        ml = MotlistFile(path)
+    except ValueError:
+        return "ERROR: File too small for motlist header"
 
     issues = []
     info = []
 
-    # Check motlist header
-    if len(data) < 0x34:
-        return "ERROR: File too small for motlist header"
-
-    version = struct.unpack_from('<I', data, 0x00)[0]
-    magic = data[0x04:0x08]
-    ptrs_offs = struct.unpack_from('<Q', data, 0x10)[0]
-    col_offs = struct.unpack_from('<Q', data, 0x18)[0]
-    name_offs = struct.unpack_from('<Q', data, 0x20)[0]
-    num_entries = struct.unpack_from('<I', data, 0x30)[0]
+    with ml:
+        info.append(f"Motlist: version={ml.version}, entries={ml.entry_count}, size={ml.size}")
 
-    info.append(f"Motlist: version={version}, entries={num_entries}, size={len(data)}")
+        if not ml.is_motlist:
+            issues.append(f"Bad motlist magic: {ml.magic!r} (expected {MOTLIST_MAGIC!r})")
+        if ml.version != MOTLIST_VERSION:
+            issues.append(f"Unexpected version: {ml.version} (expected {MOTLIST_VERSION})")
 
-    if magic != MOTLIST_MAGIC:
-        issues.append(f"Bad motlist magic: {magic!r} (expected {MOTLIST_MAGIC!r})")
-    if version != MOTLIST_VERSION:
-        issues.append(f"Unexpected version: {version} (expected {MOTLIST_VERSION})")
+        # Read name string (UTF-16LE, search for null on 2-byte boundary)
+        if ml.name_offs < ml.size:
+            try:
+                info.append(f"Motlist name: '{ml.name}'")
+            except Exception:
+                issues.append(f"Cannot decode motlist name at offset {ml.name_offs}")
 
-    # Read name string (UTF-16LE, search for null on 2-byte boundary)
-    if name_offs < len(data):
+        # Check pointer table
         try:
-            name_str = _decode_utf16le_string(data, name_offs)
-            info.append(f"Motlist name: '{name_str}'")
-        except Exception:
-            issues.append(f"Cannot decode motlist name at offset {name_offs}")
-
-    # Check pointer table
-    if ptrs_offs + num_entries * 8 > len(data):
-        issues.append("Pointer table extends beyond file")
-    else:
-        for i in range(num_entries):
-            entry_off = struct.unpack_from('<Q', data, ptrs_offs + i * 8)[0]
+            entry_offsets = ml.entry_offsets
+        except ValueError as e:
+            issues.append(str(e))
+            entry_offsets = []
+
+        for i, entry_off in enumerate(entry_offsets):
             info.append(f"Entry {i}: offset=0x{entry_off:x}")
 
-            if entry_off + MOT_HEADER_SIZE > len(data):
+            try:
+                entry = ml.entry(i)
+            except ValueError:
                 issues.append(f"Entry {i} header extends beyond file")
                 continue
 
             # Validate mot entry header
-            mot_ver = struct.unpack_from('<I', data, entry_off)[0]
-            mot_magic = data[entry_off + 4:entry_off + 8]
-            mot_size = struct.unpack_from('<I', data, entry_off + 0x0C)[0]
-            bc_offs = struct.unpack_from('<Q', data, entry_off + 0x18)[0]
-            bc_count = struct.unpack_from('<H', data, entry_off + 0x6A)[0]
-            frame_count = struct.unpack_from('<f', data, entry_off + 0x58)[0]
-            frame_rate = struct.unpack_from('<H', data, entry_off + 0x6E)[0]
-
-            if mot_magic != MOT_MAGIC:
-                issues.append(f"Entry {i}: bad mot magic: {mot_magic!r}")
-            if mot_ver != MOT_VERSION:
-                issues.append(f"Entry {i}: unexpected mot version: {mot_ver}")
-
-            info.append(f"  Mot: v{mot_ver}, size={mot_size}, bones={bc_count}, "
-                       f"frames={frame_count:.0f}, fps={frame_rate}")
+            if not entry.is_mot:
+                issues.append(f"Entry {i}: bad mot magic: {entry.magic!r}")
+            if entry.version != MOT_VERSION:
+                issues.append(f"Entry {i}: unexpected mot version: {entry.version}")
+
+            info.append(f"  Mot: v{entry.version}, size={entry.mot_size}, "
+                       f"bones={entry.bone_clip_count}, "
+                       f"frames={entry.frame_count:.0f}, fps={entry.frame_rate}")
 
             # Read motion name
-            names_offs = struct.unpack_from('<Q', data, entry_off + 0x50)[0]
-            abs_name = entry_off + names_offs
-            if abs_name < len(data):
+            if entry.offset + entry.names_offs < ml.size:
                 try:
-                    mot_name = _decode_utf16le_string(data, abs_name)
-                    info.append(f"  Motion name: '{mot_name}'")
+                    info.append(f"  Motion name: '{entry.name}'")
                 except Exception:
                     issues.append(f"Entry {i}: cannot decode motion name")
 
             # Validate bone clips
-            for bc in range(min(bc_count, 5)):
-                bc_pos = entry_off + bc_offs + bc * BONE_CLIP_HEADER_SIZE
-                if bc_pos + BONE_CLIP_HEADER_SIZE > len(data):
+            for bc in range(min(entry.bone_clip_count, 5)):
+                try:
+                    clip = entry.bone_clip(bc)
+                except IndexError:
                     issues.append(f"Entry {i}, bone clip {bc}: extends beyond file")
                     break
-                bone_idx = struct.unpack_from('<H', data, bc_pos)[0]
-                bone_hash = struct.unpack_from('<I', data, bc_pos + 4)[0]
-                track_off = struct.unpack_from('<Q', data, bc_pos + 16)[0]
-                known_name = get_bone_name_for_hash(bone_hash)
+                known_name = get_bone_name_for_hash(clip.bone_hash)
                 name_str = f" ({known_name})" if known_name else ""
-                info.append(f"  Bone {bc}: idx={bone_idx}, hash=0x{bone_hash:08x}"
-                           f"{name_str}, track_off=0x{track_off:x}")
+                info.append(f"  Bone {bc}: idx={clip.bone_index}, hash=0x{clip.bone_hash:08x}"
+                           f"{name_str}, track_off=0x{clip.track_hdr_offs:x}")
 
     result = "=== Validation Report ===\n"
     result += "\n".join(info)
@@ -920,9 +2253,11 @@ def main():
 
     # Convert command
     convert_parser = subparsers.add_parser('convert', help='Convert JSON to .motlist.85')
-    convert_parser.add_argument('input', help='Input CAF JSON file')
+    convert_parser.add_argument('input', help='Input CAF JSON or binary CAF (.cafb) file')
     convert_parser.add_argument('output', help='Output .motlist.85 file')
-    convert_parser.add_argument('--ref', help='Reference .motlist.85 for bone index mapping')
+    convert_parser.add_argument('--ref', action='append',
+                                help='Reference .motlist.85 for bone index mapping (repeatable: '
+                                     'all entries of all files merged, first wins)')
     convert_parser.add_argument('--uncompressed', action='store_true',
                                help='Use uncompressed rotation (12 bytes/key)')
     convert_parser.add_argument('--name', help='Motion name override')
@@ -932,6 +2267,192 @@ def main():
                                help='Skip position tracks')
     convert_parser.add_argument('--axis-convert', action='store_true',
                                help='Convert Blender Z-up to RE Engine Y-up')
+    convert_parser.add_argument('--axis-preset', choices=sorted(AXIS_PRESETS), default=None,
+                               help='Axis conversion preset of the Lua player (blender_to_re = '
+                                    '--axis-convert, identity = none)')
+    convert_parser.add_argument('--rot-tolerance', type=float, default=None,
+                               help='Reduce rotation keys, max angular error in degrees')
+    convert_parser.add_argument('--pos-tolerance', type=float, default=None,
+                               help='Reduce position keys, max distance error')
+    convert_parser.add_argument('--max-rot-error', type=float, default=None,
+                               help='Pick 4bpk/float/static per rotation track under this '
+                                    'error budget in degrees, with a per-bone report')
+    convert_parser.add_argument('--max-pos-error', type=float, default=None,
+                               help='Pick float/static per position track under this distance '
+                                    'error budget (16-bit axis too with --experimental-pos-encodings)')
+    convert_parser.add_argument('--experimental-pos-encodings', action='store_true',
+                               help='Let --max-pos-error pick the 16-bit axis position encodings '
+                                    '(key layout not verified in game)')
+    convert_parser.add_argument('--optimize-4bpk', action='store_true',
+                               help='Search 4bpk unpack ranges and key hemispheres for the '
+                                    'lowest quantization error')
+    convert_parser.add_argument('--target-fps', type=int, default=None,
+                               help='Resample to this frame rate before encoding (keeps duration)')
+    convert_parser.add_argument('--target-frames', type=int, default=None,
+                               help='Resample to this many frames (keeps frame rate)')
+    convert_parser.add_argument('--pos-interp', choices=('linear', 'cubic'), default='linear',
+                               help='Position resampling: linear or Catmull-Rom cubic (default: linear)')
+    convert_parser.add_argument('--cache-dir', default=None,
+                               help='Build cache folder: skip unchanged conversions and reuse '
+                                    'encoded tracks of unchanged bones')
+    convert_parser.add_argument('--verify', action='store_true',
+                               help='Decode the output and report per-bone error against the input')
+    convert_parser.add_argument('--profile', action='store_true',
+                               help='Print per-stage wall time, peak memory and key counts')
+    convert_parser.add_argument('--profile-trace', default=None,
+                               help='Write the profile as Chrome trace JSON (implies --profile)')
+
+    # Batch command
+    batch_parser = subparsers.add_parser(
+        'batch', help='Convert many dumps/JSONs to .motlist.85 + .motbank.1 in parallel')
+    batch_parser.add_argument('inputs', nargs='+',
+                             help='Input directories or glob patterns (.txt dumps, .json/.cafb CAF)')
+    batch_parser.add_argument('-o', '--output-dir', required=True,
+                             help='Directory for the .motlist.85 and .motbank.1 outputs')
+    batch_parser.add_argument('--ref', action='append',
+                              help='Reference .motlist.85 for bone index mapping (repeatable: '
+                                   'all entries of all files merged, first wins)')
+    batch_parser.add_argument('--uncompressed', action='store_true',
+                             help='Use uncompressed rotation (12 bytes/key)')
+    batch_parser.add_argument('--no-positions', action='store_true',
+                             help='Skip position tracks')
+    batch_parser.add_argument('--axis-convert', action='store_true',
+                             help='Convert Blender Z-up to RE Engine Y-up (JSON inputs)')
+    batch_parser.add_argument('--axis-preset', choices=sorted(AXIS_PRESETS), default=None,
+                             help='Axis conversion preset of the Lua player (blender_to_re = '
+                                  '--axis-convert, identity = none)')
+    batch_parser.add_argument('--fps', type=int, default=60,
+                             help='Frame rate for dump inputs (default: 60)')
+    batch_parser.add_argument('--rot-tolerance', type=float, default=None,
+                             help='Reduce rotation keys, max angular error in degrees')
+    batch_parser.add_argument('--pos-tolerance', type=float, default=None,
+                             help='Reduce position keys, max distance error')
+    batch_parser.add_argument('--max-rot-error', type=float, default=None,
+                             help='Pick 4bpk/float/static per rotation track under this '
+                                  'error budget in degrees')
+    batch_parser.add_argument('--max-pos-error', type=float, default=None,
+                             help='Pick float/static per position track under this distance '
+                                  'error budget (16-bit axis too with --experimental-pos-encodings)')
+    batch_parser.add_argument('--experimental-pos-encodings', action='store_true',
+                             help='Let --max-pos-error pick the 16-bit axis position encodings '
+                                  '(key layout not verified in game)')
+    batch_parser.add_argument('--optimize-4bpk', action='store_true',
+                             help='Search 4bpk unpack ranges and key hemispheres for the '
+                                  'lowest quantization error')
+    batch_parser.add_argument('--target-fps', type=int, default=None,
+                             help='Resample to this frame rate before encoding (keeps duration)')
+    batch_parser.add_argument('--target-frames', type=int, default=None,
+                             help='Resample to this many frames (keeps frame rate)')
+    batch_parser.add_argument('--pos-interp', choices=('linear', 'cubic'), default='linear',
+                             help='Position resampling: linear or Catmull-Rom cubic (default: linear)')
+    batch_parser.add_argument('--bank-id-start', type=int, default=900,
+                             help='First bank ID, incremented per input (default: 900)')
+    batch_parser.add_argument('--bank-prefix', default='CAF_custom',
+                             help='Motlist resource folder written into each motbank')
+    batch_parser.add_argument('--layer-mask', type=lambda x: int(x, 0), default=0,
+                             help='Layer mask for every motbank entry (supports hex)')
+    batch_parser.add_argument('-j', '--jobs', type=int, default=None,
+                             help='Worker processes (default: all cores)')
+    batch_parser.add_argument('--cache-dir', default=None,
+                             help='Build cache folder shared by all workers')
+    batch_parser.add_argument('--profile', action='store_true',
+                             help='Print per-stage wall time, peak memory and key counts '
+                                  'summed over all jobs')
+    batch_parser.add_argument('--profile-trace', default=None,
+                             help='Write the profile as Chrome trace JSON, one row per worker '
+                                  '(implies --profile)')
+
+    # Pack command
+    pack_parser = subparsers.add_parser(
+        'pack', help='Pack many dumps/JSONs into one multi-entry .motlist.85 + one .motbank.1')
+    pack_parser.add_argument('inputs', nargs='+',
+                            help='Input files, directories or glob patterns, in entry order')
+    pack_parser.add_argument('-o', '--output', required=True,
+                            help='Output .motlist.85 (motbank is written next to it)')
+    pack_parser.add_argument('--motlist-name', help='Motlist container name (default: output stem)')
+    pack_parser.add_argument('--motbank', help='Output .motbank.1 path (default: <stem>.motbank.1)')
+    pack_parser.add_argument('--bank-id', type=int, default=900,
+                            help='Bank ID of the packed motlist (default: 900)')
+    pack_parser.add_argument('--bank-prefix', default='CAF_custom',
+                            help='Motlist resource folder written into the motbank')
+    pack_parser.add_argument('--layer-mask', type=lambda x: int(x, 0), default=0,
+                            help='Layer mask of the motbank entry (supports hex)')
+    pack_parser.add_argument('--ref', action='append',
+                             help='Reference .motlist.85 for bone index mapping (repeatable: '
+                                  'all entries of all files merged, first wins)')
+    pack_parser.add_argument('--uncompressed', action='store_true',
+                            help='Use uncompressed rotation (12 bytes/key)')
+    pack_parser.add_argument('--no-positions', action='store_true',
+                            help='Skip position tracks')
+    pack_parser.add_argument('--axis-convert', action='store_true',
+                            help='Convert Blender Z-up to RE Engine Y-up (JSON inputs)')
+    pack_parser.add_argument('--axis-preset', choices=sorted(AXIS_PRESETS), default=None,
+                            help='Axis conversion preset of the Lua player (blender_to_re = '
+                                 '--axis-convert, identity = none)')
+    pack_parser.add_argument('--fps', type=int, default=60,
+                            help='Frame rate for dump inputs (default: 60)')
+    pack_parser.add_argument('--rot-tolerance', type=float, default=None,
+                            help='Reduce rotation keys, max angular error in degrees')
+    pack_parser.add_argument('--pos-tolerance', type=float, default=None,
+                            help='Reduce position keys, max distance error')
+    pack_parser.add_argument('--max-rot-error', type=float, default=None,
+                            help='Pick 4bpk/float/static per rotation track under this '
+                                 'error budget in degrees')
+    pack_parser.add_argument('--max-pos-error', type=float, default=None,
+                            help='Pick float/static per position track under this distance '
+                                 'error budget (16-bit axis too with --experimental-pos-encodings)')
+    pack_parser.add_argument('--experimental-pos-encodings', action='store_true',
+                            help='Let --max-pos-error pick the 16-bit axis position encodings '
+                                 '(key layout not verified in game)')
+    pack_parser.add_argument('--optimize-4bpk', action='store_true',
+                            help='Search 4bpk unpack ranges and key hemispheres for the '
+                                 'lowest quantization error')
+    pack_parser.add_argument('--target-fps', type=int, default=None,
+                            help='Resample to this frame rate before encoding (keeps duration)')
+    pack_parser.add_argument('--target-frames', type=int, default=None,
+                            help='Resample to this many frames (keeps frame rate)')
+    pack_parser.add_argument('--pos-interp', choices=('linear', 'cubic'), default='linear',
+                            help='Position resampling: linear or Catmull-Rom cubic (default: linear)')
+    pack_parser.add_argument('--dedup', action='store_true',
+                            help='Store identical frame data / unpack blocks / frame '
+                                 'indices once, shared by all entries (experimental)')
+    pack_parser.add_argument('--profile', action='store_true',
+                            help='Print per-stage wall time, peak memory and key counts')
+    pack_parser.add_argument('--profile-trace', default=None,
+                            help='Write the profile as Chrome trace JSON (implies --profile)')
+
+    # Verify command
+    verify_parser = subparsers.add_parser(
+        'verify', help='Decode a .motlist.85 and report per-bone error against its source')
+    verify_parser.add_argument('file', help='.motlist.85 file to verify')
+    verify_parser.add_argument('source', help='Source bone dump (.txt), CAF JSON or .cafb')
+    verify_parser.add_argument('--entry', default='0', help='Mot entry index or name (default: 0)')
+    verify_parser.add_argument('--axis-convert', action='store_true',
+                              help='Source was converted with --axis-convert')
+    verify_parser.add_argument('--axis-preset', choices=sorted(AXIS_PRESETS), default=None,
+                              help='Source was converted with this --axis-preset')
+    verify_parser.add_argument('--fps', type=int, default=60,
+                              help='Frame rate of a .txt dump source (default: 60)')
+    verify_parser.add_argument('--max-rot-error', type=float, default=None,
+                              help='Fail if any bone exceeds this rotation error (degrees)')
+    verify_parser.add_argument('--max-pos-error', type=float, default=None,
+                              help='Fail if any bone exceeds this position error')
+
+    # Diff command
+    diff_parser = subparsers.add_parser(
+        'diff', help='Diff two .motlist.85 files (entries by name, bones by hash, tracks by type)')
+    diff_parser.add_argument('a', help='First .motlist.85 (e.g. a real game reference)')
+    diff_parser.add_argument('b', help='Second .motlist.85 (e.g. a generated file)')
+    diff_parser.add_argument('--rot-threshold', type=float, default=0.01,
+                            help='Rotation delta to report, degrees (default: 0.01)')
+    diff_parser.add_argument('--pos-threshold', type=float, default=0.0001,
+                            help='Position delta to report (default: 0.0001)')
+    diff_parser.add_argument('--layout', action='store_true',
+                            help='Also compare offset / size header fields')
+    diff_parser.add_argument('--by-index', action='store_true',
+                            help='Align entries by position instead of by name')
+    diff_parser.add_argument('--max-rows', type=int, default=50,
+                            help='Rows printed per section (default: 50, 0 = all)')
 
     # Validate command
     validate_parser = subparsers.add_parser('validate', help='Validate a .motlist.85 file')
@@ -948,6 +2469,10 @@ def main():
 
     args = parser.parse_args()
 
+    profiler = None
+    if getattr(args, 'profile', False) or getattr(args, 'profile_trace', None):
+        profiler = Profiler().enable()
+
     if args.command == 'convert':
         result = json_to_motlist(
             json_path=args.input,
@@ -957,9 +2482,118 @@ def main():
             motion_name=args.name,
             motlist_name=args.motlist_name,
             include_positions=not args.no_positions,
-            axis_convert=args.axis_convert,
+            axis_convert=args.axis_preset or args.axis_convert,
+            rot_tolerance_deg=args.rot_tolerance,
+            pos_tolerance=args.pos_tolerance,
+            max_rot_error_deg=args.max_rot_error,
+            max_pos_error=args.max_pos_error,
+            target_fps=args.target_fps,
+            target_frames=args.target_frames,
+            position_interp=args.pos_interp,
+            optimize_4bpk=args.optimize_4bpk,
+            experimental_pos_encodings=args.experimental_pos_encodings,
+            cache_dir=args.cache_dir,
         )
         print(result)
+        if args.verify:
+            from verify_roundtrip import verify_motlist, format_verify_report
+            print("\n" + format_verify_report(
+                verify_motlist(args.output, args.input,
+                               axis_convert=args.axis_preset or args.axis_convert)))
+        report_profile(profiler, args.profile_trace)
+
+    elif args.command == 'batch':
+        import time
+
+        inputs = collect_batch_inputs(args.inputs)
+        if not inputs:
+            print("No .txt, .json or .cafb inputs matched")
+            sys.exit(1)
+        t0 = time.perf_counter()
+        results = batch_convert(
+            inputs=inputs,
+            output_dir=args.output_dir,
+            reference_motlist=args.ref,
+            compressed=not args.uncompressed,
+            include_positions=not args.no_positions,
+            axis_convert=args.axis_preset or args.axis_convert,
+            frame_rate=args.fps,
+            rot_tolerance_deg=args.rot_tolerance,
+            pos_tolerance=args.pos_tolerance,
+            max_rot_error_deg=args.max_rot_error,
+            max_pos_error=args.max_pos_error,
+            target_fps=args.target_fps,
+            target_frames=args.target_frames,
+            position_interp=args.pos_interp,
+            optimize_4bpk=args.optimize_4bpk,
+            experimental_pos_encodings=args.experimental_pos_encodings,
+            bank_id_start=args.bank_id_start,
+            bank_prefix=args.bank_prefix,
+            layer_mask=args.layer_mask,
+            jobs=args.jobs,
+            cache_dir=args.cache_dir,
+            profile=profiler is not None,
+        )
+        print(format_batch_summary(results, time.perf_counter() - t0))
+        if profiler is not None:
+            for r in results:
+                profiler.records.extend(r.get('profile', []))
+            report_profile(profiler, args.profile_trace)
+        if any(r['error'] is not None for r in results):
+            sys.exit(1)
+
+    elif args.command == 'pack':
+        # Keep argument order (it defines motion IDs); directories/globs sort within
+        inputs = []
+        for pattern in args.inputs:
+            for path in collect_batch_inputs([pattern]):
+                if path not in inputs:
+                    inputs.append(path)
+        if not inputs:
+            print("No .txt, .json or .cafb inputs matched")
+            sys.exit(1)
+        result = pack_motlist(
+            inputs=inputs,
+            output_path=args.output,
+            motlist_name=args.motlist_name,
+            reference_motlist=args.ref,
+            compressed=not args.uncompressed,
+            include_positions=not args.no_positions,
+            axis_convert=args.axis_preset or args.axis_convert,
+            frame_rate=args.fps,
+            rot_tolerance_deg=args.rot_tolerance,
+            pos_tolerance=args.pos_tolerance,
+            max_rot_error_deg=args.max_rot_error,
+            max_pos_error=args.max_pos_error,
+            target_fps=args.target_fps,
+            target_frames=args.target_frames,
+            position_interp=args.pos_interp,
+            optimize_4bpk=args.optimize_4bpk,
+            experimental_pos_encodings=args.experimental_pos_encodings,
+            bank_id=args.bank_id,
+            bank_prefix=args.bank_prefix,
+            layer_mask=args.layer_mask,
+            motbank_path=args.motbank,
+            dedup=args.dedup,
+        )
+        print(format_pack_summary(result))
+        report_profile(profiler, args.profile_trace)
+
+    elif args.command == 'verify':
+        from verify_roundtrip import verify_motlist, verify_failures, format_verify_report
+        result = verify_motlist(args.file, args.source, args.entry,
+                                args.axis_preset or args.axis_convert, args.fps)
+        print(format_verify_report(result, args.max_rot_error, args.max_pos_error))
+        if verify_failures(result, args.max_rot_error, args.max_pos_error):
+            sys.exit(1)
+
+    elif args.command == 'diff':
+        from motlist_diff import diff_motlists, diff_failed, format_diff_report
+        result = diff_motlists(args.a, args.b, args.rot_threshold, args.pos_threshold,
+                               args.layout, args.by_index)
+        print(format_diff_report(result, args.max_rows))
+        if diff_failed(result):
+            sys.exit(1)
 
     elif args.command == 'validate':
         result = validate_motlist(args.file)
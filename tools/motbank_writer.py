@@ -21,6 +21,7 @@ RE2 motbank format (version 1):
 
 Usage:
     python motbank_writer.py <motlist_path> <output.motbank.1> [--bank-id N] [--layer-mask MASK]
+                             [--profile] [--profile-trace <trace.json>]
 """
 
 import struct
@@ -28,11 +29,14 @@ import os
 import sys
 import argparse
 
+from pipeline_profiler import Profiler, profiled, report_profile
+
 
 def align_up(value, alignment):
     return (value + alignment - 1) & ~(alignment - 1)
 
 
+@profiled('build motbank')
 def build_motbank(motlist_paths, bank_ids=None, layer_masks=None):
     """Build a RE2 v1 .motbank.1 file.
 
@@ -113,8 +117,13 @@ def main():
                         help="Bank ID for the motlist entry (default: 0)")
     parser.add_argument("--layer-mask", type=lambda x: int(x, 0), default=0,
                         help="Layer mask for the motlist entry (default: 0, supports hex like 0xFFFFFFFF)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-stage wall time and peak memory")
+    parser.add_argument("--profile-trace", default=None,
+                        help="Write the profile as Chrome trace JSON (implies --profile)")
 
     args = parser.parse_args()
+    profiler = Profiler().enable() if args.profile or args.profile_trace else None
 
     data = build_motbank([args.motlist_path], [args.bank_id], [args.layer_mask])
 
@@ -127,6 +136,7 @@ def main():
     print(f"  Motlist: {args.motlist_path}")
     print(f"  BankID: {args.bank_id}")
     print(f"  LayerMask: 0x{args.layer_mask:08X}")
+    report_profile(profiler, args.profile_trace)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,344 @@
+"""
+Structural and numerical diff of two .motlist.85 files.
+Aligns mot entries by name, bone clips by bone hash and tracks by type, then
+reports header field differences and decoded keyframe deltas above a
+threshold, instead of printing every field of both files side by side
+(validate_against_real.py).
+
+Each file is parsed once into a MotlistIndex (entry name -> entry, bone hash
+-> clip, built lazily per entry) shared by every lookup, and keys are only
+decoded for aligned tracks whose raw bytes differ, so large game motlists
+are cheap to compare.
+
+Keyframe deltas: both tracks are sampled at every frame of the first file's
+entry (slerp / lerp between sparse keys, the second file's frames mapped by
+time when the frame rates differ). Rotation deltas are angles in degrees,
+position deltas distances.
+
+Usage:
+    python motlist_diff.py <a.motlist.85> <b.motlist.85> [options]
+
+    Options:
+      --rot-threshold <deg> Report rotation tracks differing by more (default: 0.01)
+      --pos-threshold <d>   Report position tracks differing by more (default: 0.0001)
+      --layout              Also compare offset / size header fields
+      --by-index            Align entries by position instead of by name
+      --max-rows <n>        Rows printed per section (default: 50, 0 = all)
+
+    Exit status: 0 when the files match within the thresholds, 1 otherwise.
+"""
+
+import os
+import sys
+import argparse
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mot_writer import get_bone_name_for_hash
+from motlist_reader import MotlistFile, MotEntry, BoneClip, Track
+from key_reduction import quat_angle_error
+from verify_roundtrip import sample_keys
+
+DEFAULT_ROT_THRESHOLD_DEG = 0.01
+DEFAULT_POS_THRESHOLD = 0.0001
+
+# Mot header fields that describe content; the rest are offsets and sizes
+# that legitimately differ between writers (compared with --layout)
+CONTENT_HEADER_FIELDS = (
+    'version', 'magic', 'unk08', 'frame_count', 'blending', 'ukn_float1', 'ukn_float2',
+    'bone_count', 'bone_clip_count', 'ukn_6c', 'ukn_6d', 'frame_rate', 'ukn_70', 'ukn_72',
+)
+LAYOUT_HEADER_FIELDS = (
+    'mot_size', 'offs_bone_hdr', 'bone_clip_offs', 'field_20', 'field_28',
+    'clip_file_offs', 'jmap_offs', 'field_40', 'offs2', 'names_offs',
+)
+CLIP_FIELDS = ('bone_index', 'track_flags', 'track_flags2', 'ukn_float')
+TRACK_FIELDS = ('flags', 'key_count', 'frame_rate', 'max_frame')
+
+
+class MotlistIndex:
+    """Name / hash lookups over one open MotlistFile, built on first use."""
+
+    def __init__(self, motlist: MotlistFile):
+        self.motlist = motlist
+        self._clips: Dict[int, Dict[int, BoneClip]] = {}
+
+    @cached_property
+    def entries_by_name(self) -> Dict[str, MotEntry]:
+        """Mot entries keyed by name; repeated names get '#2', '#3', ..."""
+        entries = {}
+        for i, entry in enumerate(self.motlist.entries):
+            name = entry.name if entry.is_mot else f"<non-mot entry {i}>"
+            key, n = name, 1
+            while key in entries:
+                n += 1
+                key = f"{name}#{n}"
+            entries[key] = entry
+        return entries
+
+    def clips_by_hash(self, entry: MotEntry) -> Dict[int, BoneClip]:
+        """Bone clips of one entry keyed by bone hash (first clip wins)."""
+        clips = self._clips.get(entry.offset)
+        if clips is None:
+            clips = {}
+            for clip in entry.bone_clips:
+                clips.setdefault(clip.bone_hash, clip)
+            self._clips[entry.offset] = clips
+        return clips
+
+
+def _field_diffs(a, b, fields) -> List[Tuple[str, Any, Any]]:
+    return [(f, getattr(a, f), getattr(b, f)) for f in fields if getattr(a, f) != getattr(b, f)]
+
+
+def _same_payload(a: Track, b: Track) -> bool:
+    """True when both tracks store byte-identical keys, unpack block and frame indices."""
+    if a.flags != b.flags or a.key_count != b.key_count:
+        return False
+    if a.frame_data is None or b.frame_data is None:
+        return False
+    if not np.array_equal(a.frame_data, b.frame_data):
+        return False
+    if (a.unpack is None) != (b.unpack is None):
+        return False
+    if a.unpack is not None and not np.array_equal(a.unpack, b.unpack):
+        return False
+    return np.array_equal(a.frame_indices, b.frame_indices)
+
+
+def track_delta(a: Track, b: Track, frames: np.ndarray, b_frames: np.ndarray) -> Optional[float]:
+    """Max decoded difference of two tracks of the same kind (degrees for
+    rotations, distance for positions), or None if either cannot be decoded.
+    """
+    if a.encoding is None or b.encoding is None:
+        return None
+    is_rotation = a.kind == 'rotation'
+    if (a.key_count == b.key_count and np.array_equal(a.frame_indices, b.frame_indices)
+            and np.array_equal(frames, b_frames)):
+        keys_a, keys_b = a.keys, b.keys
+    else:
+        keys_a = sample_keys(a.frame_indices, a.keys, frames, is_rotation)
+        keys_b = sample_keys(b.frame_indices, b.keys, b_frames, is_rotation)
+    if is_rotation:
+        return float(np.degrees(quat_angle_error(keys_a, keys_b)).max())
+    return float(np.linalg.norm(keys_a - keys_b, axis=1).max())
+
+
+def diff_entries(
+    index_a: MotlistIndex,
+    index_b: MotlistIndex,
+    entry_a: MotEntry,
+    entry_b: MotEntry,
+    rot_threshold_deg: float = DEFAULT_ROT_THRESHOLD_DEG,
+    pos_threshold: float = DEFAULT_POS_THRESHOLD,
+    layout: bool = False,
+) -> Dict[str, Any]:
+    """Compare two aligned mot entries.
+
+    Returns:
+        Dict with 'header' [(field, a, b)], 'only_a' / 'only_b' (bone hashes),
+        'clips' [(hash, field, a, b)], 'tracks' [(hash, kind, field, a, b)],
+        'deltas' [(hash, kind, max delta)] over the thresholds, and counters
+        'bones' (aligned), 'identical' (byte-identical tracks) and
+        'within' (decoded tracks within the thresholds).
+    """
+    fields = CONTENT_HEADER_FIELDS + (LAYOUT_HEADER_FIELDS if layout else ())
+    result = {
+        'header': _field_diffs(entry_a, entry_b, fields),
+        'only_a': [], 'only_b': [], 'clips': [], 'tracks': [], 'deltas': [],
+        'bones': 0, 'identical': 0, 'within': 0,
+    }
+    if not (entry_a.is_mot and entry_b.is_mot):
+        return result
+
+    clips_a = index_a.clips_by_hash(entry_a)
+    clips_b = index_b.clips_by_hash(entry_b)
+    result['only_a'] = [h for h in clips_a if h not in clips_b]
+    result['only_b'] = [h for h in clips_b if h not in clips_a]
+
+    # Sample at entry A's frames; B's frame numbers follow by time
+    frames = np.arange(int(round(entry_a.frame_count)) + 1, dtype=np.float64)
+    b_frames = frames
+    if entry_a.frame_rate and entry_b.frame_rate and entry_a.frame_rate != entry_b.frame_rate:
+        b_frames = frames * entry_b.frame_rate / entry_a.frame_rate
+    thresholds = {'rotation': rot_threshold_deg, 'position': pos_threshold}
+
+    for h, clip_a in clips_a.items():
+        clip_b = clips_b.get(h)
+        if clip_b is None:
+            continue
+        result['bones'] += 1
+        result['clips'].extend((h,) + d for d in _field_diffs(clip_a, clip_b, CLIP_FIELDS))
+        for track_a in clip_a.tracks:
+            track_b = clip_b.track(track_a.kind)
+            if track_b is None:
+                result['tracks'].append((h, track_a.kind, 'present', True, False))
+                continue
+            result['tracks'].extend((h, track_a.kind) + d
+                                    for d in _field_diffs(track_a, track_b, TRACK_FIELDS))
+            if _same_payload(track_a, track_b):
+                result['identical'] += 1
+                continue
+            delta = track_delta(track_a, track_b, frames, b_frames)
+            threshold = thresholds.get(track_a.kind)
+            if delta is None or threshold is None or delta > threshold:
+                result['deltas'].append((h, track_a.kind, delta))
+            else:
+                result['within'] += 1
+        for track_b in clip_b.tracks:
+            if clip_a.track(track_b.kind) is None:
+                result['tracks'].append((h, track_b.kind, 'present', False, True))
+    return result
+
+
+def diff_motlists(
+    path_a: str,
+    path_b: str,
+    rot_threshold_deg: float = DEFAULT_ROT_THRESHOLD_DEG,
+    pos_threshold: float = DEFAULT_POS_THRESHOLD,
+    layout: bool = False,
+    by_index: bool = False,
+) -> Dict[str, Any]:
+    """Compare two motlists entry by entry, aligned by name (or by position
+    with by_index; the report then uses A's entry names).
+
+    Returns:
+        Dict with 'files', 'header' [(field, a, b)] of the motlist headers,
+        'only_a' / 'only_b' (entry names) and 'entries' {name: diff_entries result}.
+    """
+    with MotlistFile(path_a) as ml_a, MotlistFile(path_b) as ml_b:
+        header_fields = ('version', 'magic', 'entry_count', 'name')
+        if layout:
+            header_fields += ('size', 'pointers_offs', 'col_offs', 'name_offs')
+        index_a, index_b = MotlistIndex(ml_a), MotlistIndex(ml_b)
+        entries_a, entries_b = index_a.entries_by_name, index_b.entries_by_name
+        if by_index:
+            # Key B's entries by A's name at the same position
+            names_a = list(entries_a)
+            entries_b = {names_a[i] if i < len(names_a) else name: entry
+                         for i, (name, entry) in enumerate(entries_b.items())}
+        result = {
+            'files': (path_a, path_b),
+            'header': _field_diffs(ml_a, ml_b, header_fields),
+            'only_a': [n for n in entries_a if n not in entries_b],
+            'only_b': [n for n in entries_b if n not in entries_a],
+            'entries': {},
+        }
+        for name, entry_a in entries_a.items():
+            entry_b = entries_b.get(name)
+            if entry_b is not None:
+                result['entries'][name] = diff_entries(
+                    index_a, index_b, entry_a, entry_b, rot_threshold_deg, pos_threshold, layout)
+    return result
+
+
+def entry_differs(entry: Dict[str, Any]) -> bool:
+    return any(entry[k] for k in ('header', 'only_a', 'only_b', 'clips', 'tracks', 'deltas'))
+
+
+def diff_failed(result: Dict[str, Any]) -> bool:
+    """True if the files differ structurally or beyond the thresholds."""
+    return bool(result['header'] or result['only_a'] or result['only_b']
+                or any(entry_differs(e) for e in result['entries'].values()))
+
+
+def _value(field: str, value: Any) -> str:
+    """Flag fields in hex, everything else as repr."""
+    if field in ('flags', 'track_flags', 'track_flags2') and isinstance(value, int):
+        return f"0x{value:08X}" if field == 'flags' else f"0x{value:02X}"
+    return repr(value)
+
+
+def _bone(h: int) -> str:
+    name = get_bone_name_for_hash(h)
+    return f"{name} (0x{h:08X})" if name else f"0x{h:08X}"
+
+
+def _limited(rows: List[str], max_rows: int, indent: str) -> List[str]:
+    if max_rows and len(rows) > max_rows:
+        return rows[:max_rows] + [f"{indent}... ({len(rows) - max_rows} more)"]
+    return rows
+
+
+def format_diff_report(result: Dict[str, Any], max_rows: int = 50) -> str:
+    """Differences only, grouped by entry, plus a one-line verdict."""
+    path_a, path_b = result['files']
+    lines = [f"A: {path_a}", f"B: {path_b}"]
+    for field, a, b in result['header']:
+        lines.append(f"Motlist {field}: {_value(field, a)} -> {_value(field, b)}")
+    if result['only_a']:
+        lines.append(f"Entries only in A ({len(result['only_a'])}):")
+        lines += _limited([f"  {n}" for n in result['only_a']], max_rows, "  ")
+    if result['only_b']:
+        lines.append(f"Entries only in B ({len(result['only_b'])}):")
+        lines += _limited([f"  {n}" for n in result['only_b']], max_rows, "  ")
+
+    totals = {'bones': 0, 'identical': 0, 'within': 0, 'deltas': 0}
+    changed = 0
+    for name, entry in result['entries'].items():
+        for k in ('bones', 'identical', 'within'):
+            totals[k] += entry[k]
+        totals['deltas'] += len(entry['deltas'])
+        if not entry_differs(entry):
+            continue
+        changed += 1
+        lines.append(f"\nEntry '{name}': {entry['bones']} bones aligned, "
+                     f"{entry['identical']} tracks identical, {entry['within']} within threshold")
+        for field, a, b in entry['header']:
+            lines.append(f"  header {field}: {_value(field, a)} -> {_value(field, b)}")
+        for label, hashes in (('only in A', entry['only_a']), ('only in B', entry['only_b'])):
+            if hashes:
+                lines.append(f"  Bones {label} ({len(hashes)}):")
+                lines += _limited([f"    {_bone(h)}" for h in hashes], max_rows, "    ")
+        rows = [f"    {_bone(h)}: {field} {_value(field, a)} -> {_value(field, b)}"
+                for h, field, a, b in entry['clips']]
+        rows += [f"    {_bone(h)} {kind}: {field} {_value(field, a)} -> {_value(field, b)}"
+                 for h, kind, field, a, b in entry['tracks']]
+        if rows:
+            lines.append(f"  Bone clip / track fields ({len(rows)}):")
+            lines += _limited(rows, max_rows, "    ")
+        if entry['deltas']:
+            deltas = sorted(entry['deltas'], key=lambda d: -1.0 if d[2] is None else d[2],
+                            reverse=True)
+            lines.append(f"  Keyframe deltas over threshold ({len(deltas)}):")
+            lines += _limited([f"    {_bone(h)} {kind}: "
+                               + ("not decodable" if d is None else
+                                  f"{d:.4f} deg" if kind == 'rotation' else f"{d:.6f}")
+                               for h, kind, d in deltas], max_rows, "    ")
+
+    lines.append(f"\n{len(result['entries'])} entries aligned ({changed} differ), "
+                 f"{totals['bones']} bones, {totals['identical']} tracks identical, "
+                 f"{totals['within']} within threshold, {totals['deltas']} over")
+    lines.append("DIFFERENT" if diff_failed(result) else "MATCH")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Diff two .motlist.85 files: entries by name, bones by hash, tracks by type")
+    parser.add_argument("a", help="First .motlist.85 (e.g. a real game reference)")
+    parser.add_argument("b", help="Second .motlist.85 (e.g. a generated file)")
+    parser.add_argument("--rot-threshold", type=float, default=DEFAULT_ROT_THRESHOLD_DEG,
+                        help=f"Rotation delta to report, degrees (default: {DEFAULT_ROT_THRESHOLD_DEG})")
+    parser.add_argument("--pos-threshold", type=float, default=DEFAULT_POS_THRESHOLD,
+                        help=f"Position delta to report (default: {DEFAULT_POS_THRESHOLD})")
+    parser.add_argument("--layout", action="store_true",
+                        help="Also compare offset / size header fields")
+    parser.add_argument("--by-index", action="store_true",
+                        help="Align entries by position instead of by name")
+    parser.add_argument("--max-rows", type=int, default=50,
+                        help="Rows printed per section (default: 50, 0 = all)")
+    args = parser.parse_args()
+
+    result = diff_motlists(args.a, args.b, args.rot_threshold, args.pos_threshold,
+                           args.layout, args.by_index)
+    print(format_diff_report(result, args.max_rows))
+    if diff_failed(result):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
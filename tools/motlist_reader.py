@@ -0,0 +1,279 @@
+"""
+RE2 .motlist.85 Reader
+Memory-maps a motlist and exposes its mot entries, bone clips and tracks as
+lazily parsed objects. Headers are unpacked on first access and keyframes are
+only decoded into NumPy arrays when a track's `keys` are requested, so large
+game motlists with hundreds of entries can be inspected cheaply.
+
+Decodes:
+  - Rotation: 4bpk compressed (0x00430112) and 12-byte float (0x004B0112)
+  - Position: float (0x004000F2) and the quantized POS_ENCODINGS variants
+  - Frame index arrays (u8 / i16 / i32, selected by flags >> 20)
+
+Usage (library):
+    from motlist_reader import MotlistFile
+    with MotlistFile("dodge_front.motlist.85") as ml:
+        for entry in ml.entries:
+            for clip in entry.bone_clips:
+                rot = clip.track('rotation')
+                if rot is not None:
+                    quats = rot.keys          # (keyCount, 4) XYZW
+"""
+
+import mmap
+import struct
+from functools import cached_property
+from typing import List, Optional
+
+import numpy as np
+
+from mot_writer import (
+    MOTLIST_MAGIC, MOT_MAGIC, MOT_HEADER_SIZE, BONE_CLIP_HEADER_SIZE,
+    TRACK_HEADER_SIZE, TRACK_HAS_POSITION, TRACK_HAS_ROTATION,
+    TRACK_HAS_SCALE, FLAG_ROT_COMPRESSED, FLAG_ROT_UNCOMPRESSED, POS_ENCODINGS,
+    decode_quats_4bpk, decode_quats_xyz, decode_positions, _decode_utf16le_string,
+)
+
+MOTLIST_HEADER_SIZE = 0x34
+
+# version, magic, pad, colOffs... see build_motlist
+_MOTLIST_HEADER = struct.Struct('<I4sQQQQQI')
+# Mot entry header (0x74 bytes), laid out as dumped by validate_against_real.py
+_MOT_HEADER = struct.Struct('<I4sII9Q4f2H2B3H')
+_MOT_HEADER_FIELDS = (
+    'version', 'magic', 'unk08', 'mot_size',
+    'offs_bone_hdr', 'bone_clip_offs', 'field_20', 'field_28', 'clip_file_offs',
+    'jmap_offs', 'field_40', 'offs2', 'names_offs',
+    'frame_count', 'blending', 'ukn_float1', 'ukn_float2',
+    'bone_count', 'bone_clip_count', 'ukn_6c', 'ukn_6d', 'frame_rate', 'ukn_70', 'ukn_72',
+)
+_BONE_CLIP = struct.Struct('<HBBIfIQ')
+_TRACK_HEADER = struct.Struct('<IIIfQQQ')
+
+# Frame index element type by flags >> 20
+_FRAME_INDEX_DTYPES = {2: np.uint8, 4: np.dtype('<i2'), 5: np.dtype('<i4')}
+
+_POS_FLAG_TO_ENCODING = {flags: name for name, (flags, _) in POS_ENCODINGS.items()}
+
+
+class Track:
+    """One track header of a bone clip. Offsets are absolute file offsets."""
+
+    def __init__(self, entry: 'MotEntry', offset: int, kind: str):
+        self.entry = entry
+        self.offset = offset
+        self.kind = kind  # 'position', 'rotation' or 'scale'
+        (self.flags, self.key_count, self.frame_rate, self.max_frame,
+         self.frame_ind_offs, self.frame_data_offs, self.unpack_offs) = \
+            _TRACK_HEADER.unpack_from(entry.data, offset)
+
+    @property
+    def encoding(self) -> Optional[str]:
+        """'4bpk' / 'float' for rotations, a POS_ENCODINGS key for positions,
+        None when this reader cannot decode the track's keys.
+        """
+        if self.kind == 'rotation':
+            if self.flags == FLAG_ROT_COMPRESSED:
+                return '4bpk'
+            if self.flags == FLAG_ROT_UNCOMPRESSED:
+                return 'float'
+        elif self.kind == 'position':
+            return _POS_FLAG_TO_ENCODING.get(self.flags)
+        return None
+
+    @property
+    def bytes_per_key(self) -> Optional[int]:
+        encoding = self.encoding
+        if encoding is None:
+            return None
+        if self.kind == 'rotation':
+            return 4 if encoding == '4bpk' else 12
+        return POS_ENCODINGS[encoding][1]
+
+    @cached_property
+    def frame_indices(self) -> np.ndarray:
+        """Frame number of each key (0..keyCount-1 when frameIndOffs is 0)."""
+        if self.frame_ind_offs == 0:
+            return np.arange(self.key_count)
+        dtype = _FRAME_INDEX_DTYPES.get(self.flags >> 20)
+        if dtype is None:
+            raise ValueError(f"Unknown frame index type in flags 0x{self.flags:08X}")
+        return np.frombuffer(self.entry.data, dtype=dtype, count=self.key_count,
+                             offset=self.entry.offset + self.frame_ind_offs).astype(np.int64)
+
+    @cached_property
+    def unpack(self) -> Optional[np.ndarray]:
+        """Unpack block as float32 (8,): scale[4] then base[4], or None."""
+        if self.unpack_offs == 0:
+            return None
+        return np.frombuffer(self.entry.data, dtype='<f4', count=8,
+                             offset=self.entry.offset + self.unpack_offs).copy()
+
+    @property
+    def frame_data(self) -> Optional[np.ndarray]:
+        """Raw keyframe bytes (uint8 view into the mapped file), or None if the
+        key size of this encoding is unknown.
+        """
+        bpk = self.bytes_per_key
+        if bpk is None:
+            return None
+        return np.frombuffer(self.entry.data, dtype=np.uint8, count=self.key_count * bpk,
+                             offset=self.entry.offset + self.frame_data_offs)
+
+    @cached_property
+    def keys(self) -> np.ndarray:
+        """Decoded keys: (N, 4) XYZW quaternions or (N, 3) positions (float64)."""
+        encoding = self.encoding
+        if encoding is None:
+            raise ValueError(
+                f"Cannot decode {self.kind} track flags 0x{self.flags:08X}")
+        raw = self.frame_data
+        if self.kind == 'rotation':
+            if encoding == '4bpk':
+                return decode_quats_4bpk(raw.reshape(-1, 4), self.unpack)
+            return decode_quats_xyz(raw.view('<f4').reshape(-1, 3))
+        if encoding == 'float':
+            return raw.view('<f4').reshape(-1, 3).astype(np.float64)
+        return decode_positions(raw, self.unpack, encoding)
+
+
+class BoneClip:
+    """One RE2 bone clip header (24 bytes) and its tracks."""
+
+    def __init__(self, entry: 'MotEntry', offset: int):
+        self.entry = entry
+        self.offset = offset
+        (self.bone_index, self.track_flags, self.track_flags2, self.bone_hash,
+         self.ukn_float, self.padding, self.track_hdr_offs) = \
+            _BONE_CLIP.unpack_from(entry.data, offset)
+
+    @property
+    def track_kinds(self) -> List[str]:
+        """Track types present, in file order (position, rotation, scale)."""
+        return [kind for bit, kind in ((TRACK_HAS_POSITION, 'position'),
+                                       (TRACK_HAS_ROTATION, 'rotation'),
+                                       (TRACK_HAS_SCALE, 'scale'))
+                if self.track_flags & bit]
+
+    @cached_property
+    def tracks(self) -> List[Track]:
+        base = self.entry.offset + self.track_hdr_offs
+        tracks = []
+        for i, kind in enumerate(self.track_kinds):
+            pos = base + i * TRACK_HEADER_SIZE
+            if pos + TRACK_HEADER_SIZE > len(self.entry.data):
+                break
+            tracks.append(Track(self.entry, pos, kind))
+        return tracks
+
+    def track(self, kind: str) -> Optional[Track]:
+        """The track of the given kind, or None."""
+        for t in self.tracks:
+            if t.kind == kind:
+                return t
+        return None
+
+
+class MotEntry:
+    """One RE2 v65 mot entry inside a motlist."""
+
+    def __init__(self, motlist: 'MotlistFile', offset: int):
+        self.motlist = motlist
+        self.data = motlist.data
+        self.offset = offset
+        if offset + MOT_HEADER_SIZE > len(self.data):
+            raise ValueError(f"Mot entry header at 0x{offset:X} extends beyond file")
+        for name, value in zip(_MOT_HEADER_FIELDS, _MOT_HEADER.unpack_from(self.data, offset)):
+            setattr(self, name, value)
+
+    @property
+    def is_mot(self) -> bool:
+        return self.magic == MOT_MAGIC
+
+    @cached_property
+    def name(self) -> str:
+        if self.names_offs == 0 or self.offset + self.names_offs >= len(self.data):
+            return ''
+        return _decode_utf16le_string(self.data, self.offset + self.names_offs)
+
+    def bone_clip(self, i: int) -> BoneClip:
+        pos = self.offset + self.bone_clip_offs + i * BONE_CLIP_HEADER_SIZE
+        if not 0 <= i < self.bone_clip_count or pos + BONE_CLIP_HEADER_SIZE > len(self.data):
+            raise IndexError(f"Bone clip {i} out of range")
+        return BoneClip(self, pos)
+
+    @cached_property
+    def bone_clips(self) -> List[BoneClip]:
+        """All bone clips that fit inside the file."""
+        clips = []
+        for i in range(self.bone_clip_count):
+            try:
+                clips.append(self.bone_clip(i))
+            except IndexError:
+                break
+        return clips
+
+
+class MotlistFile:
+    """A memory-mapped .motlist.85. Use as a context manager or call close()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty file: {path}")
+        if len(self.data) < MOTLIST_HEADER_SIZE:
+            self.close()
+            raise ValueError(f"File too small for motlist header: {path}")
+        (self.version, self.magic, _, self.pointers_offs, self.col_offs,
+         self.name_offs, _, self.entry_count) = _MOTLIST_HEADER.unpack_from(self.data, 0)
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def is_motlist(self) -> bool:
+        return self.magic == MOTLIST_MAGIC
+
+    @cached_property
+    def name(self) -> str:
+        if self.name_offs == 0 or self.name_offs >= len(self.data):
+            return ''
+        return _decode_utf16le_string(self.data, self.name_offs)
+
+    @cached_property
+    def entry_offsets(self) -> List[int]:
+        """Absolute offset of each mot entry (pointer table must fit the file)."""
+        end = self.pointers_offs + self.entry_count * 8
+        if end > len(self.data):
+            raise ValueError("Pointer table extends beyond file")
+        return list(struct.unpack_from(f'<{self.entry_count}Q', self.data, self.pointers_offs))
+
+    def entry(self, i: int) -> MotEntry:
+        return MotEntry(self, self.entry_offsets[i])
+
+    @cached_property
+    def entries(self) -> List[MotEntry]:
+        return [MotEntry(self, off) for off in self.entry_offsets]
+
+    def find_entry(self, name: str) -> Optional[MotEntry]:
+        for entry in self.entries:
+            if entry.name == name:
+                return entry
+        return None
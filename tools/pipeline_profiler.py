@@ -0,0 +1,214 @@
+"""
+Opt-in per-stage profiling for the CAF conversion tools (--profile).
+Pipeline functions are tagged with @profiled("stage") or wrapped in
+`with profile_stage("stage")`; while no Profiler is enabled these are a
+single global check, so normal runs pay nothing.
+
+An enabled Profiler records, per stage call: wall time, the tracemalloc peak
+above the memory in use when the stage started (allocations made by NumPy
+included), its nesting depth and counters added with profile_count (bones,
+keys, frames, bytes, ...). format_profile aggregates calls by stage path into
+a table; write_trace emits Chrome trace event JSON (chrome://tracing,
+https://ui.perfetto.dev) with the counters as event args, plus the table
+rows under "summary" for scripted regression checks.
+
+Usage (library):
+    from pipeline_profiler import Profiler, format_profile
+    prof = Profiler().enable()
+    json_to_motlist("anim.json", "out.motlist.85")
+    prof.disable()
+    print(format_profile(prof.records))
+"""
+
+import os
+import json
+import time
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+_active: Optional['Profiler'] = None
+
+
+class Profiler:
+    """Collects stage records while enabled. One may be enabled per process."""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+        self._started_tracing = False
+        self._t0 = time.perf_counter()
+
+    def enable(self) -> 'Profiler':
+        global _active
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._t0 = time.perf_counter()
+        _active = self
+        return self
+
+    def disable(self) -> List[Dict[str, Any]]:
+        global _active
+        if _active is self:
+            _active = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return self.records
+
+    def _memory(self):
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.get_traced_memory()
+
+    @contextmanager
+    def stage(self, name: str, **counts):
+        record = {
+            'name': name,
+            'path': tuple(r['name'] for r in self._stack) + (name,),
+            'depth': len(self._stack),
+            'pid': os.getpid(),
+            'start': time.perf_counter() - self._t0,
+            'seconds': 0.0,
+            'peak_bytes': None,
+            'counts': dict(counts),
+        }
+        memory = self._memory()
+        if memory is not None:
+            # The parent's peak so far must survive resetting the peak for this stage
+            if self._stack:
+                parent = self._stack[-1]
+                parent['_peak'] = max(parent['_peak'], memory[1])
+            record['_base'] = memory[0]
+            record['_peak'] = memory[0]
+            if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+                tracemalloc.reset_peak()
+        self._stack.append(record)
+        t0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - t0
+            self._stack.pop()
+            memory = self._memory()
+            if memory is not None and '_base' in record:
+                peak = max(record.pop('_peak'), memory[1])
+                record['peak_bytes'] = peak - record.pop('_base')
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent['_peak'] = max(parent['_peak'], peak)
+            self.records.append(record)
+
+    def count(self, **counts) -> None:
+        """Add to the counters of the innermost running stage."""
+        if self._stack:
+            stage_counts = self._stack[-1]['counts']
+            for k, v in counts.items():
+                stage_counts[k] = stage_counts.get(k, 0) + v
+
+
+@contextmanager
+def profile_stage(name: str, **counts):
+    """Stage of the enabled Profiler, or nothing when profiling is off."""
+    if _active is None:
+        yield None
+        return
+    with _active.stage(name, **counts) as record:
+        yield record
+
+
+def profile_count(**counts) -> None:
+    """Add counters to the current stage (no-op when profiling is off)."""
+    if _active is not None:
+        _active.count(**counts)
+
+
+def profiled(name: str):
+    """Decorator: run the whole function as one stage."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _active.stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def summarize(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate records by stage path, in first-seen order with parents
+    before children: calls, total seconds, max peak bytes, summed counters.
+    """
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for r in sorted(records, key=lambda r: (r['pid'], r['start'], r['depth'])):
+        row = rows.get(r['path'])
+        if row is None:
+            row = rows[r['path']] = {'stage': '/'.join(r['path']), 'path': r['path'],
+                                     'name': r['name'], 'depth': r['depth'], 'calls': 0,
+                                     'seconds': 0.0, 'peak_bytes': None, 'counts': {}}
+        row['calls'] += 1
+        row['seconds'] += r['seconds']
+        if r['peak_bytes'] is not None:
+            row['peak_bytes'] = max(row['peak_bytes'] or 0, r['peak_bytes'])
+        for k, v in r['counts'].items():
+            row['counts'][k] = row['counts'].get(k, 0) + v
+    # Depth-first: every stage right under its parent, siblings in first-seen order
+    first_seen = {path: i for i, path in enumerate(rows)}
+    return sorted(rows.values(), key=lambda row: [first_seen.get(row['path'][:n], -1)
+                                                  for n in range(1, len(row['path']) + 1)])
+
+
+def format_profile(records: List[Dict[str, Any]]) -> str:
+    """Per-stage table: calls, total and share of wall time, tracemalloc peak, counters."""
+    rows = summarize(records)
+    total = sum(row['seconds'] for row in rows if row['depth'] == 0) or 1e-12
+    lines = ["Profile:",
+             f"  {'Stage':<34} {'Calls':>5} {'Time ms':>9} {'%':>6} {'Peak MB':>8}  Counts"]
+    for row in rows:
+        peak = f"{row['peak_bytes'] / 1048576:.2f}" if row['peak_bytes'] is not None else '-'
+        counts = ", ".join(f"{k}={v}" for k, v in row['counts'].items())
+        label = "  " * row['depth'] + row['name']
+        lines.append(f"  {label:<34} {row['calls']:>5} {row['seconds'] * 1000:>9.1f} "
+                     f"{row['seconds'] / total * 100:>5.1f}% {peak:>8}  {counts}")
+    if all(row['peak_bytes'] is None for row in rows):
+        lines.append("  (memory tracing off)")
+    return "\n".join(lines)
+
+
+def write_trace(records: List[Dict[str, Any]], path: str) -> None:
+    """Write Chrome trace event JSON ("X" complete events, microseconds)."""
+    events = []
+    for r in records:
+        args = dict(r['counts'])
+        if r['peak_bytes'] is not None:
+            args['peak_bytes'] = r['peak_bytes']
+        events.append({
+            'name': r['name'],
+            'cat': '/'.join(r['path'][:-1]) or 'pipeline',
+            'ph': 'X',
+            'ts': round(r['start'] * 1e6, 1),
+            'dur': round(r['seconds'] * 1e6, 1),
+            'pid': r['pid'],
+            'tid': 0,
+            'args': args,
+        })
+    summary = [{k: v for k, v in row.items() if k not in ('name', 'path')}
+               for row in summarize(records)]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms', 'summary': summary}, f, indent=1)
+
+
+def report_profile(profiler: Optional[Profiler], trace_path: Optional[str] = None) -> None:
+    """CLI helper: stop profiling, print the table and write the trace if asked."""
+    if profiler is None:
+        return
+    records = profiler.disable()
+    print("\n" + format_profile(records))
+    if trace_path:
+        write_trace(records, trace_path)
+        print(f"  Trace: {trace_path}")
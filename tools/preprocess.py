@@ -0,0 +1,127 @@
+"""
+Shared source-track preprocessing for the converters (build_caf_mot_entry,
+build_dump_mot_entry) and verify_roundtrip, vectorized over whole
+(frames, bones, 7) [qx, qy, qz, qw, px, py, pz] arrays:
+
+  - Axis presets: the component remaps of apply_axis_preset in
+    CAF_JSONAnimPlayer.lua. Preset 1 'blender_to_re' (Blender Z-up
+    (x, y, z) -> RE Y-up (x, z, -y), positions and quaternion xyz alike),
+    preset 2 'identity' (no conversion); an AxisMap takes the place of the
+    Lua preset 3 custom fields
+  - Normalization: every quaternion to unit length (near-zero ones, which
+    carry no rotation, are left as they are)
+  - Hemisphere continuity: q and -q are the same rotation, but the engine
+    interpolates between consecutive keys, so a sign flip swings the bone
+    the long way round. Each key is put in its predecessor's hemisphere
+
+Usage (library):
+    from preprocess import preprocess_tracks
+    quats, positions, flips = preprocess_tracks(frames, 'blender_to_re')
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+# Quaternions shorter than this are left unnormalized
+MIN_QUAT_NORM = 0.001
+
+
+class AxisMap(NamedTuple):
+    """Axis remap as in the Lua axis_cfg: per output axis the 1-based source
+    component, negative to negate it (pos_x/pos_y/pos_z, q_x/q_y/q_z),
+    plus q_negate_w.
+    """
+    pos: Tuple[int, int, int]
+    quat: Tuple[int, int, int]
+    negate_w: bool = False
+
+
+AXIS_PRESETS: Dict[str, AxisMap] = {
+    'blender_to_re': AxisMap(pos=(1, 3, -2), quat=(1, 3, -2)),   # Lua preset 1
+    'identity': AxisMap(pos=(1, 2, 3), quat=(1, 2, 3)),          # Lua preset 2
+}
+
+Axis = Union[None, bool, str, AxisMap]
+
+
+def resolve_axis(axis: Axis) -> Optional[AxisMap]:
+    """AxisMap for an axis_convert argument: True means 'blender_to_re',
+    None / False no conversion, a string an AXIS_PRESETS name.
+    """
+    if axis is None or axis is False:
+        return None
+    if axis is True:
+        return AXIS_PRESETS['blender_to_re']
+    if isinstance(axis, str):
+        if axis not in AXIS_PRESETS:
+            raise ValueError(f"Unknown axis preset {axis!r} (known: {', '.join(AXIS_PRESETS)})")
+        return AXIS_PRESETS[axis]
+    return AxisMap(*axis)
+
+
+def apply_axis_map(frames: np.ndarray, axis: AxisMap) -> np.ndarray:
+    """Remap (..., 7) transforms with one gather and one multiply."""
+    if axis == AXIS_PRESETS['identity']:
+        return frames
+    columns = [abs(m) - 1 for m in axis.quat] + [3] + [4 + abs(m) - 1 for m in axis.pos]
+    signs = ([-1.0 if m < 0 else 1.0 for m in axis.quat] + [-1.0 if axis.negate_w else 1.0]
+             + [-1.0 if m < 0 else 1.0 for m in axis.pos])
+    return frames[..., columns] * np.array(signs)
+
+
+def normalize_quats(quats: np.ndarray) -> np.ndarray:
+    """Unit (..., 4) quaternions; ones shorter than MIN_QUAT_NORM unchanged."""
+    norm = np.sqrt(np.einsum('...i,...i->...', quats, quats))[..., None]
+    return np.where(norm > MIN_QUAT_NORM, quats / np.maximum(norm, MIN_QUAT_NORM), quats)
+
+
+def fix_hemispheres(quats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Make (frames, bones, 4) tracks sign-continuous along the frames.
+
+    Each key's sign is the running product of the signs of the raw
+    consecutive dots, i.e. dot(previous output key, key) >= 0.
+
+    Returns:
+        (quats, flips) with flips the number of negated keys per bone.
+    """
+    if len(quats) < 2:
+        return quats, np.zeros(quats.shape[1:-1], dtype=np.int64)
+    dots = np.einsum('fbi,fbi->fb', quats[:-1], quats[1:])
+    signs = np.cumprod(np.where(dots < 0.0, -1.0, 1.0), axis=0)
+    out = quats.copy()
+    out[1:] *= signs[..., None]
+    return out, np.count_nonzero(signs < 0.0, axis=0)
+
+
+def preprocess_tracks(
+    frames,
+    axis: Axis = None,
+    normalize: bool = True,
+    hemisphere: bool = True,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Axis conversion, normalization and hemisphere continuity of a clip.
+
+    Args:
+        frames: (frames, bones, >= 7) [qx, qy, qz, qw, px, py, pz] (extra
+            channels ignored)
+        axis: AXIS_PRESETS name, AxisMap, True ('blender_to_re') or None
+
+    Returns:
+        (quats (frames, bones, 4), positions (frames, bones, 3), flips (bones,))
+        as float64, flips counting the keys negated by the hemisphere fix.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    if frames.ndim != 3 or frames.shape[2] < 7:
+        raise ValueError(f"Frame data must be frames x bones x 7, got shape {frames.shape}")
+    frames = frames[:, :, :7]
+    axis = resolve_axis(axis)
+    if axis is not None:
+        frames = apply_axis_map(frames, axis)
+    quats = frames[:, :, 0:4]
+    if normalize:
+        quats = normalize_quats(quats)
+    flips = np.zeros(frames.shape[1], dtype=np.int64)
+    if hemisphere:
+        quats, flips = fix_hemispheres(quats)
+    return quats, frames[:, :, 4:7], flips
@@ -0,0 +1,199 @@
+"""
+Animation resampling / frame-rate conversion for .motlist.85 conversion.
+Resamples whole captures before encoding, vectorized over all bones:
+
+  - Rotations: slerp between the two neighbouring source keys (shortest path,
+    normalized lerp when they are nearly parallel)
+  - Positions: lerp, or Catmull-Rom cubic through the four neighbouring keys
+
+A target frame rate keeps the clip duration (180 frames @ 60fps -> 90 frames
+@ 30fps, halving key counts); a target frame count stretches the clip to that
+length at the source frame rate. resample_error measures how far the
+resampled clip strays from the source at the source frames, i.e. what the
+engine's own interpolation between the new keys will reproduce.
+
+Usage (library):
+    from resample import resample_clip
+    quats, positions, fps, t = resample_clip(quats, positions, 60, target_fps=30)
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from key_reduction import quat_angle_error
+from pipeline_profiler import profiled, profile_stage
+
+POSITION_INTERP_MODES = ('linear', 'cubic')
+
+
+def resample_times(
+    frame_count: int,
+    fps: float,
+    target_fps: Optional[float] = None,
+    target_frames: Optional[int] = None,
+) -> Tuple[np.ndarray, float]:
+    """Source-frame sample positions for the resampled clip.
+
+    Returns:
+        (t, fps) where t holds one fractional source frame per output frame
+        and fps is the output frame rate.
+    """
+    if frame_count < 1:
+        return np.zeros(0), fps
+    if target_frames is not None:
+        if target_frames < 1:
+            raise ValueError(f"Target frame count must be >= 1, got {target_frames}")
+        if target_frames == 1 or frame_count == 1:
+            return np.zeros(target_frames), fps
+        return np.linspace(0.0, frame_count - 1, target_frames), fps
+    if target_fps is None or target_fps == fps:
+        return np.arange(frame_count, dtype=np.float64), fps
+    if target_fps <= 0:
+        raise ValueError(f"Target frame rate must be positive, got {target_fps}")
+    step = fps / target_fps
+    count = int(math.floor((frame_count - 1) / step + 1e-9)) + 1
+    return np.arange(count) * step, target_fps
+
+
+def _neighbours(frame_count: int, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    i0 = np.clip(np.floor(t).astype(np.int64), 0, frame_count - 1)
+    i1 = np.minimum(i0 + 1, frame_count - 1)
+    return i0, i1, t - i0
+
+
+def slerp_tracks(quats: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Sample (frames, bones, 4) XYZW tracks at fractional frames t.
+    Returns (len(t), bones, 4) unit quaternions.
+    """
+    quats = np.asarray(quats, dtype=np.float64)
+    i0, i1, u = _neighbours(len(quats), t)
+    q0, q1 = quats[i0], quats[i1]
+    d = np.einsum('nbi,nbi->nb', q0, q1)
+    q1 = np.where((d < 0.0)[..., None], -q1, q1)
+    d = np.abs(d)
+    u = np.broadcast_to(u[:, None], d.shape)
+
+    theta = np.arccos(np.clip(d, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    near = d > 0.9995  # Nearly parallel: normalized lerp avoids dividing by sin(~0)
+    safe_sin = np.where(near, 1.0, sin_theta)
+    w0 = np.where(near, 1.0 - u, np.sin((1.0 - u) * theta) / safe_sin)
+    w1 = np.where(near, u, np.sin(u * theta) / safe_sin)
+    out = w0[..., None] * q0 + w1[..., None] * q1
+    norm = np.linalg.norm(out, axis=-1, keepdims=True)
+    return out / np.maximum(norm, 1e-12)
+
+
+def lerp_tracks(values: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Linear interpolation of (frames, bones, N) tracks at fractional frames t."""
+    values = np.asarray(values, dtype=np.float64)
+    i0, i1, u = _neighbours(len(values), t)
+    return values[i0] + u[:, None, None] * (values[i1] - values[i0])
+
+
+def cubic_tracks(values: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Catmull-Rom interpolation of (frames, bones, N) tracks at fractional
+    frames t; end keys are repeated so the curve passes through them.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    i1, i2, u = _neighbours(n, t)
+    i0 = np.maximum(i1 - 1, 0)
+    i3 = np.minimum(i2 + 1, n - 1)
+    p0, p1, p2, p3 = values[i0], values[i1], values[i2], values[i3]
+    u = u[:, None, None]
+    u2 = u * u
+    u3 = u2 * u
+    return 0.5 * ((2.0 * p1) + (p2 - p0) * u
+                  + (2.0 * p0 - 5.0 * p1 + 4.0 * p2 - p3) * u2
+                  + (3.0 * p1 - p0 - 3.0 * p2 + p3) * u3)
+
+
+def sample_keys(frame_indices: np.ndarray, keys: np.ndarray, frames: np.ndarray,
+                is_rotation: bool) -> np.ndarray:
+    """Evaluate one sparse track at fractional frames (held past its ends)."""
+    if len(keys) == 1:
+        return np.repeat(keys, len(frames), axis=0)
+    t = np.interp(frames, frame_indices, np.arange(len(keys), dtype=np.float64))
+    interp = slerp_tracks if is_rotation else lerp_tracks
+    return interp(keys[:, None, :], t)[:, 0, :]
+
+
+def resample_clip(
+    quats: np.ndarray,
+    positions: Optional[np.ndarray],
+    fps: float,
+    target_fps: Optional[float] = None,
+    target_frames: Optional[int] = None,
+    position_interp: str = 'linear',
+) -> Tuple[np.ndarray, Optional[np.ndarray], float, np.ndarray]:
+    """Resample (frames, bones, 4) rotations and optional (frames, bones, 3)
+    positions to a target frame rate or frame count.
+
+    Returns:
+        (quats, positions, fps, t) of the resampled clip, t being the source
+        frame each output frame was sampled at. With neither target set the
+        inputs are returned unchanged.
+    """
+    if position_interp not in POSITION_INTERP_MODES:
+        raise ValueError(f"Unknown position interpolation {position_interp!r}")
+    if target_fps is None and target_frames is None:
+        return quats, positions, fps, np.arange(len(quats), dtype=np.float64)
+    t, out_fps = resample_times(len(quats), fps, target_fps, target_frames)
+    with profile_stage('resample', bones=quats.shape[1], frames_in=len(quats), frames_out=len(t)):
+        out_quats = slerp_tracks(quats, t)
+        out_positions = None
+        if positions is not None:
+            interp = cubic_tracks if position_interp == 'cubic' else lerp_tracks
+            out_positions = interp(positions, t)
+    return out_quats, out_positions, out_fps, t
+
+
+@profiled('resample error')
+def resample_error(
+    src_quats: np.ndarray,
+    src_positions: Optional[np.ndarray],
+    quats: np.ndarray,
+    positions: Optional[np.ndarray],
+    t: np.ndarray,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Per-bone max error of a resampled clip against its source, with the
+    resampled keys slerped/lerped back onto every source frame. t is the
+    source frame of each resampled key (from resample_clip); source frames
+    past the last key are compared against it.
+
+    Returns:
+        (rotation error in degrees per bone, position distance per bone or None)
+    """
+    src_frames = len(src_quats)
+    if len(t) > 1 and t[-1] > t[0]:
+        t = np.interp(np.arange(src_frames, dtype=np.float64), t, np.arange(len(t), dtype=np.float64))
+    else:
+        t = np.zeros(src_frames)
+    back = slerp_tracks(quats, t)
+    bones = src_quats.shape[1]
+    rot_err = quat_angle_error(back.reshape(-1, 4), np.asarray(src_quats, dtype=np.float64).reshape(-1, 4))
+    rot_err = np.degrees(rot_err.reshape(src_frames, bones).max(axis=0))
+    pos_err = None
+    if positions is not None and src_positions is not None:
+        diff = lerp_tracks(positions, t) - np.asarray(src_positions, dtype=np.float64)
+        pos_err = np.linalg.norm(diff, axis=-1).max(axis=0)
+    return rot_err, pos_err
+
+
+def format_resample_report(
+    src_frames: int,
+    src_fps: float,
+    frames: int,
+    fps: float,
+    rot_err: np.ndarray,
+    pos_err: Optional[np.ndarray] = None,
+) -> str:
+    """One-line summary of a resample and its worst-bone error."""
+    line = (f"Resampled {src_frames} frames @ {src_fps:g}fps -> {frames} frames @ {fps:g}fps, "
+            f"max rotation error {float(rot_err.max()) if len(rot_err) else 0.0:.4f} deg")
+    if pos_err is not None and len(pos_err):
+        line += f", max position error {float(pos_err.max()):.6f}"
+    return line
@@ -0,0 +1,327 @@
+"""
+Split a continuous bone capture into per-event .motlist.85 entries.
+Streams dodge_continuous_full.txt (DodgeDumperV5.lua continuous mode) once
+into columnar arrays, detects motion events offline and writes every event
+as its own mot entry in a single motlist, so captures can be re-sliced with
+different thresholds without replaying the game.
+
+Detection works like the Lua auto-detect, but on more signals: per-frame
+linear speed and angular speed of the COG (fallback: hips) and root bones,
+each smoothed over a 5-frame window. A frame is active when any linear
+speed exceeds the speed threshold or any angular speed exceeds the angular
+threshold. Thresholds default to 15% of the capture's maximum (with a floor)
+and active runs become events when they are long enough and far enough
+from the previous event.
+
+Usage:
+    python split_continuous.py <dodge_continuous_full.txt> <output.motlist.85> [options]
+
+    Options:
+      --ref <path>              Reference .motlist.85 for bone index mapping (repeatable)
+      --speed-threshold <d>     Linear speed per frame (default: adaptive)
+      --angular-threshold <deg> Angular speed in degrees per frame (default: adaptive)
+      --min-event <n>           Minimum active frames per event (default: 8)
+      --min-gap <n>             Minimum frames between events (default: 60)
+      --pre-roll <n>            Frames kept before each event (default: 10)
+      --clip-frames <n>         Fixed clip length, 0 = event length + post-roll (default: 180)
+      --post-roll <n>           Frames kept after each event when --clip-frames 0 (default: 10)
+      --prefix <str>            Entry name prefix (default: dodge_event)
+      --list                    Only print the detected events
+"""
+
+import sys
+import os
+import math
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mot_writer import build_motlist, validate_motlist
+from key_reduction import quat_angle_error
+from bone_index import reference_paths
+from dump_to_motlist import (
+    parse_dodge_dump_columnar, map_bone_indices, build_dump_mot_entry,
+)
+
+# Adaptive thresholds: fraction of the capture's peak, never below the floor
+ADAPTIVE_FRACTION = 0.15
+SPEED_FLOOR = 0.001                     # Same floor as DodgeDumperV5.lua
+ANGULAR_FLOOR = math.radians(0.5)       # Per frame
+
+
+def smooth(signal, window=5):
+    """Centered moving average; edge frames average only the samples present."""
+    if len(signal) == 0:
+        return signal
+    kernel = np.ones(window)
+    sums = np.convolve(signal, kernel, mode='same')
+    counts = np.convolve(np.ones(len(signal)), kernel, mode='same')
+    return sums / counts
+
+
+def tracking_bones(bone_names):
+    """Bones whose motion drives detection: COG (or hips) and root."""
+    names = []
+    if "COG" in bone_names:
+        names.append("COG")
+    elif "hips" in bone_names:
+        names.append("hips")
+    if "root" in bone_names:
+        names.append("root")
+    return names
+
+
+def motion_signals(bone_names, tracks, window=5):
+    """Smoothed per-frame (linear_speed, angular_speed) for each tracking bone.
+    Returns: {bone_name: (speed, angular)} with frame 0 at zero speed.
+    """
+    signals = {}
+    for name in tracking_bones(bone_names):
+        track = tracks[bone_names.index(name)].astype(np.float64)
+        speed = np.zeros(len(track))
+        angular = np.zeros(len(track))
+        if len(track) > 1:
+            speed[1:] = np.linalg.norm(np.diff(track[:, 4:7], axis=0), axis=1)
+            angular[1:] = quat_angle_error(track[:-1, 0:4], track[1:, 0:4])
+        signals[name] = (smooth(speed, window), smooth(angular, window))
+    return signals
+
+
+def detect_events(
+    bone_names,
+    tracks,
+    speed_threshold=None,
+    angular_threshold=None,
+    min_event_len=8,
+    min_gap=60,
+    window=5,
+):
+    """Find motion events in columnar dump tracks (bones, frames, 7).
+
+    Args:
+        speed_threshold: Linear speed per frame, None = adaptive
+        angular_threshold: Angular speed in radians per frame, None = adaptive
+
+    Returns:
+        (events, thresholds) where events are dicts with start/stop (stop is
+        exclusive), length, peak_frame, peak_speed and peak_angular (degrees),
+        and thresholds is (speed_threshold, angular_threshold).
+    """
+    signals = motion_signals(bone_names, tracks, window)
+    if not signals:
+        raise ValueError("No COG, hips or root bone in dump")
+
+    speed = np.max([s for s, _ in signals.values()], axis=0)
+    angular = np.max([a for _, a in signals.values()], axis=0)
+    frame_count = len(speed)
+    if speed_threshold is None:
+        speed_threshold = max(SPEED_FLOOR, float(speed.max(initial=0.0)) * ADAPTIVE_FRACTION)
+    if angular_threshold is None:
+        angular_threshold = max(ANGULAR_FLOOR, float(angular.max(initial=0.0)) * ADAPTIVE_FRACTION)
+
+    # Runs of active frames, as [start, stop) pairs
+    active = (speed > speed_threshold) | (angular > angular_threshold)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)
+
+    # Peak frame: strongest signal relative to its threshold
+    score = np.maximum(speed / speed_threshold, angular / angular_threshold)
+
+    events = []
+    last_stop = -min_gap
+    for run_start, run_stop in runs:
+        start = max(int(run_start), last_stop + min_gap)
+        stop = int(run_stop)
+        if stop - start < min_event_len:
+            continue
+        peak = start + int(np.argmax(score[start:stop]))
+        events.append({
+            'start': start,
+            'stop': stop,
+            'length': stop - start,
+            'peak_frame': peak,
+            'peak_speed': float(speed[peak]),
+            'peak_angular': math.degrees(angular[peak]),
+        })
+        last_stop = stop
+
+    return events, (speed_threshold, angular_threshold)
+
+
+def event_clip_range(event, frame_count, pre_roll=10, clip_frames=180, post_roll=10):
+    """Frame range [start, stop) cut for an event (180-frame window like the Lua dumper)."""
+    start = max(0, event['start'] - pre_roll)
+    if clip_frames > 0:
+        stop = min(frame_count, start + clip_frames)
+    else:
+        stop = min(frame_count, event['stop'] + post_roll)
+    return start, stop
+
+
+def split_continuous(
+    dump_path,
+    output_path,
+    reference_motlist=None,
+    motlist_name=None,
+    prefix="dodge_event",
+    speed_threshold=None,
+    angular_threshold_deg=None,
+    min_event_len=8,
+    min_gap=60,
+    pre_roll=10,
+    clip_frames=180,
+    post_roll=10,
+    list_only=False,
+    include_positions=True,
+    compressed=True,
+    frame_rate=60,
+    rot_tolerance_deg=None,
+    pos_tolerance=None,
+    max_rot_error_deg=None,
+    max_pos_error=None,
+    optimize_4bpk=False,
+    experimental_pos_encodings=False,
+):
+    """Detect events in a continuous dump and write them as one motlist.
+    Returns the list of event dicts (with clip_start / clip_stop / name added).
+    """
+    bone_names, frame_count, tracks = parse_dodge_dump_columnar(dump_path)
+    actual_frame_count = tracks.shape[1]
+    print(f"Dump: {len(bone_names)} bones, {actual_frame_count} frames "
+          f"(header says {frame_count})")
+
+    angular_threshold = (math.radians(angular_threshold_deg)
+                         if angular_threshold_deg is not None else None)
+    events, (speed_thr, angular_thr) = detect_events(
+        bone_names, tracks, speed_threshold, angular_threshold, min_event_len, min_gap)
+
+    print(f"Tracking: {', '.join(tracking_bones(bone_names))}; thresholds: "
+          f"speed {speed_thr:.6f}/frame, angular {math.degrees(angular_thr):.3f} deg/frame")
+    print(f"Found {len(events)} events")
+    for i, ev in enumerate(events, 1):
+        ev['clip_start'], ev['clip_stop'] = event_clip_range(
+            ev, actual_frame_count, pre_roll, clip_frames, post_roll)
+        ev['name'] = f"{prefix}_{i}"
+        print(f"  {ev['name']}: frames {ev['start']}-{ev['stop']} ({ev['length']} frames, "
+              f"peak at {ev['peak_frame']}: {ev['peak_speed']:.5f}/frame, "
+              f"{ev['peak_angular']:.2f} deg/frame) -> clip {ev['clip_start']}-{ev['clip_stop']}")
+
+    if list_only or not events:
+        return events
+
+    bone_index_map, mapped_count = map_bone_indices(bone_names, reference_motlist)
+    if reference_paths(reference_motlist):
+        print(f"Mapped {mapped_count}/{len(bone_names)} bones from reference")
+
+    mot_entries = []
+    for ev in events:
+        print(f"\n[{ev['name']}]")
+        mot_entry, _ = build_dump_mot_entry(
+            bone_names, tracks[:, ev['clip_start']:ev['clip_stop']], ev['name'], bone_index_map,
+            include_positions=include_positions,
+            compressed=compressed,
+            frame_rate=frame_rate,
+            rot_tolerance_deg=rot_tolerance_deg,
+            pos_tolerance=pos_tolerance,
+            max_rot_error_deg=max_rot_error_deg,
+            max_pos_error=max_pos_error,
+            optimize_4bpk=optimize_4bpk,
+            experimental_pos_encodings=experimental_pos_encodings,
+        )
+        mot_entries.append(mot_entry)
+
+    if motlist_name is None:
+        motlist_name = os.path.basename(output_path).split('.')[0]
+    motlist = build_motlist(motlist_name=motlist_name, mot_entries=mot_entries)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(motlist)
+
+    print(f"\nWrote {output_path} ({len(motlist) / 1024:.1f} KB, "
+          f"{len(mot_entries)} entries @ {frame_rate}fps)")
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Split a continuous bone dump into per-event motlist entries"
+    )
+    parser.add_argument("dump", help="Continuous dump .txt file (dodge_continuous_full.txt)")
+    parser.add_argument("output", nargs="?", help="Output .motlist.85 file")
+    parser.add_argument("--ref", action="append",
+                        help="Reference .motlist.85 for bone index mapping (repeatable)")
+    parser.add_argument("--motlist-name", help="Motlist container name (default: output stem)")
+    parser.add_argument("--prefix", default="dodge_event", help="Entry name prefix")
+    parser.add_argument("--speed-threshold", type=float, default=None,
+                       help="Linear speed per frame that counts as motion (default: adaptive)")
+    parser.add_argument("--angular-threshold", type=float, default=None,
+                       help="Angular speed in degrees per frame that counts as motion "
+                            "(default: adaptive)")
+    parser.add_argument("--min-event", type=int, default=8,
+                       help="Minimum active frames per event (default: 8)")
+    parser.add_argument("--min-gap", type=int, default=60,
+                       help="Minimum frames between events (default: 60)")
+    parser.add_argument("--pre-roll", type=int, default=10,
+                       help="Frames kept before each event (default: 10)")
+    parser.add_argument("--clip-frames", type=int, default=180,
+                       help="Fixed clip length, 0 = event length + post-roll (default: 180)")
+    parser.add_argument("--post-roll", type=int, default=10,
+                       help="Frames kept after each event with --clip-frames 0 (default: 10)")
+    parser.add_argument("--list", action="store_true", help="Only print detected events")
+    parser.add_argument("--no-positions", action="store_true", help="Skip position tracks")
+    parser.add_argument("--uncompressed", action="store_true", help="Use uncompressed rotation")
+    parser.add_argument("--fps", type=int, default=60, help="Frame rate (default: 60)")
+    parser.add_argument("--rot-tolerance", type=float, default=None,
+                       help="Reduce rotation keys, max angular error in degrees")
+    parser.add_argument("--pos-tolerance", type=float, default=None,
+                       help="Reduce position keys, max distance error")
+    parser.add_argument("--max-rot-error", type=float, default=None,
+                       help="Pick 4bpk/float/static per rotation track under this "
+                            "error budget in degrees")
+    parser.add_argument("--max-pos-error", type=float, default=None,
+                       help="Pick float/static per position track under this distance "
+                            "error budget (16-bit axis too with --experimental-pos-encodings)")
+    parser.add_argument("--experimental-pos-encodings", action="store_true",
+                       help="Let --max-pos-error pick the 16-bit axis position encodings "
+                            "(key layout not verified in game)")
+    parser.add_argument("--optimize-4bpk", action="store_true",
+                       help="Search 4bpk unpack ranges and key hemispheres for the "
+                            "lowest quantization error")
+
+    args = parser.parse_args()
+    if not args.list and not args.output:
+        parser.error("output is required unless --list is given")
+
+    events = split_continuous(
+        dump_path=args.dump,
+        output_path=args.output,
+        reference_motlist=args.ref,
+        motlist_name=args.motlist_name,
+        prefix=args.prefix,
+        speed_threshold=args.speed_threshold,
+        angular_threshold_deg=args.angular_threshold,
+        min_event_len=args.min_event,
+        min_gap=args.min_gap,
+        pre_roll=args.pre_roll,
+        clip_frames=args.clip_frames,
+        post_roll=args.post_roll,
+        list_only=args.list,
+        include_positions=not args.no_positions,
+        compressed=not args.uncompressed,
+        frame_rate=args.fps,
+        rot_tolerance_deg=args.rot_tolerance,
+        pos_tolerance=args.pos_tolerance,
+        max_rot_error_deg=args.max_rot_error,
+        max_pos_error=args.max_pos_error,
+        optimize_4bpk=args.optimize_4bpk,
+        experimental_pos_encodings=args.experimental_pos_encodings,
+    )
+
+    if events and not args.list:
+        print("\n" + validate_motlist(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Quantization-aware unpack parameter optimizer for 4bpk rotation tracks.
+compute_unpack_params spans each component's raw min..max, so one outlier key
+stretches the range and coarsens the 8-bit steps of the whole track. This
+module instead searches, per track and vectorized over its keys:
+
+  - Hemisphere: q and -q are the same rotation. Keys are flipped towards the
+    track's principal axis (or made continuous with their predecessor) when
+    that shrinks the component ranges, without adding sign flips between
+    neighbouring keys that the source did not have
+  - Base / scale: each component's range is trimmed from either end by a
+    fraction of its span (coordinate descent over the four components),
+    scoring the angular error after dequantization and renormalization.
+    Trimming the dominant component (qW of a near-identity bone) is nearly
+    free, since renormalization absorbs error along the quaternion itself
+  - Codes: instead of rounding each component independently, every key takes
+    the floor/ceil combination (16 per key) whose renormalized decode points
+    closest to the source rotation
+
+The raw min/max range (with the same code search) is always evaluated too
+and kept unless the optimized parameters lower the track's max error, so a
+track never ends up worse than with quantize_quats_4bpk.
+Output is the regular 4bpk format: codes plus a scale[4]/base[4] unpack block.
+
+Usage (library):
+    from unpack_optimizer import optimize_quats_4bpk
+    codes, unpack = optimize_quats_4bpk(quats)   # (N, 4) or (T, N, 4)
+"""
+
+import itertools
+from typing import Tuple
+
+import numpy as np
+
+# Fractions of a component's span trimmed from its low / high end
+TRIM_FRACTIONS = (0.0, 1 / 256, 1 / 128, 1 / 64, 1 / 32, 1 / 16, 1 / 8, 1 / 4)
+SWEEPS = 2
+# Scale written for a constant component (matches compute_unpack_params)
+MIN_SCALE = 1e-10
+FLAT_SCALE = 0.001
+
+
+def _sign_flips(quats: np.ndarray) -> np.ndarray:
+    """Number of neighbouring key pairs with a negative dot product, per track."""
+    dots = np.einsum('tni,tni->tn', quats[:, 1:], quats[:, :-1])
+    return (dots < 0.0).sum(axis=1)
+
+
+def _range_sum(quats: np.ndarray) -> np.ndarray:
+    return (quats.max(axis=1) - quats.min(axis=1)).sum(axis=1)
+
+
+def align_hemispheres(quats: np.ndarray) -> np.ndarray:
+    """Per-key sign choice minimizing the summed component ranges of each
+    (T, N, 4) track, among: as given, continuous (each key in its
+    predecessor's hemisphere) and aligned to the track's principal axis.
+    Candidates with more neighbour sign flips than the input are skipped.
+    """
+    quats = np.asarray(quats, dtype=np.float64)
+    if quats.shape[1] < 2:
+        return quats
+
+    # Continuous: flip each key whose dot with the previous one is negative,
+    # accumulated along the track
+    dots = np.einsum('tni,tni->tn', quats[:, 1:], quats[:, :-1])
+    steps = np.where(dots < 0.0, -1.0, 1.0)
+    signs = np.concatenate([np.ones((len(quats), 1)), np.cumprod(steps, axis=1)], axis=1)
+    continuous = quats * signs[..., None]
+
+    # Principal axis: dominant eigenvector of the per-track scatter matrix
+    scatter = np.einsum('tni,tnj->tij', quats, quats)
+    _, vectors = np.linalg.eigh(scatter)
+    axis = vectors[:, :, -1]
+    side = np.einsum('tni,ti->tn', quats, axis)
+    principal = quats * np.where(side < 0.0, -1.0, 1.0)[..., None]
+
+    candidates = np.stack([quats, continuous, principal])   # (3, T, N, 4)
+    flips = np.stack([_sign_flips(c) for c in candidates])  # (3, T)
+    cost = np.stack([_range_sum(c) for c in candidates])
+    cost[flips > flips[0]] = np.inf
+    best = np.argmin(cost, axis=0)
+    return candidates[best, np.arange(len(quats))]
+
+
+def _safe_scale(scale: np.ndarray) -> np.ndarray:
+    return np.where(scale < MIN_SCALE, FLAT_SCALE, scale)
+
+
+def _dequantize(values: np.ndarray, base: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Round trip through 8-bit codes: base + rint((v - base) / scale * 255) / 255 * scale."""
+    codes = np.clip(np.rint((values - base) / scale * 255.0), 0.0, 255.0)
+    return base + codes / 255.0 * scale
+
+
+def _best_codes(values: np.ndarray, base: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Per-key floor/ceil choice of the four 8-bit codes that minimizes the
+    angle between the renormalized decode and the (unit) source key.
+    """
+    floor = np.clip(np.floor((values - base) / scale * 255.0), 0.0, 255.0)
+    target = values / np.maximum(np.linalg.norm(values, axis=-1, keepdims=True), 1e-12)
+    best = floor
+    best_cos = np.full(values.shape[:-1], -1.0)
+    for offset in itertools.product((0.0, 1.0), repeat=4):
+        codes = np.minimum(floor + np.array(offset), 255.0)
+        cos = 1.0 - _track_error(base + codes / 255.0 * scale, target)
+        better = cos > best_cos
+        best = np.where(better[..., None], codes, best)
+        best_cos = np.where(better, cos, best_cos)
+    return best
+
+
+def _track_error(decoded: np.ndarray, quats: np.ndarray) -> np.ndarray:
+    """1 - cos(half angle) per key after renormalization; monotonic in the
+    angular error and cheap enough to score every candidate.
+    """
+    dots = np.abs(np.einsum('...i,...i->...', decoded, quats))
+    norms = np.sqrt(np.einsum('...i,...i->...', decoded, decoded))
+    return 1.0 - dots / np.maximum(norms, 1e-12)
+
+
+def optimize_unpack_params(quats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Search base / scale of unit (T, N, 4) tracks (already hemisphere
+    aligned) for the lowest max error after quantization and renormalization.
+
+    Returns:
+        (scale, base), each (T, 4), as float32-representable float64 values.
+    """
+    lo = quats.min(axis=1)
+    hi = quats.max(axis=1)
+    span = hi - lo
+    trims = np.asarray(TRIM_FRACTIONS)
+    # Candidate (low trim, high trim) pairs that keep some of the span
+    pairs = np.array([(a, b) for a in trims for b in trims if a + b < 0.5])
+
+    base = lo.copy()
+    scale = _safe_scale(span)
+    decoded = _dequantize(quats, base[:, None, :], scale[:, None, :])
+    tracks = np.arange(len(quats))
+    for _ in range(SWEEPS):
+        for c in range(4):
+            # (T, K) candidate ranges for component c
+            cand_lo = lo[:, c:c + 1] + pairs[:, 0] * span[:, c:c + 1]
+            cand_hi = hi[:, c:c + 1] - pairs[:, 1] * span[:, c:c + 1]
+            cand_scale = _safe_scale(cand_hi - cand_lo)
+            comp = _dequantize(quats[:, None, :, c], cand_lo[..., None], cand_scale[..., None])
+
+            # Swap component c of the current decode for each candidate's
+            rest_dot = np.einsum('tni,tni->tn', decoded, quats) - decoded[..., c] * quats[..., c]
+            rest_norm = np.einsum('tni,tni->tn', decoded, decoded) - decoded[..., c] ** 2
+            dots = np.abs(rest_dot[:, None] + comp * quats[:, None, :, c])
+            norms = np.sqrt(np.maximum(rest_norm[:, None] + comp ** 2, 0.0))
+            err = 1.0 - dots / np.maximum(norms, 1e-12)
+            score = err.max(axis=2) + 1e-3 * err.mean(axis=2)
+
+            pick = np.argmin(score, axis=1)
+            base[:, c] = cand_lo[tracks, pick]
+            scale[:, c] = cand_scale[tracks, pick]
+            decoded[..., c] = comp[tracks, pick]
+
+    # Parameters are stored as float32
+    return scale.astype('<f4').astype(np.float64), base.astype('<f4').astype(np.float64)
+
+
+def optimize_quats_4bpk(quats) -> Tuple[np.ndarray, np.ndarray]:
+    """Drop-in for quantize_quats_4bpk with optimized hemispheres and unpack
+    parameters.
+
+    Args:
+        quats: (N, 4) array for one track, or (T, N, 4) for T tracks of equal length
+
+    Returns:
+        (codes, unpack) where codes is uint8 (..., N, 4) -- the frame data bytes --
+        and unpack is little-endian float32 (..., 8) -- scale[4] then base[4].
+    """
+    quats = np.asarray(quats, dtype=np.float64)
+    single = quats.ndim == 2
+    if single:
+        quats = quats[None]
+    unit = quats / np.maximum(np.linalg.norm(quats, axis=-1, keepdims=True), 1e-12)
+    aligned = align_hemispheres(unit)
+
+    # Raw min/max parameters of the original keys: the fallback per track
+    raw_base = (quats.min(axis=1) + 0.0).astype('<f4').astype(np.float64)
+    raw_scale = _safe_scale(quats.max(axis=1) - quats.min(axis=1)).astype('<f4').astype(np.float64)
+    raw_codes = _best_codes(quats, raw_base[:, None, :], raw_scale[:, None, :])
+    raw_keys = raw_base[:, None, :] + raw_codes / 255.0 * raw_scale[:, None, :]
+    raw_err = _track_error(raw_keys, unit).max(axis=1)
+
+    scale, base = optimize_unpack_params(aligned)
+    opt_codes = _best_codes(aligned, base[:, None, :], scale[:, None, :])
+    opt_keys = base[:, None, :] + opt_codes / 255.0 * scale[:, None, :]
+    opt_err = _track_error(opt_keys, unit).max(axis=1)
+
+    use_opt = opt_err < raw_err
+    codes = np.where(use_opt[:, None, None], opt_codes, raw_codes).astype(np.uint8)
+    scale = np.where(use_opt[:, None], scale, raw_scale)
+    base = np.where(use_opt[:, None], base, raw_base)
+    unpack = np.concatenate([scale, base], axis=-1).astype('<f4')
+    if single:
+        return codes[0], unpack[0]
+    return codes, unpack
@@ -10,6 +10,9 @@ import struct
 import sys
 import os
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from motlist_reader import MotlistFile
+
 
 def read_field(data, offset, fmt):
     """Read a struct field from data at offset."""
@@ -21,127 +24,83 @@ def read_field(data, offset, fmt):
 
 def dump_motlist(filepath):
     """Parse and dump all fields of a .motlist.85 file."""
-    with open(filepath, 'rb') as f:
-        data = f.read()
-
-    print(f"\n{'='*70}")
-    print(f"FILE: {os.path.basename(filepath)}")
-    print(f"Size: {len(data)} bytes")
-    print(f"{'='*70}")
-
-    # --- Motlist header ---
-    print(f"\n--- MOTLIST HEADER ---")
-    version = read_field(data, 0x00, '<I')
-    magic = data[0x04:0x08]
-    ptrs_offs = read_field(data, 0x10, '<Q')
-    col_offs = read_field(data, 0x18, '<Q')
-    name_offs = read_field(data, 0x20, '<Q')
-    num_entries = read_field(data, 0x30, '<I')
-
-    print(f"  version     = {version}")
-    print(f"  magic       = {magic}")
-    print(f"  pointersOff = 0x{ptrs_offs:X}")
-    print(f"  colOffs     = 0x{col_offs:X}")
-    print(f"  nameOffs    = 0x{name_offs:X}")
-    print(f"  numEntries  = {num_entries}")
-
-    # Read name
-    if name_offs and name_offs < len(data):
-        name_end = data.index(0, name_offs) if 0 in data[name_offs:name_offs+256] else name_offs
-        name = data[name_offs:name_end].decode('ascii', errors='replace')
-        print(f"  motlistName = '{name}'")
-
-    # --- Pointer table ---
-    print(f"\n--- POINTER TABLE (at 0x{ptrs_offs:X}) ---")
-    for i in range(num_entries):
-        entry_off = read_field(data, ptrs_offs + i * 8, '<Q')
-        print(f"  Entry[{i}] -> 0x{entry_off:X}")
-
-        # --- Mot entry header ---
-        dump_mot_entry(data, entry_off, i)
-
-    # --- Collection data ---
-    if col_offs and col_offs < len(data):
-        print(f"\n--- COLLECTION DATA (at 0x{col_offs:X}) ---")
-        remaining = min(32, len(data) - col_offs)
-        print(f"  Hex: {data[col_offs:col_offs+remaining].hex()}")
-
-    return data
-
-
-def dump_mot_entry(data, entry_off, entry_idx):
+    with MotlistFile(filepath) as ml:
+        data = ml.data
+
+        print(f"\n{'='*70}")
+        print(f"FILE: {os.path.basename(filepath)}")
+        print(f"Size: {ml.size} bytes")
+        print(f"{'='*70}")
+
+        # --- Motlist header ---
+        print(f"\n--- MOTLIST HEADER ---")
+        print(f"  version     = {ml.version}")
+        print(f"  magic       = {ml.magic}")
+        print(f"  pointersOff = 0x{ml.pointers_offs:X}")
+        print(f"  colOffs     = 0x{ml.col_offs:X}")
+        print(f"  nameOffs    = 0x{ml.name_offs:X}")
+        print(f"  numEntries  = {ml.entry_count}")
+
+        # Read name
+        if ml.name_offs and ml.name_offs < ml.size:
+            try:
+                print(f"  motlistName = '{ml.name}'")
+            except UnicodeDecodeError:
+                print(f"  motlistName = (decode error)")
+
+        # --- Pointer table ---
+        print(f"\n--- POINTER TABLE (at 0x{ml.pointers_offs:X}) ---")
+        for i, entry_off in enumerate(ml.entry_offsets):
+            print(f"  Entry[{i}] -> 0x{entry_off:X}")
+
+            # --- Mot entry header ---
+            dump_mot_entry(ml.entry(i), i)
+
+        # --- Collection data ---
+        if ml.col_offs and ml.col_offs < ml.size:
+            print(f"\n--- COLLECTION DATA (at 0x{ml.col_offs:X}) ---")
+            remaining = min(32, ml.size - ml.col_offs)
+            print(f"  Hex: {data[ml.col_offs:ml.col_offs+remaining].hex()}")
+
+
+def dump_mot_entry(entry, entry_idx):
     """Dump all fields of a mot entry."""
-    e = entry_off
+    data = entry.data
+    e = entry.offset
     print(f"\n  --- MOT ENTRY {entry_idx} (at 0x{e:X}) ---")
 
-    mot_ver = read_field(data, e + 0x00, '<I')
-    mot_magic = data[e + 0x04:e + 0x08]
-    unk08 = read_field(data, e + 0x08, '<I')
-    mot_size = read_field(data, e + 0x0C, '<I')
-    offs_bone_hdr = read_field(data, e + 0x10, '<Q')
-    bone_clip_offs = read_field(data, e + 0x18, '<Q')
-    field_20 = read_field(data, e + 0x20, '<Q')
-    field_28 = read_field(data, e + 0x28, '<Q')
-    field_30 = read_field(data, e + 0x30, '<Q')
-    field_38 = read_field(data, e + 0x38, '<Q')
-    field_40 = read_field(data, e + 0x40, '<Q')
-    field_48 = read_field(data, e + 0x48, '<Q')
-    names_offs = read_field(data, e + 0x50, '<Q')
-    frame_count = read_field(data, e + 0x58, '<f')
-    blending = read_field(data, e + 0x5C, '<f')
-    ukn_f1 = read_field(data, e + 0x60, '<f')
-    ukn_f2 = read_field(data, e + 0x64, '<f')
-    bone_count = read_field(data, e + 0x68, '<H')
-    bone_clip_count = read_field(data, e + 0x6A, '<H')
-    ukn_6c = read_field(data, e + 0x6C, '<B')
-    ukn_6d = read_field(data, e + 0x6D, '<B')
-    fps = read_field(data, e + 0x6E, '<H')
-    ukn_70 = read_field(data, e + 0x70, '<H')
-    ukn_72 = read_field(data, e + 0x72, '<H')
-
-    print(f"    version         = {mot_ver}")
-    print(f"    magic           = {mot_magic}")
-    print(f"    unk08           = {unk08}")
-    print(f"    motSize         = {mot_size}")
-    print(f"    +0x10 offsBoneHdr  = 0x{offs_bone_hdr:X}  {'(BoneHeaders)' if offs_bone_hdr > 0 else '(none)'}")
-    print(f"    +0x18 boneClipOffs = 0x{bone_clip_offs:X}")
-    print(f"    +0x20           = 0x{field_20:X}")
-    print(f"    +0x28           = 0x{field_28:X}")
-    print(f"    +0x30 clipFile  = 0x{field_30:X}")
-    print(f"    +0x38 jmapOffs  = 0x{field_38:X}")
-    print(f"    +0x40           = 0x{field_40:X}")
-    print(f"    +0x48 offs2     = 0x{field_48:X}")
-    print(f"    +0x50 namesOffs = 0x{names_offs:X}")
-    print(f"    frameCount      = {frame_count}")
-    print(f"    blending(+0x5C) = {blending}")
-    print(f"    uknFloat1(+0x60)= {ukn_f1}")
-    print(f"    uknFloat2(+0x64)= {ukn_f2}")
-    print(f"    boneCount       = {bone_count}")
-    print(f"    boneClipCount   = {bone_clip_count}")
-    print(f"    unk6C/6D        = {ukn_6c}/{ukn_6d}")
-    print(f"    fps             = {fps}")
-    print(f"    unk70/72        = {ukn_70}/{ukn_72}")
+    print(f"    version         = {entry.version}")
+    print(f"    magic           = {entry.magic}")
+    print(f"    unk08           = {entry.unk08}")
+    print(f"    motSize         = {entry.mot_size}")
+    print(f"    +0x10 offsBoneHdr  = 0x{entry.offs_bone_hdr:X}  {'(BoneHeaders)' if entry.offs_bone_hdr > 0 else '(none)'}")
+    print(f"    +0x18 boneClipOffs = 0x{entry.bone_clip_offs:X}")
+    print(f"    +0x20           = 0x{entry.field_20:X}")
+    print(f"    +0x28           = 0x{entry.field_28:X}")
+    print(f"    +0x30 clipFile  = 0x{entry.clip_file_offs:X}")
+    print(f"    +0x38 jmapOffs  = 0x{entry.jmap_offs:X}")
+    print(f"    +0x40           = 0x{entry.field_40:X}")
+    print(f"    +0x48 offs2     = 0x{entry.offs2:X}")
+    print(f"    +0x50 namesOffs = 0x{entry.names_offs:X}")
+    print(f"    frameCount      = {entry.frame_count}")
+    print(f"    blending(+0x5C) = {entry.blending}")
+    print(f"    uknFloat1(+0x60)= {entry.ukn_float1}")
+    print(f"    uknFloat2(+0x64)= {entry.ukn_float2}")
+    print(f"    boneCount       = {entry.bone_count}")
+    print(f"    boneClipCount   = {entry.bone_clip_count}")
+    print(f"    unk6C/6D        = {entry.ukn_6c}/{entry.ukn_6d}")
+    print(f"    fps             = {entry.frame_rate}")
+    print(f"    unk70/72        = {entry.ukn_70}/{entry.ukn_72}")
 
     # Read motion name
-    if names_offs > 0:
-        abs_name = e + names_offs
-        if abs_name < len(data):
-            # UTF-16LE name
-            name_data = bytearray()
-            pos = abs_name
-            while pos + 1 < len(data):
-                ch = data[pos:pos+2]
-                if ch == b'\x00\x00':
-                    break
-                name_data.extend(ch)
-                pos += 2
-            try:
-                name = name_data.decode('utf-16-le')
-                print(f"    motName         = '{name}'")
-            except:
-                print(f"    motName         = (decode error)")
+    if entry.names_offs > 0 and e + entry.names_offs < len(data):
+        try:
+            print(f"    motName         = '{entry.name}'")
+        except UnicodeDecodeError:
+            print(f"    motName         = (decode error)")
 
     # --- BoneHeaders (if offsToBoneHdrOffs > 0) ---
+    offs_bone_hdr = entry.offs_bone_hdr
     if offs_bone_hdr > 0:
         abs_bh = e + offs_bone_hdr
         if abs_bh + 16 <= len(data):
@@ -162,65 +121,39 @@ def dump_mot_entry(data, entry_off, entry_idx):
                     print(f"      ... ({bh_count - 3} more)")
 
     # --- Bone clip headers ---
-    if bone_clip_offs > 0:
-        print(f"\n    --- BONE CLIP HEADERS (at entry+0x{bone_clip_offs:X}) ---")
-        for bc in range(min(5, bone_clip_count)):
-            bc_pos = e + bone_clip_offs + bc * 24
-            if bc_pos + 24 > len(data):
-                break
-            bi = read_field(data, bc_pos + 0, '<H')
-            tf = read_field(data, bc_pos + 2, '<H')
-            bh = read_field(data, bc_pos + 4, '<I')
-            uf = read_field(data, bc_pos + 8, '<f')
-            pad = read_field(data, bc_pos + 12, '<I')
-            tho = read_field(data, bc_pos + 16, '<Q')
+    if entry.bone_clip_offs > 0:
+        print(f"\n    --- BONE CLIP HEADERS (at entry+0x{entry.bone_clip_offs:X}) ---")
+        for clip in entry.bone_clips[:5]:
+            tf = clip.track_flags | (clip.track_flags2 << 8)
             tf_str = []
             if tf & 1: tf_str.append('T')
             if tf & 2: tf_str.append('R')
             if tf & 4: tf_str.append('S')
-            print(f"      BoneClip[{bc}]: idx={bi}, flags={'+'.join(tf_str) if tf_str else 'none'}(0x{tf:04X}), "
-                  f"hash=0x{bh:08X}, float={uf:.1f}, pad={pad}, trackOff=0x{tho:X}")
+            print(f"      BoneClip[{(clip.offset - e - entry.bone_clip_offs) // 24}]: "
+                  f"idx={clip.bone_index}, flags={'+'.join(tf_str) if tf_str else 'none'}(0x{tf:04X}), "
+                  f"hash=0x{clip.bone_hash:08X}, float={clip.ukn_float:.1f}, pad={clip.padding}, "
+                  f"trackOff=0x{clip.track_hdr_offs:X}")
 
             # Dump tracks for this bone clip
-            dump_tracks(data, e, tho, tf, frame_count)
+            dump_tracks(clip)
 
-        if bone_clip_count > 5:
-            print(f"      ... ({bone_clip_count - 5} more bone clips)")
+        if entry.bone_clip_count > 5:
+            print(f"      ... ({entry.bone_clip_count - 5} more bone clips)")
 
 
-def dump_tracks(data, entry_off, track_hdr_offs, track_flags, frame_count):
+def dump_tracks(clip):
     """Dump track headers for a bone clip."""
-    track_count = 0
-    if track_flags & 1: track_count += 1  # translation
-    if track_flags & 2: track_count += 1  # rotation
-    if track_flags & 4: track_count += 1  # scale
-
-    for ti in range(track_count):
-        t_pos = entry_off + track_hdr_offs + ti * 40
-        if t_pos + 40 > len(data):
-            break
-
-        flags = read_field(data, t_pos + 0, '<I')
-        key_count = read_field(data, t_pos + 4, '<I')
-        fps = read_field(data, t_pos + 8, '<I')
-        max_frame = read_field(data, t_pos + 12, '<f')
-        fi_offs = read_field(data, t_pos + 16, '<Q')
-        fd_offs = read_field(data, t_pos + 24, '<Q')
-        ud_offs = read_field(data, t_pos + 32, '<Q')
-
-        # Determine track type from flags
-        track_type = flags & 0xFFF
+    data = clip.entry.data
+    entry_off = clip.entry.offset
+
+    for ti, track in enumerate(clip.tracks):
+        flags = track.flags
+        key_count = track.key_count
+
+        # Determine compression from flags
         flagsEval = flags & 0xFF000
         cmprssn = flags >> 20
 
-        type_name = "?"
-        if track_type & 0x10:  # bit pattern for rotation
-            type_name = "Rot"
-        elif track_type & 0xF0 == 0xF0:
-            type_name = "Pos"
-        elif track_type & 0x04:
-            type_name = "Scl"
-
         compress_name = f"cmprssn={cmprssn}"
         if flagsEval == 0x00000: compress_name = "Full"
         elif flagsEval == 0x30000: compress_name = "10Bit(RE2)"
@@ -229,42 +162,36 @@ def dump_tracks(data, entry_off, track_hdr_offs, track_flags, frame_count):
         elif flagsEval == 0x40000: compress_name = "10Bit(RE3)"
 
         print(f"        Track[{ti}]: flags=0x{flags:08X}({compress_name}), keys={key_count}, "
-              f"fps={fps}, maxFrame={max_frame:.0f}")
-        print(f"          +16 frameIndOffs  = 0x{fi_offs:X}")
-        print(f"          +24 frameDataOffs = 0x{fd_offs:X}")
-        print(f"          +32 unpackDataOff = 0x{ud_offs:X}")
+              f"fps={track.frame_rate}, maxFrame={track.max_frame:.0f}")
+        print(f"          +16 frameIndOffs  = 0x{track.frame_ind_offs:X}")
+        print(f"          +24 frameDataOffs = 0x{track.frame_data_offs:X}")
+        print(f"          +32 unpackDataOff = 0x{track.unpack_offs:X}")
 
         # Dump first few frame indices
-        if fi_offs > 0:
-            abs_fi = entry_off + fi_offs
-            if abs_fi + 2 <= len(data):
-                fi_type = cmprssn  # 2=u8, 4=i16, 5=i32
+        if track.frame_ind_offs > 0:
+            try:
+                sample = [int(v) for v in track.frame_indices[:5]]
+            except ValueError:
                 sample = []
-                for si in range(min(5, key_count)):
-                    if fi_type == 2 and abs_fi + si < len(data):
-                        sample.append(read_field(data, abs_fi + si, '<B'))
-                    elif fi_type == 4 and abs_fi + si * 2 + 2 <= len(data):
-                        sample.append(read_field(data, abs_fi + si * 2, '<h'))
-                    elif fi_type == 5 and abs_fi + si * 4 + 4 <= len(data):
-                        sample.append(read_field(data, abs_fi + si * 4, '<i'))
-                if sample:
-                    more = f"... ({key_count - len(sample)} more)" if key_count > len(sample) else ""
-                    print(f"          frameIndices: {sample} {more}")
+            if sample:
+                more = f"... ({key_count - len(sample)} more)" if key_count > len(sample) else ""
+                print(f"          frameIndices: {sample} {more}")
 
         # Dump first few keyframes
-        if fd_offs > 0:
-            abs_fd = entry_off + fd_offs
+        if track.frame_data_offs > 0:
+            abs_fd = entry_off + track.frame_data_offs
             if abs_fd + 4 <= len(data):
                 print(f"          keyData hex(first 16B): {data[abs_fd:abs_fd+16].hex()}")
 
         # Dump unpack data
-        if ud_offs > 0:
-            abs_ud = entry_off + ud_offs
-            if abs_ud + 32 <= len(data):
-                max_vals = [read_field(data, abs_ud + i*4, '<f') for i in range(4)]
-                min_vals = [read_field(data, abs_ud + 16 + i*4, '<f') for i in range(4)]
-                print(f"          unpackMax: [{', '.join(f'{v:.4f}' for v in max_vals)}]")
-                print(f"          unpackMin: [{', '.join(f'{v:.4f}' for v in min_vals)}]")
+        if track.unpack_offs > 0:
+            try:
+                unpack = track.unpack
+            except ValueError:
+                unpack = None
+            if unpack is not None:
+                print(f"          unpackMax: [{', '.join(f'{v:.4f}' for v in unpack[:4])}]")
+                print(f"          unpackMin: [{', '.join(f'{v:.4f}' for v in unpack[4:])}]")
 
 
 def main():
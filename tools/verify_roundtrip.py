@@ -0,0 +1,258 @@
+"""
+Round-trip verifier for written .motlist.85 files.
+Decodes every track of a mot entry the way the engine will (4bpk through the
+unpack block formula of docs section 8.2, float rotations with reconstructed
+qW, float and quantized positions), samples the result at every source frame
+(slerp / lerp between sparse keys, frame-rate changes mapped by time) and
+compares it with the source CAF JSON / .cafb / bone dump in one vectorized
+pass. Reports max and mean angular and positional error per bone.
+
+Usage:
+    python verify_roundtrip.py <output.motlist.85> <source.txt|.json|.cafb> [options]
+
+    Options:
+      --entry <n|name>      Mot entry to check (default: 0)
+      --axis-convert        Source was converted with --axis-convert
+      --axis-preset <name>  Source was converted with this --axis-preset
+      --fps <n>             Frame rate of a .txt dump source (default: 60)
+      --max-rot-error <deg> Exit with status 1 if any bone exceeds this
+      --max-pos-error <d>   Exit with status 1 if any bone exceeds this
+"""
+
+import os
+import sys
+import argparse
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mot_writer import load_caf_anim, hash_names
+from motlist_reader import MotlistFile, MotEntry
+from key_reduction import quat_angle_error
+from resample import sample_keys
+from preprocess import preprocess_tracks, AXIS_PRESETS
+
+
+def load_source_tracks(
+    path: str,
+    axis_convert: Union[bool, str] = False,
+    dump_fps: int = 60,
+) -> Tuple[List[str], np.ndarray, np.ndarray, float]:
+    """Source keys as the converters see them.
+
+    Returns:
+        (bone names, quats (frames, bones, 4) normalized, positions
+        (frames, bones, 3), fps)
+    """
+    if path.lower().endswith(('.json', '.cafb')):
+        anim = load_caf_anim(path)
+        frames = np.asarray(anim['data'], dtype=np.float64)[:anim['frame_count']]
+        names, fps = list(anim['bones'][:frames.shape[1]]), anim.get('fps', 60)
+    else:
+        from dump_to_motlist import parse_dodge_dump_columnar
+        names, _, tracks = parse_dodge_dump_columnar(path)
+        frames = np.transpose(tracks, (1, 0, 2)).astype(np.float64)
+        fps = dump_fps
+    # Same axis conversion / normalization / sign fix as the converters
+    quats, positions, _ = preprocess_tracks(frames, axis_convert)
+    return names, quats, positions, fps
+
+
+def output_frames(entry: MotEntry, src_frames: int, src_fps: float) -> np.ndarray:
+    """Output frame time of every source frame (frame-rate or length changes)."""
+    frames = np.arange(src_frames, dtype=np.float64)
+    out_frames = int(round(entry.frame_count)) + 1
+    if entry.frame_rate and entry.frame_rate != src_fps:
+        return frames * entry.frame_rate / src_fps
+    if out_frames != src_frames and src_frames > 1:
+        return frames * (out_frames - 1) / (src_frames - 1)
+    return frames
+
+
+def verify_entry(
+    entry: MotEntry,
+    names: List[str],
+    quats: np.ndarray,
+    positions: np.ndarray,
+    src_fps: float,
+) -> Dict[str, Any]:
+    """Compare a decoded mot entry with its source keys.
+
+    Returns:
+        Dict with 'bones' (one row per matched bone: name, bone_index,
+        rot_keys, rot_max, rot_mean, pos_keys, pos_max, pos_mean; errors
+        in degrees / source units, None for a missing track), 'missing'
+        (source bones without a bone clip), 'extra' (bone clips with no
+        source bone) and 'undecodable' ((name, kind, flags) of tracks whose
+        encoding the reader does not know, left out of the error figures).
+    """
+    slot_by_hash = dict(zip(hash_names(names), range(len(names))))
+    times = output_frames(entry, len(quats), src_fps)
+
+    matched = []
+    extra = []
+    for clip in entry.bone_clips:
+        slot = slot_by_hash.get(clip.bone_hash)
+        if slot is None:
+            extra.append(clip.bone_hash)
+        else:
+            matched.append((clip, slot))
+
+    # Decoded keys sampled at every source frame, (frames, bones, 4|3)
+    rot = np.full((len(quats), len(matched), 4), np.nan)
+    pos = np.full((len(quats), len(matched), 3), np.nan)
+    rows = []
+    undecodable = []
+    for col, (clip, slot) in enumerate(matched):
+        row = {'name': names[slot], 'bone_index': clip.bone_index,
+               'rot_keys': None, 'pos_keys': None}
+        for track in clip.tracks:
+            if track.encoding is None:
+                undecodable.append((names[slot], track.kind, track.flags))
+                continue
+            keys = np.asarray(track.keys, dtype=np.float64)
+            if track.kind == 'rotation':
+                rot[:, col] = sample_keys(track.frame_indices, keys, times, True)
+                row['rot_keys'] = track.key_count
+            elif track.kind == 'position':
+                pos[:, col] = sample_keys(track.frame_indices, keys, times, False)
+                row['pos_keys'] = track.key_count
+        rows.append(row)
+
+    slots = [slot for _, slot in matched]
+    if rows:
+        rot_err = quat_angle_error(rot.reshape(-1, 4), quats[:, slots].reshape(-1, 4))
+        rot_err = np.degrees(rot_err.reshape(len(quats), len(rows)))
+        pos_err = np.linalg.norm(pos - positions[:, slots], axis=-1)
+        for col, row in enumerate(rows):
+            for prefix, err in (('rot', rot_err[:, col]), ('pos', pos_err[:, col])):
+                has_track = row[prefix + '_keys'] is not None
+                row[prefix + '_max'] = float(err.max()) if has_track else None
+                row[prefix + '_mean'] = float(err.mean()) if has_track else None
+
+    matched_slots = set(slots)
+    return {
+        'bones': rows,
+        'missing': [n for i, n in enumerate(names) if i not in matched_slots],
+        'extra': extra,
+        'undecodable': undecodable,
+    }
+
+
+def verify_motlist(
+    motlist_path: str,
+    source_path: str,
+    entry: Union[int, str] = 0,
+    axis_convert: Union[bool, str] = False,
+    dump_fps: int = 60,
+) -> Dict[str, Any]:
+    """verify_entry for one entry (index or name) of a written motlist."""
+    names, quats, positions, fps = load_source_tracks(source_path, axis_convert, dump_fps)
+    with MotlistFile(motlist_path) as ml:
+        if isinstance(entry, str) and not entry.isdigit():
+            mot = ml.find_entry(entry)
+            if mot is None:
+                raise ValueError(f"No mot entry named {entry!r} in {motlist_path}")
+        else:
+            mot = ml.entry(int(entry))
+        result = verify_entry(mot, names, quats, positions, fps)
+        result['entry'] = mot.name
+    return result
+
+
+def verify_failures(
+    result: Dict[str, Any],
+    max_rot_error_deg: Optional[float] = None,
+    max_pos_error: Optional[float] = None,
+) -> List[str]:
+    """Names of bones whose max error exceeds a budget. With a budget given,
+    bones with an undecodable track fail too: their error is unknown.
+    """
+    failed = []
+    for r in result['bones']:
+        if ((max_rot_error_deg is not None and r['rot_max'] is not None
+             and r['rot_max'] > max_rot_error_deg)
+                or (max_pos_error is not None and r['pos_max'] is not None
+                    and r['pos_max'] > max_pos_error)):
+            failed.append(r['name'])
+    if max_rot_error_deg is not None or max_pos_error is not None:
+        for name, _, _ in result['undecodable']:
+            if name not in failed:
+                failed.append(name)
+    return failed
+
+
+def format_verify_report(
+    result: Dict[str, Any],
+    max_rot_error_deg: Optional[float] = None,
+    max_pos_error: Optional[float] = None,
+) -> str:
+    """Per-bone error table, worst bones and budget verdict."""
+    def cell(value, fmt):
+        return f"{value:{fmt}}" if value is not None else '-'
+
+    failed = set(verify_failures(result, max_rot_error_deg, max_pos_error))
+    undecodable = {name for name, _, _ in result['undecodable']}
+    lines = [f"Round-trip verify: entry '{result['entry']}'",
+             f"{'Bone':<34} {'Idx':>4} {'RotKeys':>7} {'RotMax':>8} {'RotMean':>8} "
+             f"{'PosKeys':>7} {'PosMax':>9} {'PosMean':>9}  (deg / units)"]
+    for r in result['bones']:
+        lines.append(f"{r['name']:<34} {r['bone_index']:>4} {cell(r['rot_keys'], 'd'):>7} "
+                     f"{cell(r['rot_max'], '.4f'):>8} {cell(r['rot_mean'], '.4f'):>8} "
+                     f"{cell(r['pos_keys'], 'd'):>7} {cell(r['pos_max'], '.6f'):>9} "
+                     f"{cell(r['pos_mean'], '.6f'):>9}"
+                     f"{'  UNDECODABLE' if r['name'] in undecodable else ''}"
+                     f"{'  OVER BUDGET' if r['name'] in failed and r['name'] not in undecodable else ''}")
+
+    rot_rows = [r for r in result['bones'] if r['rot_max'] is not None]
+    pos_rows = [r for r in result['bones'] if r['pos_max'] is not None]
+    if rot_rows:
+        worst = max(rot_rows, key=lambda r: r['rot_max'])
+        mean = sum(r['rot_mean'] for r in rot_rows) / len(rot_rows)
+        lines.append(f"Rotation: worst {worst['rot_max']:.4f} deg ({worst['name']}), "
+                     f"mean {mean:.4f} deg over {len(rot_rows)} tracks")
+    if pos_rows:
+        worst = max(pos_rows, key=lambda r: r['pos_max'])
+        mean = sum(r['pos_mean'] for r in pos_rows) / len(pos_rows)
+        lines.append(f"Position: worst {worst['pos_max']:.6f} ({worst['name']}), "
+                     f"mean {mean:.6f} over {len(pos_rows)} tracks")
+    if result['missing']:
+        lines.append(f"Not in output ({len(result['missing'])}): {', '.join(result['missing'])}")
+    if result['extra']:
+        lines.append(f"Bone clips without a source bone: {len(result['extra'])}")
+    if result['undecodable']:
+        lines.append(f"Undecodable tracks ({len(result['undecodable'])}): " + ', '.join(
+            f"{name} {kind} 0x{flags:08X}" for name, kind, flags in result['undecodable']))
+    if max_rot_error_deg is not None or max_pos_error is not None:
+        lines.append(f"FAILED: {len(failed)} bones over budget or undecodable" if failed
+                     else "OK: all bones within budget")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decode a .motlist.85 and compare it with its source animation")
+    parser.add_argument("motlist", help="Written .motlist.85")
+    parser.add_argument("source", help="Source bone dump (.txt), CAF JSON or .cafb")
+    parser.add_argument("--entry", default="0", help="Mot entry index or name (default: 0)")
+    parser.add_argument("--axis-convert", action="store_true",
+                        help="Source was converted with --axis-convert")
+    parser.add_argument("--axis-preset", choices=sorted(AXIS_PRESETS), default=None,
+                        help="Source was converted with this --axis-preset")
+    parser.add_argument("--fps", type=int, default=60, help="Frame rate of a .txt dump source")
+    parser.add_argument("--max-rot-error", type=float, default=None,
+                        help="Fail if any bone's rotation error exceeds this (degrees)")
+    parser.add_argument("--max-pos-error", type=float, default=None,
+                        help="Fail if any bone's position error exceeds this")
+    args = parser.parse_args()
+
+    result = verify_motlist(args.motlist, args.source, args.entry,
+                            args.axis_preset or args.axis_convert, args.fps)
+    print(format_verify_report(result, args.max_rot_error, args.max_pos_error))
+    if verify_failures(result, args.max_rot_error, args.max_pos_error):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()